@@ -1,10 +1,11 @@
+import multiprocessing
 import sys
 
-import pandas as pd
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import (
     QApplication,
     QComboBox,
+    QFileDialog,
     QHBoxLayout,
     QLabel,
     QLineEdit,
@@ -15,6 +16,8 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
+import rating_scales
+import session_profiler
 import team_utils
 import team_select_pyqt
 
@@ -26,51 +29,15 @@ CSV_PATH = team_utils.CSV_PATH
 class RandomSquadWindow(QMainWindow):
     """PyQt interface for the Random Squad tool."""
 
-    SKILL_LEVELS = [
-        "1 sao",
-        "2 sao",
-        "3 sao",
-        "4 sao",
-        "5 sao",
-        "6 sao",
-        "7 sao",
-        "8 sao",
-        "9 sao",
-        "10 sao",
-        "siêu sao",
-    ]
-    STAMINA_LEVELS = ["0", "10", "20", "30", "40", "50", "60", "70", "80", "90", "100"]
+    SKILL_LEVELS = rating_scales.SKILL_LEVELS
+    STAMINA_LEVELS = rating_scales.STAMINA_LEVELS
     DEFAULT_SKILL_INDEX = 1
     DEFAULT_STAMINA_INDEX = 1
     DEFAULT_SKILL_WEIGHT = 50
-    MIN_POINT = 1.0
-    MAX_POINT = 4.0
-    SKILL_MAPPING = {
-        "1 sao": 0.0,
-        "2 sao": 0.1,
-        "3 sao": 0.2,
-        "4 sao": 0.3,
-        "5 sao": 0.4,
-        "6 sao": 0.5,
-        "7 sao": 0.6,
-        "8 sao": 0.7,
-        "9 sao": 0.8,
-        "10 sao": 0.9,
-        "siêu sao": 1.0,
-    }
-    STAMINA_MAPPING = {
-        "0": 0.0,
-        "10": 0.1,
-        "20": 0.2,
-        "30": 0.3,
-        "40": 0.4,
-        "50": 0.5,
-        "60": 0.6,
-        "70": 0.7,
-        "80": 0.8,
-        "90": 0.9,
-        "100": 1.0,
-    }
+    MIN_POINT = rating_scales.MIN_POINT
+    MAX_POINT = rating_scales.MAX_POINT
+    SKILL_MAPPING = rating_scales.SKILL_MAPPING
+    STAMINA_MAPPING = rating_scales.STAMINA_MAPPING
 
     def __init__(self) -> None:
         super().__init__()
@@ -112,6 +79,10 @@ class RandomSquadWindow(QMainWindow):
         self.calc_button.clicked.connect(self.handle_calculate)
         layout.addWidget(self.calc_button)
 
+        self.rerate_button = QPushButton("Tính lại toàn bộ")
+        self.rerate_button.clicked.connect(self.handle_rerate_all)
+        layout.addWidget(self.rerate_button)
+
         self.attendance_button = QPushButton("Điểm danh")
         self.attendance_button.clicked.connect(self.handle_attendance)
         layout.addWidget(self.attendance_button)
@@ -143,43 +114,56 @@ class RandomSquadWindow(QMainWindow):
         self.add_button.clicked.connect(self.handle_add)
         layout.addWidget(self.add_button)
 
-        self.load_data()
+        self.import_button = QPushButton("Nhập danh sách (CSV)")
+        self.import_button.clicked.connect(self.handle_import)
+        layout.addWidget(self.import_button)
+
+        # One roster for the whole app, shared with the team dialog
+        self.roster = team_utils.RosterModel(CSV_PATH)
+        self.roster_bridge = team_select_pyqt.RosterBridge(self.roster, self)
+        self.roster_bridge.rowAdded.connect(self._roster_row_added)
+        self.roster_bridge.rowUpdated.connect(self._roster_row_updated)
+        self.roster_bridge.rowRemoved.connect(self.name_combo.removeItem)
+        self.roster_bridge.rosterReset.connect(self._fill_name_combo)
+        self.roster_bridge.watch()  # Pick up edits made by other programs
+        self._fill_name_combo()
         self.name_combo.currentIndexChanged.connect(self.update_player_fields)
 
     # ---- Data handling ----
     def load_data(self) -> None:
         """Load player data from the CSV file."""
-        try:
-            self.df = pd.read_csv(CSV_PATH, encoding="utf-8-sig")
-        except FileNotFoundError:
-            self.df = pd.DataFrame(columns=["name", "tier", "position", "stamina", "skill"])
+        self.roster.flush()
+        self.roster.load()
 
+    def _fill_name_combo(self) -> None:
+        current = self.name_combo.currentText()
+        self.name_combo.blockSignals(True)
         self.name_combo.clear()
-        if "name" in self.df:
-            self.name_combo.addItems(self.df["name"].tolist())
-            if not self.df.empty:
-                self.name_combo.setCurrentIndex(0)
-                self.update_player_fields()
+        self.name_combo.addItems(self.roster.names())
+        self.name_combo.blockSignals(False)
+        if len(self.roster):
+            index = self.name_combo.findText(current)
+            self.name_combo.setCurrentIndex(max(index, 0))
+            self.update_player_fields()
+
+    def _roster_row_added(self, row: int) -> None:
+        self.name_combo.addItem(str(self.roster.value(row, team_utils.NAME_KEY)))
+
+    def _roster_row_updated(self, row: int) -> None:
+        if self.roster.value(row, team_utils.NAME_KEY) == self.name_combo.currentText():
+            self.update_player_fields()
 
     def update_player_fields(self) -> None:
         """Update skill and stamina fields based on selected player."""
-        name = self.name_combo.currentText()
-        if "name" not in self.df or name not in self.df["name"].values:
+        player = self.roster.get(self.name_combo.currentText())
+        if player is None:
             return
-
-        player_row = self.df[self.df["name"] == name]
-        if player_row.empty:
-            return
-        skill = player_row.iloc[0].get("skill", self.SKILL_LEVELS[self.DEFAULT_SKILL_INDEX])
-        stamina = player_row.iloc[0].get("stamina", self.STAMINA_LEVELS[self.DEFAULT_STAMINA_INDEX])
+        skill = player.get("skill", self.SKILL_LEVELS[self.DEFAULT_SKILL_INDEX])
+        stamina = player.get("stamina", self.STAMINA_LEVELS[self.DEFAULT_STAMINA_INDEX])
 
         self.skill_combo.setCurrentText(skill if skill in self.SKILL_LEVELS else self.SKILL_LEVELS[self.DEFAULT_SKILL_INDEX])
 
-        try:
-            stamina_val = float(stamina)
-            stamina_str = str(int(stamina_val)) if stamina_val.is_integer() else str(stamina_val)
-        except (ValueError, TypeError):
-            stamina_str = self.STAMINA_LEVELS[self.DEFAULT_STAMINA_INDEX]
+        stamina_str = team_utils.format_stamina(stamina)
         self.stamina_combo.setCurrentText(
             stamina_str if stamina_str in self.STAMINA_LEVELS else self.STAMINA_LEVELS[self.DEFAULT_STAMINA_INDEX]
         )
@@ -201,19 +185,21 @@ class RandomSquadWindow(QMainWindow):
 
         score = self.calculate_score(skill, stamina, skill_weight, stamina_weight)
 
-        self.df["skill"] = self.df["skill"].astype("object")
-        self.df["stamina"] = self.df["stamina"].astype("object")
-
-        if "name" in self.df and name in self.df["name"].values:
-            self.df.loc[self.df["name"] == name, "tier"] = score
-            self.df.loc[self.df["name"] == name, "skill"] = skill
-            self.df.loc[self.df["name"] == name, "stamina"] = stamina
-            self.df.to_csv(CSV_PATH, index=False, encoding="utf-8-sig")
+        if name in self.roster:
+            self.roster.update(name, tier=score, skill=skill, stamina=float(stamina))
 
         self.result_label.setText(f"{name} (Tier: {score})")
 
+    def handle_rerate_all(self) -> None:
+        skill_weight = self.skill_slider.value() / 100
+        self.roster.flush()
+        changed = team_utils.rerate_roster(str(CSV_PATH), skill_weight)
+        self.result_label.setText(f"Đã tính lại điểm ({changed} thay đổi)")
+        self.load_data()
+
     def handle_attendance(self) -> None:
-        dlg = team_select_pyqt.TeamSelectionWindow(self)
+        self.roster.flush()
+        dlg = team_select_pyqt.TeamSelectionWindow(self, roster=self.roster)
         dlg.exec_()
 
     def handle_add(self) -> None:
@@ -229,21 +215,47 @@ class RandomSquadWindow(QMainWindow):
             self.result_label.setText("Tên và vị trí không được để trống.")
             return
 
-        if "name" in self.df and name in self.df["name"].values:
+        if name in self.roster:
             self.result_label.setText(f"{name} đã tồn tại!")
             return
 
-        team_utils.add_new_player_to_csv(name, tier, position, filename=str(CSV_PATH))
+        try:
+            self.roster.add_player(name, tier, position)
+        except ValueError as exc:
+            self.result_label.setText(str(exc))
+            return
         self.result_label.setText(f"Đã thêm {name} ({tier})")
-        self.load_data()
+
+    def handle_import(self) -> None:
+        filename, _ = QFileDialog.getOpenFileName(self, "Nhập danh sách", "", "CSV (*.csv)")
+        if not filename:
+            return
+        try:
+            report = team_utils.import_players(team_utils.read_import_file(filename), self.roster)
+        except (OSError, ValueError) as exc:
+            self.result_label.setText(str(exc))
+            return
+        self.result_label.setText(team_utils.format_import_report(report, max_errors=5))
+
+    def closeEvent(self, event) -> None:
+        self.roster_bridge.detach()
+        self.roster.close()
+        super().closeEvent(event)
 
 
 def main() -> None:
-    app = QApplication(sys.argv)
+    profiler = session_profiler.start_session()  # SQUAD_PROFILE=<file> or --profile[=<file>]
+    _, argv = session_profiler.profile_output()
+    app = QApplication(argv)
     win = RandomSquadWindow()
     win.show()
-    sys.exit(app.exec_())
+    status = app.exec_()
+    if profiler is not None:
+        profiler.stop()
+    sys.exit(status)
 
 
 if __name__ == "__main__":
+    # The packaged exe re-runs this script for process-pool workers.
+    multiprocessing.freeze_support()
     main()
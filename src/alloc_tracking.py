@@ -0,0 +1,79 @@
+"""tracemalloc-based allocation accounting for the balancing hot path.
+
+``AllocationTracker`` is passed to ``generate_balanced_teams(tracker=...)``,
+which marks the start of every attempt and of its split, fairness and
+attribute stages. For each stage the tracker records the peak memory
+allocated above the level at the start of the stage, and for each attempt
+the peak above the level at the start of the attempt. tracemalloc slows the
+code down a lot, so this is a measurement mode for benchmarks, not
+something to leave on in the GUI.
+"""
+import contextlib
+import tracemalloc
+
+import numpy as np
+
+ATTEMPT_ALLOCATION_BUDGET = 64 * 1024  # Bytes one attempt may allocate at its peak (about 30 KB for 22 players)
+
+
+class AllocationTracker:
+    """Collect per-attempt and per-stage allocation peaks while active."""
+
+    def __init__(self):
+        self.attempts = []      # One {"attempt", "peak", "stages": {name: peak}} per attempt
+        self._attempt_base = 0
+        self._started = False
+
+    def __enter__(self):
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._started:
+            tracemalloc.stop()
+        return False
+
+    def begin_attempt(self, attempt_index):
+        self._attempt_base = tracemalloc.get_traced_memory()[0]
+        self.attempts.append({"attempt": attempt_index, "peak": 0, "stages": {}})
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            peak = tracemalloc.get_traced_memory()[1]
+            record = self.attempts[-1]
+            record["stages"][name] = record["stages"].get(name, 0) + peak - start
+            record["peak"] = max(record["peak"], peak - self._attempt_base)
+
+    def over_budget(self, budget=ATTEMPT_ALLOCATION_BUDGET):
+        """Return the attempts whose peak allocation exceeded ``budget`` bytes."""
+        return [record for record in self.attempts if record["peak"] > budget]
+
+    def summary(self):
+        """Return mean/p95/max bytes per attempt and per stage."""
+        def describe(values):
+            values = np.asarray(values, dtype=float)
+            return {"mean": float(values.mean()), "p95": float(np.percentile(values, 95)), "max": float(values.max())}
+
+        if not self.attempts:
+            return {}
+        stages = dict.fromkeys(name for record in self.attempts for name in record["stages"])
+        summary = {"attempt": describe([record["peak"] for record in self.attempts])}
+        for name in stages:
+            summary[name] = describe([record["stages"].get(name, 0) for record in self.attempts])
+        summary["attempts"] = len(self.attempts)
+        return summary
+
+
+def format_summary(summary):
+    lines = [f"{summary.get('attempts', 0)} attempts tracked (bytes: mean / p95 / max)"]
+    for name, stats in summary.items():
+        if name != "attempts":
+            lines.append(f"  {name:10s} {stats['mean']:10.0f} / {stats['p95']:10.0f} / {stats['max']:10.0f}")
+    return "\n".join(lines)
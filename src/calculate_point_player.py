@@ -1,60 +1,37 @@
+import multiprocessing
 import tkinter as tk
-from tkinter import ttk
-import pandas as pd
+from tkinter import filedialog, ttk
 import team_select_optimized_lib
-
-
-def ensure_strength_column(dataframe: pd.DataFrame) -> pd.DataFrame:
-    """Ensure the strength column exists and is up to date."""
-    strength_key = team_select_optimized_lib.STRENGTH_KEY
-    if 'tier' in dataframe.columns:
-        dataframe[strength_key] = dataframe['tier'].apply(
-            team_select_optimized_lib.classify_strength_from_tier
-        )
-    return dataframe
+import roster_model
+import roster_import
+import roster_rating
+import session_profiler
+from rating_scales import (
+    MAX_POINT,
+    MIN_POINT,
+    SKILL_LEVELS,
+    SKILL_MAPPING,
+    STAMINA_LEVELS,
+    STAMINA_MAPPING,
+)
 
 # === Config ===
 CSV_FILE = "players.csv"  # CSV file path
-SKILL_LEVELS = ["1 sao", "2 sao", "3 sao", "4 sao", "5 sao","6 sao", "7 sao", "8 sao", "9 sao", "10 sao", "siêu sao" ]
-STAMINA_LEVELS = ["0", "10", "20", "30", "40", "50", "60", "70", "80", "90", "100"]
 DEFAULT_SKILL_INDEX = 1  # "2 sao"
 DEFAULT_STAMINA_INDEX = 1  # "15p"
 DEFAULT_SKILL_WEIGHT = 50  # In percentage
-
-MIN_POINT = 1.0
-MAX_POINT = 4.0  # final score = MIN_POINT + normalized * MAX_POINT
-
-SKILL_MAPPING = {
-    "1 sao": 0.0,
-    "2 sao": 0.1,
-    "3 sao": 0.2,
-    "4 sao": 0.3,
-    "5 sao": 0.4,
-    "6 sao": 0.5,
-    "7 sao": 0.6,
-    "8 sao": 0.7,
-    "9 sao": 0.8,
-    "10 sao": 0.9,
-    "siêu sao": 1.0
-}
-
-STAMINA_MAPPING = {
-    "0": 0.0,
-    "10": 0.1,
-    "20": 0.2,
-    "30": 0.3,
-    "40": 0.4,
-    "50": 0.5,
-    "60": 0.6,
-    "70": 0.7,
-    "80": 0.8,
-    "90": 0.9,
-    "100": 1.0
-}
+# Skill/stamina levels, their mappings and MIN_POINT/MAX_POINT come from rating_scales:
+# final score = MIN_POINT + normalized * MAX_POINT
 # =================
 
-# Load CSV file into a DataFrame
-df = ensure_strength_column(pd.read_csv(CSV_FILE))
+# The packaged exe re-runs this script for process-pool workers; they must not open the GUI.
+multiprocessing.freeze_support()
+
+# SQUAD_PROFILE=<file> or --profile[=<file>] samples this session into a collapsed-stack file
+profiler = session_profiler.start_session()
+
+# Load the roster; edits are saved in the background
+roster = roster_model.RosterModel(CSV_FILE)
 
 def get_score_level(level: str) -> float:
     if level in SKILL_MAPPING:
@@ -71,11 +48,11 @@ def calculate_score(skill: str, stamina: str, skill_weight: float, stamina_weigh
 
 def update_player_fields(event=None):
     selected_name = name_combo.get()
-    player_row = df[df['name'] == selected_name]
+    player = roster.get(selected_name)
 
-    if not player_row.empty:
-        skill = player_row.iloc[0].get('skill', SKILL_LEVELS[DEFAULT_SKILL_INDEX])
-        stamina = player_row.iloc[0].get('stamina', STAMINA_LEVELS[DEFAULT_STAMINA_INDEX])
+    if player is not None:
+        skill = player.get('skill', SKILL_LEVELS[DEFAULT_SKILL_INDEX])
+        stamina = player.get('stamina', STAMINA_LEVELS[DEFAULT_STAMINA_INDEX])
 
         # Set comboboxes
         if skill in SKILL_LEVELS:
@@ -83,14 +60,8 @@ def update_player_fields(event=None):
         else:
             skill_combo.set(SKILL_LEVELS[DEFAULT_SKILL_INDEX])
 
-        # Normalize stamina by converting to float, then back to int string for matching
-        try:
-            stamina_val = float(stamina)
-            stamina_str = str(int(stamina_val)) if stamina_val.is_integer() else str(stamina_val)
-        except (ValueError, TypeError):
-            stamina_str = STAMINA_LEVELS[DEFAULT_STAMINA_INDEX]
-        
-
+        # The roster keeps stamina numeric; match it against the level labels
+        stamina_str = team_select_optimized_lib.format_stamina(stamina)
         if stamina_str in STAMINA_LEVELS:
             stamina_combo.set(stamina_str)
         else:
@@ -105,20 +76,8 @@ def on_calculate():
 
     score = calculate_score(skill, stamina, skill_weight, stamina_weight)
 
-    global df
-    df['skill'] = df['skill'].astype('object')
-    df['stamina'] = df['stamina'].astype('object')
-
-    if name in df['name'].values:
-        df.loc[df['name'] == name, 'tier'] = score
-        df.loc[df['name'] == name, 'skill'] = skill
-        df.loc[df['name'] == name, 'stamina'] = stamina
-        df.loc[df['name'] == name, team_select_optimized_lib.STRENGTH_KEY] = (
-            df.loc[df['name'] == name, 'tier'].apply(
-                team_select_optimized_lib.classify_strength_from_tier
-            )
-        )
-        df.to_csv(CSV_FILE, index=False, encoding='utf-8-sig')
+    if name in roster:
+        roster.update(name, tier=score, skill=skill, stamina=float(stamina))
 
     result_label.config(text=f"{name} (Tier: {score})")
 
@@ -128,17 +87,17 @@ root.title("FIFA Tool")
 root.geometry("300x620")
 
 tk.Label(root, text="Tên cầu thủ:").pack()
-name_combo = ttk.Combobox(root, values=df['name'].tolist())
+name_combo = ttk.Combobox(root, values=roster.names())
 name_combo.current(0)
 name_combo.pack()
 name_combo.bind("<<ComboboxSelected>>", update_player_fields)
 
 
 def reload_player_names():
-    global df
-    df = ensure_strength_column(pd.read_csv(CSV_FILE))
-    name_combo['values'] = df['name'].tolist()
-    if df['name'].tolist():
+    roster.flush()
+    roster.load()
+    name_combo['values'] = roster.names()
+    if len(roster):
         name_combo.current(0)
     result_label.config(text="Danh sách đã được tải lại.")
 
@@ -162,7 +121,22 @@ skill_weight_slider.set(DEFAULT_SKILL_WEIGHT)
 skill_weight_slider.pack()
 
 tk.Button(root, text="Tính điểm", command=on_calculate).pack(pady=10)
-chia_doi_btn = tk.Button(root, text="Điểm danh", command=lambda: team_select_optimized_lib.show_attendance_gui(root))
+
+
+def on_rerate_all():
+    roster.flush()
+    changed = roster_rating.rerate_roster(CSV_FILE, skill_weight_slider.get() / 100)
+    reload_player_names()
+    result_label.config(text=f"Đã tính lại điểm ({changed} thay đổi)")
+
+tk.Button(root, text="Tính lại toàn bộ", command=on_rerate_all).pack(pady=(0, 10))
+
+
+def on_attendance():
+    roster.flush()
+    team_select_optimized_lib.show_attendance_gui(root)
+
+chia_doi_btn = tk.Button(root, text="Điểm danh", command=on_attendance)
 chia_doi_btn.pack(pady=10)
 
 result_label = tk.Label(root, text="")
@@ -199,17 +173,54 @@ def on_add_new_player():
         return
 
     # Check duplicate
-    if name in df['name'].values:
+    if name in roster:
         result_label.config(text=f"{name} đã tồn tại!")
         return
 
-    # Add to CSV
-    team_select_optimized_lib.add_new_player_to_csv(name, tier, position, filename=CSV_FILE)
+    # Add to the roster (saved in the background)
+    try:
+        roster.add_player(name, tier, position)
+    except ValueError as exc:
+        result_label.config(text=str(exc))
+        return
     result_label.config(text=f"Đã thêm {name} ({tier})")
 
     # Update combobox
-    reload_player_names()
+    name_combo['values'] = roster.names()
 
 tk.Button(root, text="Thêm cầu thủ", command=on_add_new_player).pack(pady=5)
 
+def on_import_players():
+    filename = filedialog.askopenfilename(title="Nhập danh sách", filetypes=[("CSV", "*.csv")])
+    if not filename:
+        return
+    try:
+        report = roster_import.import_players(roster_import.read_import_file(filename), roster)
+    except (OSError, ValueError) as exc:
+        result_label.config(text=str(exc))
+        return
+    name_combo['values'] = roster.names()
+    result_label.config(text=roster_import.format_report(report, max_errors=5))
+
+tk.Button(root, text="Nhập danh sách (CSV)", command=on_import_players).pack(pady=5)
+
+
+def sync_roster():
+    # Tk is single-threaded, so poll here instead of running a RosterWatcher.
+    changes = roster.sync_from_disk()
+    if changes and any(changes):
+        name_combo['values'] = roster.names()
+        update_player_fields()
+    root.after(int(roster_model.POLL_INTERVAL * 1000), sync_roster)
+
+sync_roster()
+
+
+def on_close():
+    roster.close()
+    root.destroy()
+    if profiler is not None:
+        profiler.stop()
+
+root.protocol("WM_DELETE_WINDOW", on_close)
 root.mainloop()
@@ -0,0 +1,32 @@
+import random
+
+import pytest
+
+import team_select_optimized_lib as lib
+
+
+def _attendance(count=14, seed=0, gk_count=2, prefix="p", rng=None):
+    """Return ``count`` random one-decimal-tier players, the first ``gk_count`` of them GKs.
+
+    Pass ``rng`` to keep drawing from one generator across calls.
+    """
+    rng = random.Random(seed) if rng is None else rng
+    players = [
+        {
+            lib.NAME_KEY: f"{prefix}{idx}",
+            lib.TIER_KEY: round(rng.uniform(2.0, 4.5), 1),
+            lib.POSITION_KEY: rng.choice(["DF", "MF", "ST"]),
+            lib.STAMINA_KEY: rng.choice([40.0, 60.0, 80.0]),
+            lib.SKILL_KEY: rng.choice(["3 sao", "5 sao", "7 sao"]),
+        }
+        for idx in range(count)
+    ]
+    for player in players[:gk_count]:
+        player[lib.POSITION_KEY] = lib.GK_LABEL
+    return players
+
+
+@pytest.fixture
+def make_attendance():
+    """Factory fixture building random attendances, see ``_attendance``."""
+    return _attendance
@@ -0,0 +1,203 @@
+"""Exact two-team split by dynamic programming over fixed-point tiers.
+
+Tiers are one-decimal values (``calculate_score`` rounds to 0.1), so
+``TIER_SCALE`` turns them into small integers and the set of tier sums one
+team can reach becomes a bitset: bit ``s`` is set when some choice of
+players adds up to ``s``. For every line (GK, DF, MF, ST) a
+cardinality-constrained subset-sum DP keeps one bitset per number of
+players taken, so each line is split as evenly as ``balance_teams`` does
+(sizes differ by at most one). Each line's reachable sums are filtered by
+its per-line constraint, a mean-tier gap between the two halves of at most
+``config.median_limit(line)``; a line whose limit cannot be met at all is
+left unconstrained. The lines are then combined by convolving their
+bitsets, keeping team sizes within one of each other, and the reachable
+team total closest to half of all tiers is provably the best sum balance
+under those constraints. The split is rebuilt by walking the stored tables
+backwards. Attendances with finer tiers (a hand-edited 3.25, say) are
+handed to ``balance_teams`` instead of being rounded.
+
+Bitsets are Python ints of at most ``5 * TIER_SCALE * players`` bits and
+one is kept per (line, player, count), so memory is O(n^2 * max_sum) bits
+and time O(n^2 * max_sum / 64) word operations: a few milliseconds for 60
+attendees. The ``rng`` shuffles players within their line and breaks ties
+between optimal splits, so retries still explore different splits for the
+median/IQR acceptance check. Attribute refinement is skipped because its
+swaps would give up the optimal tier balance.
+
+The engine is registered as ``ENGINES["dp"]`` when this module is imported,
+which ``resolve_engine`` does the first time ``engine="dp"`` is requested,
+e.g. ``python replay_runs.py runs.jsonl --engines rounds,dp``.
+"""
+import math
+
+import team_select_optimized_lib as lib
+
+ENGINE_NAME = "dp"
+TIER_SCALE = 10     # Tiers are stored with one decimal
+FIXED_POINT_TOLERANCE = 1e-6
+LINES = lib.POSITION_ORDER
+
+
+def _is_fixed_point(tier):
+    """Return whether ``tier`` is a whole number of ``1 / TIER_SCALE`` steps (never for NaN or inf)."""
+    scaled = float(tier) * TIER_SCALE
+    return math.isfinite(scaled) and abs(scaled - round(scaled)) <= FIXED_POINT_TOLERANCE
+
+
+def _bits(value):
+    """Yield the set bit positions of ``value`` from the lowest up."""
+    while value:
+        low = value & -value
+        yield low.bit_length() - 1
+        value ^= low
+
+
+def _convolve(left, right):
+    """Return the sumset of two bitsets."""
+    if bin(left).count("1") > bin(right).count("1"):
+        left, right = right, left
+    result = 0
+    for shift in _bits(left):
+        result |= right << shift
+    return result
+
+
+def _subset_tables(weights, max_count):
+    """Cardinality-constrained subset-sum DP.
+
+    ``tables[i][k]`` is the bitset of sums reachable with ``k`` of the first
+    ``i`` weights.
+    """
+    row = [1] + [0] * max_count
+    tables = [row]
+    for weight in weights:
+        row = [row[0]] + [row[k] | (row[k - 1] << weight) for k in range(1, max_count + 1)]
+        tables.append(row)
+    return tables
+
+
+def _pick_subset(tables, weights, count, total):
+    """Return indices of ``count`` weights summing to ``total`` from the DP tables."""
+    chosen = []
+    for idx in range(len(weights), 0, -1):
+        weight = weights[idx - 1]
+        if count and total >= weight and tables[idx - 1][count - 1] >> (total - weight) & 1:
+            chosen.append(idx - 1)
+            count -= 1
+            total -= weight
+    return chosen
+
+
+def _line_options(weights, limit):
+    """Return ``(count, bitset)`` options for team one's share of a line.
+
+    Counts are the floor/ceil halves of the line. With a ``limit``, only sums
+    whose mean-tier gap to the other half is within it are kept, unless no
+    sum qualifies.
+    """
+    size = len(weights)
+    counts = sorted({size // 2, (size + 1) // 2})
+    tables = _subset_tables(weights, counts[-1])
+    total = sum(weights)
+    options = [(count, tables[-1][count]) for count in counts]
+    if limit is None or not all(0 < count < size for count in counts):
+        return tables, options
+
+    bound = limit * TIER_SCALE
+    constrained = []
+    for count, reach in options:
+        other = size - count
+        allowed = 0
+        for reach_sum in _bits(reach):
+            # |sum/count - (total-sum)/other| <= bound, kept in integers.
+            if abs(reach_sum * other - (total - reach_sum) * count) <= bound * count * other + 1e-9:
+                allowed |= 1 << reach_sum
+        constrained.append((count, allowed))
+    if any(allowed for _, allowed in constrained):
+        options = constrained
+    return tables, options
+
+
+def _players_by_line(players, config):
+    """Group players by line the way ``balance_teams`` does, classifying strength."""
+    by_line = {line: [] for line in LINES}
+    for player in players:
+        position = lib.normalize_position(player.get(lib.POSITION_KEY, ""))
+        player[lib.POSITION_KEY] = position
+        if position not in by_line:
+            raise ValueError(f"Unsupported position '{position}' for {player[lib.NAME_KEY]}.")
+        by_line[position].append(player)
+        player[lib.STRENGTH_KEY] = lib.classify_strength_from_tier(player[lib.TIER_KEY], config)
+    return by_line
+
+
+def dp_balance_teams(players, team_count=None, attribute_weights=None, config=None, rng=None):
+    """Split ``players`` into two teams with the smallest possible tier-sum gap.
+
+    Other team counts, and tiers that are not whole multiples of
+    ``1 / TIER_SCALE`` (rounding them would make the split only approximately
+    optimal), fall back to ``balance_teams``.
+    """
+    config = config or lib.DEFAULT_CONFIG
+    team_count = config.team_count if team_count is None else team_count
+    rng = config.rng() if rng is None else rng
+    if team_count != 2 or not all(_is_fixed_point(player[lib.TIER_KEY]) for player in players):
+        return lib.balance_teams(players, team_count, attribute_weights, config, rng)
+
+    by_line = _players_by_line(players, config)
+    if lib.REQUIRE_GK_PER_TEAM and len(by_line[lib.GK_LABEL]) < 2:
+        raise ValueError(f"Not enough {lib.GK_LABEL}s. At least 2 are required.")
+    limits = dict(config.median_delta)
+
+    # stages[j] maps team one's size surplus (its size minus the other's) to
+    # the bitset of team-one totals reachable with the first j lines.
+    stages = [{0: 1}]
+    lines = []
+    for line in LINES:
+        members = list(by_line[line])
+        rng.shuffle(members)
+        weights = [int(round(float(player[lib.TIER_KEY]) * TIER_SCALE)) for player in members]
+        tables, options = _line_options(weights, limits.get(line))
+        lines.append((members, weights, tables, options))
+        stage = {}
+        for surplus, reach in stages[-1].items():
+            for count, line_reach in options:
+                if line_reach:
+                    key = surplus + 2 * count - len(members)
+                    stage[key] = stage.get(key, 0) | _convolve(reach, line_reach)
+        stages.append(stage)
+
+    total = sum(sum(weights) for _, weights, _, _ in lines)
+    candidates = [
+        (abs(2 * reach_sum - total), surplus, reach_sum)
+        for surplus, reach in stages[-1].items() if abs(surplus) <= 1
+        for reach_sum in _bits(reach)
+    ]
+    if not candidates:
+        raise ValueError("No split keeps the line and team sizes even.")
+    best_gap = min(gap for gap, _, _ in candidates)
+    _, surplus, reach_sum = rng.choice([candidate for candidate in candidates if candidate[0] == best_gap])
+
+    teams = [[], []]
+    for stage_idx in range(len(lines), 0, -1):
+        members, weights, tables, options = lines[stage_idx - 1]
+        previous = stages[stage_idx - 1]
+        for count, line_reach in rng.sample(options, len(options)):
+            before = previous.get(surplus - (2 * count - len(members)), 0)
+            line_sum = next(
+                (value for value in _bits(line_reach) if value <= reach_sum and before >> (reach_sum - value) & 1),
+                None,
+            )
+            if line_sum is not None:
+                break
+        chosen = set(_pick_subset(tables, weights, count, line_sum))
+        teams[0][:0] = [player for idx, player in enumerate(members) if idx in chosen]
+        teams[1][:0] = [player for idx, player in enumerate(members) if idx not in chosen]
+        surplus -= 2 * count - len(members)
+        reach_sum -= line_sum
+
+    rng.shuffle(teams)
+    return teams
+
+
+lib.ENGINES[ENGINE_NAME] = dp_balance_teams
@@ -3,3 +3,13 @@
 DEFAULT_MEDIAN_DELTA = {"DF": 0.20, "MF": 0.20, "ST": 0.65}
 DEFAULT_IQR_DELTA = {"DF": 0.80, "MF": 0.40, "ST": 1.30}
 MAX_RETRIES = 3
+
+# Relative weight of each player attribute in the team balance objective.
+ATTRIBUTE_WEIGHTS = {"tier": 1.0, "stamina": 0.5, "skill": 0.5}
+# Same-line swaps used to even out attributes may change tiers by at most this much.
+ATTRIBUTE_SWAP_TIER_TOLERANCE = 0.2
+
+# Win-probability acceptance: simulated matches per candidate split and the
+# largest accepted gap between the best and worst team's win probability.
+WIN_SIMULATIONS = 10000
+WIN_PROBABILITY_TOLERANCE = 0.10
@@ -0,0 +1,138 @@
+"""Append-only binary log of played matches, memory-mapped with NumPy.
+
+Each match is one fixed-width record holding the roster ids of the players,
+their tiers at the time, one bitmask per team over the player slots and the
+goals scored. Appending writes one record at the end of the file, and
+analytics read the whole log through ``np.memmap`` without parsing it.
+Player names are kept in a sidecar ``.names`` file, one per line; a player's
+roster id is its line number.
+"""
+import time
+from pathlib import Path
+
+import numpy as np
+
+import team_select_optimized_lib as lib
+
+MAX_PLAYERS = 64        # Player slots per match; team bitmasks are 64-bit
+MAX_TEAMS = 8
+NO_RESULT = -1          # Goals value for matches whose result is not known yet
+HEADER_MAGIC = b"RSQHIST1"
+HEADER_SIZE = 64
+
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<i8"),
+    ("player_count", "<u2"),
+    ("team_count", "<u2"),
+    ("players", "<i4", (MAX_PLAYERS,)),
+    ("tiers", "<f4", (MAX_PLAYERS,)),
+    ("team_masks", "<u8", (MAX_TEAMS,)),
+    ("goals", "<i2", (MAX_TEAMS,)),
+])
+
+
+class MatchHistory:
+    """Fixed-width match log with O(1) appends and zero-copy reads."""
+
+    def __init__(self, filename):
+        self.path = Path(filename)
+        self.names_path = self.path.with_name(self.path.name + ".names")
+        self._names = []
+        self._ids = {}
+        self._view = None
+
+        if not self.path.exists():
+            header = HEADER_MAGIC + np.uint32(RECORD_DTYPE.itemsize).tobytes()
+            self.path.write_bytes(header.ljust(HEADER_SIZE, b"\0"))
+        else:
+            header = self.path.read_bytes()[:HEADER_SIZE]
+            itemsize = int(np.frombuffer(header[8:12], dtype="<u4")[0]) if len(header) >= 12 else 0
+            if not header.startswith(HEADER_MAGIC) or itemsize != RECORD_DTYPE.itemsize:
+                raise ValueError(f"{self.path} is not a match history file of this version.")
+
+        if self.names_path.exists():
+            for name in self.names_path.read_text(encoding=lib.DEFAULT_ENCODING).splitlines():
+                self._ids[name] = len(self._names)
+                self._names.append(name)
+
+    def __len__(self):
+        return (self.path.stat().st_size - HEADER_SIZE) // RECORD_DTYPE.itemsize
+
+    @property
+    def names(self):
+        return list(self._names)
+
+    def player_id(self, name):
+        """Return the roster id of ``name``, registering new names."""
+        if name not in self._ids:
+            with open(self.names_path, "a", encoding=lib.DEFAULT_ENCODING) as handle:
+                handle.write(name + "\n")
+            self._ids[name] = len(self._names)
+            self._names.append(name)
+        return self._ids[name]
+
+    def append(self, teams, goals=None, timestamp=None):
+        """Append one match and return its record index."""
+        if len(teams) > MAX_TEAMS:
+            raise ValueError(f"At most {MAX_TEAMS} teams can be stored per match.")
+        players = [player for team in teams for player in team]
+        if len(players) > MAX_PLAYERS:
+            raise ValueError(f"At most {MAX_PLAYERS} players can be stored per match.")
+
+        record = np.zeros(1, dtype=RECORD_DTYPE)[0]
+        record["timestamp"] = int(time.time() if timestamp is None else timestamp)
+        record["player_count"] = len(players)
+        record["team_count"] = len(teams)
+        record["players"][:] = -1
+        record["goals"][:] = NO_RESULT
+
+        slot = 0
+        for team_idx, team in enumerate(teams):
+            mask = 0
+            for player in team:
+                record["players"][slot] = self.player_id(player[lib.NAME_KEY])
+                record["tiers"][slot] = float(player[lib.TIER_KEY])
+                mask |= 1 << slot
+                slot += 1
+            record["team_masks"][team_idx] = mask
+        if goals is not None:
+            record["goals"][:len(goals)] = goals
+
+        index = len(self)
+        with open(self.path, "ab") as handle:
+            handle.write(record.tobytes())
+        self._view = None
+        return index
+
+    def set_result(self, index, goals):
+        """Store the goals of an already recorded match in place."""
+        record = np.memmap(
+            self.path, dtype=RECORD_DTYPE, mode="r+", offset=HEADER_SIZE + index * RECORD_DTYPE.itemsize, shape=(1,)
+        )
+        record["goals"][0, :] = NO_RESULT
+        record["goals"][0, :len(goals)] = goals
+        record.flush()
+        del record
+        self._view = None
+
+    def records(self):
+        """Return a read-only memory-mapped view of every record."""
+        count = len(self)
+        if count == 0:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        if self._view is None or len(self._view) != count:
+            self._view = np.memmap(self.path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+        return self._view
+
+    def team_labels(self, records=None):
+        """Return a (matches, MAX_PLAYERS) int8 array of team indices, -1 for empty slots."""
+        records = self.records() if records is None else records
+        slots = np.arange(MAX_PLAYERS, dtype=np.uint64)
+        in_team = (records["team_masks"][:, :, None] >> slots) & np.uint64(1)
+        labels = np.where(in_team.any(axis=1), in_team.argmax(axis=1), -1)
+        return labels.astype(np.int8)
+
+    def appearances(self):
+        """Return how many recorded matches each roster id played."""
+        players = self.records()["players"]
+        return np.bincount(players[players >= 0], minlength=len(self._names))
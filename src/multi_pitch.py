@@ -0,0 +1,120 @@
+"""Split a large attendance over several pitches played at the same time.
+
+Attendees are first partitioned into ``match_count`` matches with balanced
+overall strength and enough GKs for every team, then each match is balanced
+into teams with ``generate_balanced_teams``. Matches are independent, so they
+are solved in parallel on a process pool: one passed in by the caller, or a
+pool shared by every call in this process that is started on first use and
+shut down at exit. Frozen (PyInstaller) entry points must call
+``multiprocessing.freeze_support()`` first so pool workers do not re-run the
+app.
+"""
+import atexit
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import team_select_optimized_lib as lib
+from fairness_config import ATTRIBUTE_WEIGHTS, MAX_RETRIES
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def _shared_executor(max_workers=None):
+    """Return the module's process pool, starting it with ``max_workers`` on first use."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = ProcessPoolExecutor(max_workers=max_workers)
+            atexit.register(shutdown_shared_pool)
+        return _shared_pool
+
+
+def shutdown_shared_pool():
+    """Stop the shared pool's workers (also run at exit); the next ``balance_matches`` starts a new one."""
+    global _shared_pool
+    with _shared_pool_lock:
+        pool, _shared_pool = _shared_pool, None
+    if pool is not None:
+        atexit.unregister(shutdown_shared_pool)
+        pool.shutdown(cancel_futures=True)
+
+
+def partition_matches(players, match_count, team_count=2, rng=None):
+    """Partition players into ``match_count`` groups of similar size and strength.
+
+    GKs are dealt first so that every match gets ``team_count`` of them, then
+    each line is dealt in tier rounds with leftovers going to the weakest
+    match, mirroring how ``balance_teams`` deals players to teams. ``rng``
+    defaults to the ``random`` module.
+    """
+    if match_count < 1:
+        raise ValueError("At least one match is required.")
+    rng = random if rng is None else rng
+
+    lib.assign_player_lines(players, team_count=team_count)
+    players_by_position = {position: [] for position in lib.POSITION_ORDER}
+    for player in players:
+        position = lib.normalize_position(player.get(lib.POSITION_KEY, ""))
+        player[lib.POSITION_KEY] = position
+        if position not in players_by_position:
+            raise ValueError(f"Unsupported position '{position}' for {player[lib.NAME_KEY]}.")
+        players_by_position[position].append(player)
+
+    gk_players = sorted(players_by_position[lib.GK_LABEL], key=lambda p: p[lib.TIER_KEY], reverse=True)
+    required_gk = match_count * team_count
+    if lib.REQUIRE_GK_PER_TEAM and len(gk_players) < required_gk:
+        raise ValueError(
+            f"Not enough {lib.GK_LABEL}s. At least {required_gk} are required for {match_count} matches."
+        )
+
+    matches = [[] for _ in range(match_count)]
+    match_scores = [0.0] * match_count
+    for _ in range(team_count):
+        lib.assign_players_in_rounds(matches, gk_players[:match_count], match_scores, match_count, rng)
+        gk_players = gk_players[match_count:]
+
+    for position in ["DF", "MF", "ST"]:
+        if players_by_position[position]:
+            lib.assign_players_in_rounds(matches, players_by_position[position], match_scores, match_count, rng)
+
+    if gk_players:
+        lib.assign_players_in_rounds(matches, gk_players, match_scores, match_count, rng)
+
+    return matches
+
+
+def _balance_match(players, team_count, max_retries, attribute_weights, config):
+    """Process-pool worker: balance one match with the random stream of its config."""
+    selection = lib.generate_balanced_teams(
+        players, team_count=team_count, max_retries=max_retries, attribute_weights=attribute_weights, config=config
+    )
+    selection.pop("attempts_evaluated", None)
+    return selection
+
+
+def balance_matches(players, match_count, team_count=2, max_retries=MAX_RETRIES,
+                    attribute_weights=ATTRIBUTE_WEIGHTS, max_workers=None, config=None, executor=None):
+    """Partition attendees into matches and balance the teams of every match.
+
+    Returns one ``generate_balanced_teams`` payload per match, without the
+    per-attempt history. The partition and the per-match seeds come from
+    ``config``'s random stream. Matches run on ``executor`` when given,
+    otherwise on the shared pool; with ``max_workers=1`` or a single match
+    the work stays in this process, which avoids the pool overhead.
+    """
+    config = config or lib.DEFAULT_CONFIG
+    rng = config.rng()
+    matches = partition_matches(players, match_count, team_count=team_count, rng=rng)
+    args = [
+        (match, team_count, max_retries, attribute_weights, config.replace(seed=rng.getrandbits(32)))
+        for match in matches
+    ]
+
+    if executor is None and (max_workers == 1 or len(matches) == 1):
+        return [_balance_match(*item) for item in args]
+
+    executor = executor or _shared_executor(max_workers)
+    futures = [executor.submit(_balance_match, *item) for item in args]
+    return [future.result() for future in futures]
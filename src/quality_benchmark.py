@@ -0,0 +1,252 @@
+"""Statistical quality benchmark of the balancing engines.
+
+Speed alone says little about the split quality users see. This benchmark
+runs ``generate_balanced_teams`` over many attendances (synthetic ones and,
+optionally, recorded ones from the match history or a run log) for every
+engine and retry budget on a process pool. For each combination it reports
+the fallback rate, ``violation_score`` percentiles, the balance-difference
+distribution and latency, which together give a quality-versus-latency
+curve per engine. A sample of attendances is also re-run under
+``AllocationTracker``, and the run fails when any attempt allocates more
+than the per-attempt budget.
+
+Usage: python quality_benchmark.py --synthetic 20000 --retries 1,3,10,30 --engines rounds
+"""
+import argparse
+import importlib
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+import team_select_optimized_lib as lib
+from alloc_tracking import ATTEMPT_ALLOCATION_BUDGET, AllocationTracker, format_summary
+from fairness_config import MAX_RETRIES
+
+SYNTHETIC_COUNT = 2000
+ALLOCATION_SAMPLE = 200      # Attendances re-run under tracemalloc per engine
+TASK_CHUNK = 250             # Attendances per process-pool task
+TIER_MEAN = 3.2
+TIER_SPREAD = 0.5
+LINE_SHARES = {"DF": 0.35, "MF": 0.4, "ST": 0.25}
+PLAYERS_PER_TEAM = (5, 11)  # Inclusive range of outfield+GK players per team
+
+
+def synthetic_attendances(count=SYNTHETIC_COUNT, team_count=2, seed=None):
+    """Return ``count`` random two-team attendances with realistic line mixes."""
+    rng = np.random.default_rng(seed)
+    attendances = []
+    lines = list(LINE_SHARES)
+    shares = np.array([LINE_SHARES[line] for line in lines])
+    for match in range(count):
+        size = int(rng.integers(PLAYERS_PER_TEAM[0], PLAYERS_PER_TEAM[1] + 1)) * team_count
+        gk_count = team_count + int(rng.random() < 0.2)
+        positions = [lib.GK_LABEL] * gk_count + list(rng.choice(lines, size=size - gk_count, p=shares))
+        tiers = np.clip(rng.normal(TIER_MEAN, TIER_SPREAD, size=size), 1.0, 5.0).round(1)
+        attendances.append([
+            {lib.NAME_KEY: f"S{match}-{idx}", lib.TIER_KEY: float(tier), lib.POSITION_KEY: position}
+            for idx, (tier, position) in enumerate(zip(tiers, positions))
+        ])
+    return attendances
+
+
+def recorded_attendances(history_path=None, log_path=None, roster_path=lib.CSV_FILE):
+    """Collect real attendances from a match history and/or a run log."""
+    attendances = []
+    if history_path and Path(history_path).exists():
+        from match_history import MatchHistory
+        from roster_model import RosterModel
+        from threshold_sweep import attendance_corpus
+
+        roster = RosterModel(roster_path)
+        try:
+            attendances += attendance_corpus(MatchHistory(history_path), roster)
+        finally:
+            roster.close()
+    if log_path and Path(log_path).exists():
+        from replay_runs import load_log
+        from roster_stream import stream_roster
+
+        roster = stream_roster(roster_path)
+        for record in load_log(log_path):
+            rows = roster.rows_of(record["attendance"])
+            if None not in rows:
+                attendances.append(roster.players(rows))
+    return attendances
+
+
+def run_chunk(attendances, engine, retries, seed, modules=()):
+    """Process-pool worker: balance each attendance once.
+
+    Returns ``(latency, fallback, violation_score, balance_diff)`` arrays;
+    attendances that cannot be split are left out.
+    """
+    for module in modules:
+        importlib.import_module(module)
+    config = lib.DEFAULT_CONFIG.replace(seed=seed)
+    latency, fallback, violation, balance = [], [], [], []
+    for idx, attendance in enumerate(attendances):
+        players = [dict(player) for player in attendance]
+        start = time.perf_counter()
+        try:
+            selection = lib.generate_balanced_teams(
+                players, team_count=2, max_retries=retries, config=config.replace(seed=seed + idx), engine=engine
+            )
+        except ValueError:
+            continue
+        latency.append(time.perf_counter() - start)
+        scores = [lib.evaluate_team(team) for team in selection["teams"]]
+        fallback.append(selection["selection"] != "accepted")
+        violation.append(selection["fairness"]["violation_score"])
+        balance.append(max(scores) - min(scores))
+    return np.array(latency), np.array(fallback, dtype=bool), np.array(violation), np.array(balance)
+
+
+def allocation_chunk(attendances, engine, retries, budget, seed, modules=()):
+    """Process-pool worker: track allocations while balancing each attendance.
+
+    Returns the tracker summary and the attempts that exceeded ``budget``.
+    """
+    for module in modules:
+        importlib.import_module(module)
+    with AllocationTracker() as tracker:
+        for idx, attendance in enumerate(attendances):
+            players = [dict(player) for player in attendance]
+            try:
+                lib.generate_balanced_teams(
+                    players, team_count=2, max_retries=retries,
+                    config=lib.DEFAULT_CONFIG.replace(seed=seed + idx), engine=engine, tracker=tracker,
+                )
+            except ValueError:
+                continue
+    return tracker.summary(), tracker.over_budget(budget)
+
+
+def allocation_check(attendances, engines, retries=MAX_RETRIES, budget=ATTEMPT_ALLOCATION_BUDGET,
+                     modules=(), max_workers=None, seed=0):
+    """Run ``attendances`` under tracemalloc per engine; returns ``{engine: (summary, over_budget)}``.
+
+    With ``max_workers`` of 1 or less the engines run in this process.
+    """
+    for module in modules:
+        importlib.import_module(module)
+    tasks = [(attendances, engine, retries, budget, seed, tuple(modules)) for engine in engines]
+    if max_workers is not None and max_workers <= 1:
+        return {engine: allocation_chunk(*task) for engine, task in zip(engines, tasks)}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(engines, executor.map(allocation_chunk, *zip(*tasks))))
+
+
+def benchmark(attendances, engines, retry_budgets, modules=(), max_workers=None, seed=0):
+    """Run every attendance for every (engine, retries) pair on a process pool.
+
+    Returns ``{(engine, retries): stats}`` with fallback rate, violation score
+    p50/p90/p99, balance difference mean/p50/p90 and latency mean/p95 in ms.
+    """
+    for module in modules:
+        importlib.import_module(module)
+    unknown = [engine for engine in engines if engine not in lib.ENGINES and engine not in lib.ENGINE_MODULES]
+    if unknown:
+        raise ValueError(f"Unknown balancing engine(s): {', '.join(unknown)}.")
+
+    chunks = [attendances[start:start + TASK_CHUNK] for start in range(0, len(attendances), TASK_CHUNK)]
+    combos = [(engine, retries) for engine in engines for retries in retry_budgets]
+    tasks = [
+        (chunk, engine, retries, seed + idx * TASK_CHUNK, tuple(modules))
+        for engine, retries in combos
+        for idx, chunk in enumerate(chunks)
+    ]
+    if max_workers is not None and max_workers <= 1:
+        results = [run_chunk(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(run_chunk, *zip(*tasks)))
+
+    stats = {}
+    for combo_idx, combo in enumerate(combos):
+        parts = results[combo_idx * len(chunks):(combo_idx + 1) * len(chunks)]
+        latency, fallback, violation, balance = (np.concatenate(column) for column in zip(*parts))
+        if not len(latency):
+            continue
+        latency_ms = latency * 1000
+        stats[combo] = {
+            "runs": len(latency),
+            "fallback_rate": float(fallback.mean()),
+            "violation_p50": float(np.percentile(violation, 50)),
+            "violation_p90": float(np.percentile(violation, 90)),
+            "violation_p99": float(np.percentile(violation, 99)),
+            "balance_mean": float(balance.mean()),
+            "balance_p50": float(np.percentile(balance, 50)),
+            "balance_p90": float(np.percentile(balance, 90)),
+            "latency_mean_ms": float(latency_ms.mean()),
+            "latency_p95_ms": float(np.percentile(latency_ms, 95)),
+        }
+    return stats
+
+
+def format_benchmark(stats):
+    """Render the quality-versus-latency curve, one block per engine."""
+    lines = []
+    for engine in dict.fromkeys(engine for engine, _ in stats):
+        lines.append(f"Engine {engine}:")
+        lines.append("  retries | runs   | fallback | viol p50/p90/p99  | diff mean/p50/p90 | ms mean/p95")
+        for (name, retries), row in sorted(stats.items(), key=lambda item: item[0][1]):
+            if name != engine:
+                continue
+            lines.append(
+                f"  {retries:7d} | {row['runs']:6d} | {row['fallback_rate']:8.1%} | "
+                f"{row['violation_p50']:.2f}/{row['violation_p90']:.2f}/{row['violation_p99']:.2f} | "
+                f"{row['balance_mean']:.2f}/{row['balance_p50']:.2f}/{row['balance_p90']:.2f}    | "
+                f"{row['latency_mean_ms']:.2f}/{row['latency_p95_ms']:.2f}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--synthetic", type=int, default=SYNTHETIC_COUNT, help="number of synthetic attendances")
+    parser.add_argument("--history", help="MatchHistory log with recorded attendances")
+    parser.add_argument("--log", help="run log (SQUAD_RUN_LOG) with recorded attendances")
+    parser.add_argument("--roster", default=lib.CSV_FILE, help="roster CSV for recorded attendances")
+    parser.add_argument("--engines", default="rounds", help="comma-separated engine names")
+    parser.add_argument("--retries", default=f"1,{MAX_RETRIES},10,30", help="comma-separated retry budgets")
+    parser.add_argument("--import", dest="modules", action="append", default=[],
+                        help="module to import first so it can register extra engines")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--alloc-sample", type=int, default=ALLOCATION_SAMPLE,
+                        help="attendances re-run under tracemalloc per engine (0 skips the check)")
+    parser.add_argument("--alloc-budget", type=int, default=ATTEMPT_ALLOCATION_BUDGET,
+                        help="bytes a single attempt may allocate at its peak")
+    args = parser.parse_args(argv)
+
+    attendances = synthetic_attendances(args.synthetic, seed=args.seed)
+    attendances += recorded_attendances(args.history, args.log, args.roster)
+    if not attendances:
+        parser.error("No attendances to benchmark.")
+    engines = [engine.strip() for engine in args.engines.split(",") if engine.strip()]
+    retry_budgets = [int(value) for value in args.retries.split(",") if value.strip()]
+    stats = benchmark(attendances, engines, retry_budgets, args.modules, args.workers, args.seed)
+    print(format_benchmark(stats))
+
+    if args.alloc_sample > 0:
+        checks = allocation_check(
+            attendances[:args.alloc_sample], engines, budget=args.alloc_budget,
+            modules=args.modules, max_workers=args.workers, seed=args.seed,
+        )
+        failures = []
+        for engine, (summary, over_budget) in checks.items():
+            print(f"\nAllocations, engine {engine}:")
+            print(format_summary(summary))
+            if over_budget:
+                worst = max(record["peak"] for record in over_budget)
+                failures.append(f"{engine}: {len(over_budget)} attempts over budget (worst {worst} bytes)")
+        if failures:
+            parser.exit(1, f"Allocation budget of {args.alloc_budget} bytes exceeded:\n" + "\n".join(failures) + "\n")
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,35 @@
+"""Rating scales shared by the skill and stamina columns of ``players.csv``."""
+
+SKILL_LEVELS = ["1 sao", "2 sao", "3 sao", "4 sao", "5 sao", "6 sao", "7 sao", "8 sao", "9 sao", "10 sao", "siêu sao"]
+STAMINA_LEVELS = ["0", "10", "20", "30", "40", "50", "60", "70", "80", "90", "100"]
+
+SKILL_MAPPING = {
+    "1 sao": 0.0,
+    "2 sao": 0.1,
+    "3 sao": 0.2,
+    "4 sao": 0.3,
+    "5 sao": 0.4,
+    "6 sao": 0.5,
+    "7 sao": 0.6,
+    "8 sao": 0.7,
+    "9 sao": 0.8,
+    "10 sao": 0.9,
+    "siêu sao": 1.0,
+}
+
+STAMINA_MAPPING = {
+    "0": 0.0,
+    "10": 0.1,
+    "20": 0.2,
+    "30": 0.3,
+    "40": 0.4,
+    "50": 0.5,
+    "60": 0.6,
+    "70": 0.7,
+    "80": 0.8,
+    "90": 0.9,
+    "100": 1.0,
+}
+
+MIN_POINT = 1.0
+MAX_POINT = 4.0  # final score = MIN_POINT + normalized * MAX_POINT
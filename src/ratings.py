@@ -0,0 +1,103 @@
+"""Elo-style player ratings learned from recorded match results.
+
+Ratings are recomputed from a ``MatchHistory`` log. Matches are grouped into
+rating periods (by default one calendar day, i.e. one league night); every
+match of a period is scored against the ratings at the start of the period,
+so a whole period is one batch of NumPy gathers and one scatter-add. Ratings
+map linearly onto the ``tier`` scale used by the balancer.
+"""
+import numpy as np
+import pandas as pd
+
+import team_select_optimized_lib as lib
+from match_history import NO_RESULT
+from rating_scales import MIN_POINT, MAX_POINT
+
+BASE_RATING = 1500.0
+TIER_CENTER = 3.0          # Tier that maps onto BASE_RATING
+RATING_PER_TIER = 200.0    # Rating points per tier point
+K_FACTOR = 24.0            # Rating points exchanged per fully unexpected result
+PERIOD_SECONDS = 86400     # Matches within one period are rated as a batch
+
+
+def tiers_to_ratings(tiers):
+    return BASE_RATING + (np.asarray(tiers, dtype=float) - TIER_CENTER) * RATING_PER_TIER
+
+
+def ratings_to_tiers(ratings):
+    """Map ratings to tiers, clipped to the point scale and rounded to 0.1."""
+    tiers = TIER_CENTER + (np.asarray(ratings, dtype=float) - BASE_RATING) / RATING_PER_TIER
+    return np.round(np.clip(tiers, MIN_POINT, MIN_POINT + MAX_POINT), 1)
+
+
+def _initial_ratings(records, player_total):
+    """Seed every player from the tier recorded at their first appearance."""
+    ratings = np.full(player_total, BASE_RATING)
+    ids = records["players"].ravel()
+    tiers = records["tiers"].ravel()
+    valid = ids >= 0
+    seen, first = np.unique(ids[valid], return_index=True)
+    ratings[seen] = tiers_to_ratings(tiers[valid][first])
+    return ratings
+
+
+def compute_ratings(history, k_factor=K_FACTOR, period_seconds=PERIOD_SECONDS):
+    """Recompute every player's rating from the full match history.
+
+    Only two-team matches with a recorded result are rated. Returns an array
+    indexed by the history's roster ids.
+    """
+    records = history.records()
+    player_total = len(history.names)
+    ratings = _initial_ratings(records, player_total)
+
+    rated = (records["team_count"] == 2) & (records["goals"][:, 0] != NO_RESULT) & (
+        records["goals"][:, 1] != NO_RESULT
+    )
+    records = records[rated]
+    if not len(records):
+        return ratings
+
+    labels = history.team_labels(records)
+    ids = records["players"]
+    goals = records["goals"][:, :2].astype(float)
+    actual = np.where(goals[:, 0] > goals[:, 1], 1.0, np.where(goals[:, 0] == goals[:, 1], 0.5, 0.0))
+    on_a = labels == 0
+    on_b = labels == 1
+
+    periods = records["timestamp"] // max(1, int(period_seconds))
+    bounds = np.flatnonzero(np.diff(periods)) + 1
+    for rows in np.split(np.arange(len(records)), bounds):
+        current = np.where(ids[rows] >= 0, ratings[ids[rows]], 0.0)
+        mean_a = (current * on_a[rows]).sum(axis=1) / np.maximum(on_a[rows].sum(axis=1), 1)
+        mean_b = (current * on_b[rows]).sum(axis=1) / np.maximum(on_b[rows].sum(axis=1), 1)
+        expected = 1.0 / (1.0 + 10.0 ** ((mean_b - mean_a) / 400.0))
+        delta = k_factor * (actual[rows] - expected)
+
+        slot_delta = np.where(on_a[rows], delta[:, None], 0.0) - np.where(on_b[rows], delta[:, None], 0.0)
+        played = ids[rows] >= 0
+        np.add.at(ratings, ids[rows][played], slot_delta[played])
+
+    return ratings
+
+
+def rated_tiers(history, **kwargs):
+    """Return ``{name: tier}`` for every player in the history."""
+    tiers = ratings_to_tiers(compute_ratings(history, **kwargs))
+    return dict(zip(history.names, tiers.tolist()))
+
+
+def apply_ratings_to_csv(history, filename=lib.CSV_FILE, **kwargs):
+    """Write rated tiers back onto the ``tier`` column in a single CSV write.
+
+    Players missing from the history keep their hand-set tier. Returns the
+    number of players whose tier changed.
+    """
+    tiers = rated_tiers(history, **kwargs)
+    df = pd.read_csv(filename, encoding=lib.DEFAULT_ENCODING)
+    new_tiers = df[lib.NAME_KEY].map(tiers)
+    changed = new_tiers.notna() & (new_tiers != df[lib.TIER_KEY])
+    df[lib.TIER_KEY] = new_tiers.fillna(df[lib.TIER_KEY])
+    df[lib.STRENGTH_KEY] = lib.strength_column(df[lib.TIER_KEY])
+    df.to_csv(filename, index=False, encoding=lib.DEFAULT_ENCODING)
+    return int(changed.sum())
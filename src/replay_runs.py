@@ -0,0 +1,176 @@
+"""Replay logged team assignments against one or more balancing engines.
+
+``run_team_assignment`` can append its inputs to a JSON-lines log (see
+``RUN_LOG_ENV``): roster path and content hash, attendance, thresholds,
+fairness limits, seed, criterion, retry budget and attribute weights. This
+tool re-runs every logged assignment with each requested engine on a
+process pool, using the logged seed and weights so runs are comparable,
+and reports latency and fairness quality per engine together with the
+deltas against the first engine.
+
+Usage: python replay_runs.py runs.jsonl --engines rounds,dp
+"""
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import team_select_optimized_lib as lib
+from roster_stream import stream_roster
+
+_rosters = {}
+
+
+def load_log(path):
+    """Return the records of a run log, skipping blank lines."""
+    with open(path, encoding=lib.DEFAULT_ENCODING) as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def _roster_arrays(filename):
+    """Stream and hash a roster once per worker process, again only when its mtime or size changes."""
+    stat = os.stat(filename)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _rosters.get(filename)
+    if cached is None or cached[0] != stamp:
+        cached = _rosters[filename] = (stamp, lib.roster_hash(filename), stream_roster(filename))
+    return cached[1:]
+
+
+def replay_one(record, engine, modules=()):
+    """Re-run one logged assignment with ``engine`` and return its metrics."""
+    for module in modules:
+        importlib.import_module(module)
+    digest, roster = _roster_arrays(record["roster"])
+    if digest != record["roster_hash"]:
+        return {"engine": engine, "skipped": "roster changed"}
+    rows = roster.rows_of(record["attendance"])
+    if None in rows:
+        return {"engine": engine, "skipped": "player missing"}
+    players = roster.players(rows)
+
+    start = time.perf_counter()
+    try:
+        selection = lib.generate_balanced_teams(
+            players,
+            team_count=record["team_count"],
+            max_retries=record["max_retries"],
+            attribute_weights=lib.attribute_weights_from_log(record),
+            criterion=record["criterion"],
+            config=lib.config_from_log(record),
+            engine=engine,
+        )
+    except ValueError as exc:
+        return {"engine": engine, "skipped": str(exc)}
+    latency = time.perf_counter() - start
+
+    scores = [lib.evaluate_team(team) for team in selection["teams"]]
+    return {
+        "engine": engine,
+        "latency": latency,
+        "fallback": selection["selection"] != "accepted",
+        "violation_score": selection["fairness"]["violation_score"],
+        "balance_diff": max(scores) - min(scores),
+        "attribute_imbalance": selection["attributes"]["imbalance"],
+    }
+
+
+def replay(records, engines, modules=(), max_workers=None):
+    """Replay every record with every engine; returns ``{engine: [metrics per record]}``."""
+    for module in modules:
+        importlib.import_module(module)
+    unknown = [engine for engine in engines if engine not in lib.ENGINES and engine not in lib.ENGINE_MODULES]
+    if unknown:
+        raise ValueError(f"Unknown balancing engine(s): {', '.join(unknown)}.")
+
+    tasks = [(record, engine, tuple(modules)) for record in records for engine in engines]
+    if max_workers == 1:
+        results = [replay_one(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(replay_one, *zip(*tasks)))
+
+    per_engine = {engine: [] for engine in engines}
+    for result in results:
+        per_engine[result["engine"]].append(result)
+    return per_engine
+
+
+def summarize(per_engine):
+    """Aggregate replay metrics per engine, with deltas against the first engine.
+
+    Deltas only use records every engine managed to replay.
+    """
+    engines = list(per_engine)
+    usable = [
+        all("skipped" not in per_engine[engine][idx] for engine in engines)
+        for idx in range(len(per_engine[engines[0]]))
+    ]
+    summary = {}
+    baseline = None
+    for engine in engines:
+        runs = [run for run, ok in zip(per_engine[engine], usable) if ok]
+        latency = np.array([run["latency"] for run in runs]) * 1000
+        stats = {
+            "runs": len(runs),
+            "skipped": usable.count(False),
+            "latency_p50_ms": float(np.percentile(latency, 50)) if runs else float("nan"),
+            "latency_p95_ms": float(np.percentile(latency, 95)) if runs else float("nan"),
+            "fallback_rate": float(np.mean([run["fallback"] for run in runs])) if runs else float("nan"),
+            "mean_violation": float(np.mean([run["violation_score"] for run in runs])) if runs else float("nan"),
+            "mean_balance_diff": float(np.mean([run["balance_diff"] for run in runs])) if runs else float("nan"),
+        }
+        if baseline is None:
+            baseline = stats
+        else:
+            for key in ("latency_p50_ms", "fallback_rate", "mean_violation", "mean_balance_diff"):
+                stats["delta_" + key] = stats[key] - baseline[key]
+        summary[engine] = stats
+    return summary
+
+
+def format_summary(summary):
+    engines = list(summary)
+    lines = [f"Baseline engine: {engines[0]}"]
+    for engine, stats in summary.items():
+        line = (
+            f"{engine}: {stats['runs']} runs ({stats['skipped']} skipped) | "
+            f"latency p50/p95 {stats['latency_p50_ms']:.1f}/{stats['latency_p95_ms']:.1f} ms | "
+            f"fallback {stats['fallback_rate']:.1%} | violation {stats['mean_violation']:.3f} | "
+            f"balance diff {stats['mean_balance_diff']:.2f}"
+        )
+        if "delta_fallback_rate" in stats:
+            line += (
+                f"\n    vs {engines[0]}: latency {stats['delta_latency_p50_ms']:+.1f} ms | "
+                f"fallback {stats['delta_fallback_rate']:+.1%} | violation {stats['delta_mean_violation']:+.3f} | "
+                f"balance diff {stats['delta_mean_balance_diff']:+.2f}"
+            )
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("log", help=f"JSON-lines run log written via {lib.RUN_LOG_ENV}")
+    parser.add_argument("--engines", default="rounds", help="comma-separated engine names; the first is the baseline")
+    parser.add_argument("--import", dest="modules", action="append", default=[],
+                        help="module to import first so it can register extra engines")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    engines = [engine.strip() for engine in args.engines.split(",") if engine.strip()]
+    records = load_log(args.log)
+    if not records:
+        parser.error(f"{args.log} has no logged runs.")
+    per_engine = replay(records, engines, modules=args.modules, max_workers=args.workers)
+    print(format_summary(summarize(per_engine)))
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,192 @@
+"""Bulk import of players into the roster.
+
+Adding players one by one with ``add_new_player_to_csv`` re-reads and
+rewrites the whole CSV per player, so onboarding a big group takes hours.
+``import_players`` validates a whole batch (name, tier range, positions,
+stamina and skill scales),
+matches it against a hashed index of normalized names, so "Minh  Anh" and
+"minh anh" are the same player, skips or merges the duplicates and hands
+the rest to ``RosterModel.add_many``, which saves everything in one write.
+Strength is classified from the tier as each row is added.
+
+Usage: python roster_import.py new_players.csv --roster players.csv --on-duplicate merge
+"""
+import argparse
+import math
+import unicodedata
+
+import pandas as pd
+
+import team_select_optimized_lib as lib
+from rating_scales import MAX_POINT, MIN_POINT, SKILL_LEVELS, STAMINA_LEVELS
+from roster_model import RosterModel
+
+SKIP = "skip"        # Keep the existing player, ignore the imported row
+MERGE = "merge"      # Overwrite the existing player's fields with the imported values
+REJECT = "error"     # Report the imported row as an error
+DUPLICATE_POLICIES = [SKIP, MERGE, REJECT]
+IMPORT_COLUMNS = [lib.NAME_KEY, lib.TIER_KEY, lib.POSITION_KEY, lib.STAMINA_KEY, lib.SKILL_KEY]
+TIER_RANGE = (MIN_POINT, MIN_POINT + MAX_POINT)
+STAMINA_RANGE = (float(STAMINA_LEVELS[0]), float(STAMINA_LEVELS[-1]))
+
+
+def name_key(name):
+    """Return the dedupe key of a name: NFC, single spaces, case-folded."""
+    return unicodedata.normalize("NFC", " ".join(str(name).split())).casefold()
+
+
+def _missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value)) or value == ""
+
+
+def validate_player(record):
+    """Return a clean player dict for one import record; raises ``ValueError``.
+
+    Positions may be a single label or a list such as "['DF','MF']"; every
+    label must be one of ``POSITION_ORDER``. Stamina and skill are optional;
+    stamina must lie within ``STAMINA_RANGE`` and skill be one of ``SKILL_LEVELS``.
+    """
+    name = record.get(lib.NAME_KEY)
+    if _missing(name) or not str(name).strip():
+        raise ValueError("Name must not be empty.")
+    name = unicodedata.normalize("NFC", " ".join(str(name).split()))
+
+    try:
+        tier = float(record.get(lib.TIER_KEY))
+    except (TypeError, ValueError):
+        raise ValueError(f"{name}: tier must be a number.") from None
+    if not TIER_RANGE[0] <= tier <= TIER_RANGE[1]:
+        raise ValueError(f"{name}: tier must be between {TIER_RANGE[0]:g} and {TIER_RANGE[1]:g}.")
+
+    positions = lib.parse_positions(record.get(lib.POSITION_KEY))
+    unknown = [label for label in positions if label not in lib.POSITION_ORDER]
+    if not positions or unknown:
+        raise ValueError(f"{name}: position must be one or more of: GK, DF, MF, ST.")
+
+    player = {
+        lib.NAME_KEY: name,
+        lib.TIER_KEY: tier,
+        lib.POSITION_KEY: positions[0] if len(positions) == 1 else str(positions),
+    }
+    stamina = record.get(lib.STAMINA_KEY)
+    if not _missing(stamina):
+        try:
+            player[lib.STAMINA_KEY] = float(stamina)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name}: stamina must be a number.") from None
+        if not STAMINA_RANGE[0] <= player[lib.STAMINA_KEY] <= STAMINA_RANGE[1]:
+            raise ValueError(f"{name}: stamina must be between {STAMINA_RANGE[0]:g} and {STAMINA_RANGE[1]:g}.")
+    skill = record.get(lib.SKILL_KEY)
+    if not _missing(skill):
+        skill = unicodedata.normalize("NFC", str(skill).strip())
+        if skill not in SKILL_LEVELS:
+            raise ValueError(f"{name}: skill must be one of: {', '.join(SKILL_LEVELS)}.")
+        player[lib.SKILL_KEY] = skill
+    return player
+
+
+def import_players(records, roster, on_duplicate=SKIP):
+    """Validate, dedupe and add ``records`` to ``roster`` in one batch.
+
+    Names already on the roster, or repeated within ``records``, are
+    handled per ``on_duplicate``. Returns a report dict with the ``added``,
+    ``merged`` and ``skipped`` names and ``errors`` as ``(index, message)``
+    pairs; invalid records are reported and the valid ones still imported.
+    A new player repeated within ``records`` and merged is listed under both
+    ``added`` and ``merged``.
+    """
+    if on_duplicate not in DUPLICATE_POLICIES:
+        raise ValueError(f"on_duplicate must be one of: {', '.join(DUPLICATE_POLICIES)}.")
+    index = {name_key(name): name for name in roster.names()}
+    new_players = {}   # name key -> player dict
+    updates = {}       # existing name -> fields
+    batch_merged = {}  # name key of a new player -> None, for rows merged into it
+    report = {"added": [], "merged": [], "skipped": [], "errors": []}
+
+    for idx, record in enumerate(records):
+        try:
+            player = validate_player(record)
+        except ValueError as exc:
+            report["errors"].append((idx, str(exc)))
+            continue
+        key = name_key(player[lib.NAME_KEY])
+        existing = index.get(key)
+        if existing is None and key not in new_players:
+            new_players[key] = player
+            continue
+        if on_duplicate == REJECT:
+            report["errors"].append((idx, f"{player[lib.NAME_KEY]} already exists."))
+        elif on_duplicate == SKIP:
+            report["skipped"].append(player[lib.NAME_KEY])
+        elif existing is None:
+            new_players[key].update((column, value) for column, value in player.items() if column != lib.NAME_KEY)
+            batch_merged[key] = None
+        else:
+            fields = {column: value for column, value in player.items() if column != lib.NAME_KEY}
+            updates.setdefault(existing, {}).update(fields)
+
+    current = {name: roster.get(name) for name in updates}
+    updates = {
+        name: fields for name, fields in updates.items()
+        if any(current[name].get(column) != value for column, value in fields.items())
+    }
+    roster.add_many(list(new_players.values()), updates)
+    report["added"] = [player[lib.NAME_KEY] for player in new_players.values()]
+    report["merged"] = list(updates) + [new_players[key][lib.NAME_KEY] for key in batch_merged]
+    return report
+
+
+def read_import_file(filename):
+    """Return the rows of an import CSV as dicts; only ``IMPORT_COLUMNS`` are kept."""
+    df = pd.read_csv(filename, encoding=lib.DEFAULT_ENCODING, dtype=object, usecols=lambda column: column in IMPORT_COLUMNS)
+    if lib.NAME_KEY not in df:
+        raise ValueError(f"{filename} has no '{lib.NAME_KEY}' column.")
+    columns = list(df.columns)
+    return [dict(zip(columns, row)) for row in zip(*(df[column].tolist() for column in columns))]
+
+
+def import_players_to_csv(records, filename=lib.CSV_FILE, on_duplicate=SKIP):
+    """Import ``records`` straight into a roster CSV with a single write."""
+    roster = RosterModel(filename)
+    try:
+        report = import_players(records, roster, on_duplicate)
+    finally:
+        roster.close()
+    if roster.last_error is not None:
+        raise roster.last_error
+    return report
+
+
+def format_report(report, max_errors=None):
+    """Render an import report; only the first ``max_errors`` errors are listed when given."""
+    lines = [
+        f"Added {len(report['added'])}, merged {len(report['merged'])}, "
+        f"skipped {len(report['skipped'])}, errors {len(report['errors'])}"
+    ]
+    errors = report["errors"][:max_errors]
+    lines += [f"  row {idx + 1}: {message}" for idx, message in errors]
+    if len(errors) < len(report["errors"]):
+        lines.append(f"  ... {len(report['errors']) - len(errors)} more")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("file", help="CSV with name, tier, position and optional stamina/skill columns")
+    parser.add_argument("--roster", default=lib.CSV_FILE, help="roster CSV to import into")
+    parser.add_argument("--on-duplicate", choices=DUPLICATE_POLICIES, default=SKIP,
+                        help="what to do with names already on the roster or repeated in the file")
+    args = parser.parse_args(argv)
+
+    try:
+        records = read_import_file(args.file)
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+    report = import_players_to_csv(records, args.roster, args.on_duplicate)
+    print(format_report(report))
+    if report["errors"]:
+        parser.exit(1)
+
+
+if __name__ == "__main__":
+    main()
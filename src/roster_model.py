@@ -0,0 +1,423 @@
+"""In-memory roster shared by the GUIs, indexed by player name.
+
+Rows are stored column-wise with a name -> row index, so looking up or
+updating a player is O(1) instead of a boolean scan over a DataFrame. Edits
+mark their rows dirty and wake a background writer thread, which waits a
+short moment so a burst of edits is coalesced into one save, then writes
+the CSV to a temporary file and atomically renames it over the original.
+
+Windows sharing one model register listeners, which are called with
+``(event, row)`` after every change so they can refresh just that row.
+Edits made to the CSV by other programs are picked up by ``sync_from_disk``,
+which diffs the file against the model by player name and applies only the
+added, removed and changed rows. ``RosterWatcher`` tells a window when to
+call it, using inotify when ``inotify_simple`` is installed and cheap
+``stat`` polling otherwise.
+"""
+import math
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:  # Not installed or not Linux: fall back to polling
+    INotify = None
+
+import team_select_optimized_lib as lib
+
+ROSTER_COLUMNS = [lib.NAME_KEY, lib.TIER_KEY, lib.POSITION_KEY, "stamina", "skill", lib.STRENGTH_KEY]
+FLUSH_DELAY = 0.25  # Seconds to wait for more edits before writing
+POLL_INTERVAL = 1.0  # Seconds between stat checks when inotify is unavailable
+
+ROW_ADDED = "added"
+ROW_UPDATED = "updated"
+ROW_REMOVED = "removed"  # Sent after the row is gone; later rows moved up by one
+ROSTER_RESET = "reset"  # Sent with row None after a full (re)load
+
+
+def _clean(value):
+    """Turn pandas missing values into ``None``."""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+class RosterModel:
+    """Name-indexed roster with dirty tracking and write-behind CSV saves."""
+
+    def __init__(self, filename, flush_delay=FLUSH_DELAY):
+        self.path = Path(filename)
+        self.flush_delay = flush_delay
+        self.last_error = None
+        self._lock = threading.RLock()
+        self._wake = threading.Condition(self._lock)
+        self._columns = {}
+        self._index = {}
+        self._dirty = set()
+        self._closed = False
+        self._writing = False
+        self._flush_requested = False
+        self._listeners = []
+        self._disk_signature = None
+        self.load()
+        self._writer = threading.Thread(target=self._write_loop, name="roster-writer", daemon=True)
+        self._writer.start()
+
+    # ---- Reading ----
+    def disk_signature(self):
+        """Return ``(mtime_ns, size)`` of the CSV, or ``None`` when it is missing."""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self):
+        """(Re)load the roster from disk, dropping unsaved edits."""
+        signature = self.disk_signature()
+        try:
+            df = pd.read_csv(self.path, encoding=lib.DEFAULT_ENCODING)
+        except FileNotFoundError:
+            df = pd.DataFrame(columns=ROSTER_COLUMNS)
+
+        with self._lock:
+            self._disk_signature = signature
+            # Positions are kept as written so multi-position entries survive a save.
+            df = lib.normalize_roster_frame(df, positions=False)
+            columns = list(df.columns) + [column for column in ROSTER_COLUMNS if column not in df.columns]
+            self._columns = {
+                column: [_clean(value) for value in df[column].tolist()] if column in df else [None] * len(df)
+                for column in columns
+            }
+            self._index = {name: row for row, name in enumerate(self._columns[lib.NAME_KEY])}
+            self._dirty.clear()
+        self._notify(ROSTER_RESET, None)
+
+    def sync_from_disk(self):
+        """Apply changes made to the CSV by other programs, row by row.
+
+        Rows are matched by name. Rows with unsaved local edits keep them.
+        Listeners get one ``ROW_REMOVED``, ``ROW_UPDATED`` or ``ROW_ADDED``
+        per affected row. Returns ``(added, removed, changed)`` name lists,
+        or ``None`` when the file did not change since it was last read or
+        written by this model.
+        """
+        signature = self.disk_signature()
+        if signature is None or signature == self._disk_signature:
+            return None
+        try:
+            df = pd.read_csv(self.path, encoding=lib.DEFAULT_ENCODING)
+        except (OSError, pd.errors.ParserError, pd.errors.EmptyDataError):
+            return None  # Mid-write or unreadable; the next change retries
+        if lib.NAME_KEY not in df:
+            return None
+        df = lib.normalize_roster_frame(df, positions=False)
+        disk_columns = [column for column in df.columns if column != lib.STRENGTH_KEY]
+        disk_rows = {}
+        for values in zip(*(df[column].tolist() for column in disk_columns)):
+            row = dict(zip(disk_columns, map(_clean, values)))
+            disk_rows[row[lib.NAME_KEY]] = row
+
+        with self._lock:
+            self._disk_signature = signature
+            names = self._columns[lib.NAME_KEY]
+            local = {names[row] for row in self._dirty}
+            removed_rows = [
+                row for row, name in enumerate(names) if name not in disk_rows and name not in local
+            ]
+            removed = [names[row] for row in removed_rows]
+            self._remove_rows(removed_rows)
+
+        for row in reversed(removed_rows):
+            self._notify(ROW_REMOVED, row)
+
+        changed, added = [], []
+        for name, values in disk_rows.items():
+            row = self._index.get(name)
+            if row is None:
+                added.append(values)
+            elif name not in local and any(
+                self._columns.get(column, [None] * len(self._index))[row] != value
+                for column, value in values.items()
+            ):
+                with self._lock:
+                    self._set_fields(row, values)
+                changed.append(name)
+                self._notify(ROW_UPDATED, row)
+
+        for values in added:
+            with self._lock:
+                row = self._append_row(values)
+            self._notify(ROW_ADDED, row)
+
+        return [values[lib.NAME_KEY] for values in added], removed, changed
+
+    def _remove_rows(self, rows):
+        if not rows:
+            return
+        gone = set(rows)
+        keep = [row for row in range(len(self._index)) if row not in gone]
+        for column, values in self._columns.items():
+            self._columns[column] = [values[row] for row in keep]
+        new_row = {old: new for new, old in enumerate(keep)}
+        self._dirty = {new_row[row] for row in self._dirty}
+        self._index = {name: row for row, name in enumerate(self._columns[lib.NAME_KEY])}
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    def names(self):
+        with self._lock:
+            return list(self._columns[lib.NAME_KEY])
+
+    def row_of(self, name):
+        return self._index[name]
+
+    def get(self, name, default=None):
+        """Return a copy of the player's row, or ``default`` when unknown."""
+        with self._lock:
+            row = self._index.get(name)
+            if row is None:
+                return default
+            return {column: values[row] for column, values in self._columns.items()}
+
+    def value(self, row, column):
+        return self._columns[column][row]
+
+    def players(self):
+        """Return every row as a dict, like ``read_players_from_csv``."""
+        with self._lock:
+            return [
+                {column: values[row] for column, values in self._columns.items()}
+                for row in range(len(self._index))
+            ]
+
+    # ---- Editing ----
+    def update(self, name, **fields):
+        """Update fields of one player and schedule a save. Returns the row index."""
+        with self._lock:
+            row = self._index[name]
+            self._set_fields(row, fields)
+            self._mark_dirty(row)
+        self._notify(ROW_UPDATED, row)
+        return row
+
+    def add(self, player):
+        """Append a new player row and schedule a save. Returns the row index."""
+        with self._lock:
+            name = player[lib.NAME_KEY]
+            if name in self._index:
+                raise ValueError(f"{name} already exists.")
+            row = self._append_row(player)
+            self._mark_dirty(row)
+        self._notify(ROW_ADDED, row)
+        return row
+
+    def add_many(self, players, updates=None):
+        """Append ``players`` and apply ``updates`` (``{name: fields}``) as one batch.
+
+        The whole batch is applied under the lock, so the writer saves it in a
+        single write. Nothing changes when a new name already exists or an
+        updated name does not. Listeners get one ``ROW_UPDATED`` per updated
+        row, then one ``ROW_ADDED`` per new row. Returns the new rows.
+        """
+        updates = updates or {}
+        with self._lock:
+            names = [player[lib.NAME_KEY] for player in players]
+            clashes = [name for name in names if name in self._index]
+            if clashes:
+                raise ValueError(f"{', '.join(clashes)} already exist(s).")
+            if len(set(names)) != len(names):
+                raise ValueError("A batch must not name the same player twice.")
+            unknown = [name for name in updates if name not in self._index]
+            if unknown:
+                raise ValueError(f"Unknown player(s): {', '.join(unknown)}.")
+            updated_rows = []
+            for name, fields in updates.items():
+                row = self._index[name]
+                self._set_fields(row, fields)
+                updated_rows.append(row)
+            added_rows = [self._append_row(player) for player in players]
+            self._dirty.update(updated_rows)
+            self._dirty.update(added_rows)
+            self._wake.notify_all()
+        for row in updated_rows:
+            self._notify(ROW_UPDATED, row)
+        for row in added_rows:
+            self._notify(ROW_ADDED, row)
+        return added_rows
+
+    def _set_fields(self, row, fields):
+        for column, value in fields.items():
+            if column not in self._columns:
+                self._columns[column] = [None] * len(self._index)
+            self._columns[column][row] = value
+        if lib.TIER_KEY in fields:
+            self._columns[lib.STRENGTH_KEY][row] = lib.classify_strength_from_tier(fields[lib.TIER_KEY])
+
+    def _append_row(self, player):
+        row = len(self._index)
+        for column in set(self._columns) | set(player):
+            values = self._columns.setdefault(column, [None] * row)
+            values.append(player.get(column))
+        self._columns[lib.STRENGTH_KEY][row] = lib.classify_strength_from_tier(player.get(lib.TIER_KEY))
+        self._index[player[lib.NAME_KEY]] = row
+        return row
+
+    def add_player(self, name, tier, position):
+        """Validate and add a player like ``add_new_player_to_csv``."""
+        if not isinstance(position, str):
+            raise ValueError("Position must be a single string value: GK, DF, MF, or ST.")
+        position = lib.normalize_position(position)
+        if position not in lib.POSITION_ORDER:
+            raise ValueError("Position must be one of: GK, DF, MF, ST.")
+        return self.add({lib.NAME_KEY: name, lib.TIER_KEY: float(tier), lib.POSITION_KEY: position})
+
+    # ---- Change notifications ----
+    def subscribe(self, listener):
+        """Call ``listener(event, row)`` after every change to the roster."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, event, row):
+        # Called outside the lock so listeners can read the model freely.
+        for listener in list(self._listeners):
+            listener(event, row)
+
+    def is_dirty(self):
+        return bool(self._dirty)
+
+    def _mark_dirty(self, row):
+        self._dirty.add(row)
+        self._wake.notify_all()
+
+    # ---- Saving ----
+    def flush(self, timeout=None):
+        """Block until every pending edit is on disk. Returns False on timeout or write errors."""
+        with self._lock:
+            self.last_error = None
+            self._flush_requested = True
+            self._wake.notify_all()
+            done = self._wake.wait_for(
+                lambda: (not self._dirty and not self._writing) or self.last_error is not None or self._closed,
+                timeout,
+            )
+            return done and not self._dirty and self.last_error is None
+
+    def close(self):
+        """Save pending edits and stop the writer thread."""
+        self.flush()
+        with self._lock:
+            self._closed = True
+            self._wake.notify_all()
+        self._writer.join()
+
+    def _write_loop(self):
+        while True:
+            with self._lock:
+                self._wake.wait_for(lambda: self._dirty or self._closed)
+                if self._closed:
+                    return
+                # Coalesce a burst of edits into one write unless a flush is waiting.
+                self._wake.wait_for(lambda: self._flush_requested or self._closed, self.flush_delay)
+                self._flush_requested = False
+                pending = set(self._dirty)
+                self._dirty.clear()
+                self._writing = True
+                snapshot = {column: list(values) for column, values in self._columns.items()}
+
+            error = self._write_snapshot(snapshot)
+
+            with self._lock:
+                self._writing = False
+                self.last_error = error
+                if error is None:
+                    # Our own save must not look like an outside edit to sync_from_disk.
+                    self._disk_signature = self.disk_signature()
+                if error is not None:
+                    self._dirty |= pending
+                self._wake.notify_all()
+            if error is not None:
+                # Retry after a pause instead of spinning, e.g. while the file is locked.
+                with self._lock:
+                    self._wake.wait(self.flush_delay * 4)
+
+    def _write_snapshot(self, snapshot):
+        """Write a snapshot to a temporary file and rename it over the CSV."""
+        frame = pd.DataFrame(snapshot)
+        try:
+            fd, temp_name = tempfile.mkstemp(prefix=self.path.name, suffix=".tmp", dir=self.path.parent)
+            try:
+                with os.fdopen(fd, "w", encoding=lib.DEFAULT_ENCODING, newline="") as handle:
+                    frame.to_csv(handle, index=False)
+                os.replace(temp_name, self.path)
+            except BaseException:
+                if os.path.exists(temp_name):
+                    os.remove(temp_name)
+                raise
+        except OSError as exc:
+            return exc
+        return None
+
+
+class RosterWatcher:
+    """Call ``callback()`` from a background thread whenever the CSV changes.
+
+    The callback should hand over to the UI thread (a queued Qt signal, a
+    Tk ``after`` call) and run ``RosterModel.sync_from_disk`` there.
+    """
+
+    def __init__(self, filename, callback, interval=POLL_INTERVAL):
+        self.path = Path(filename)
+        self.callback = callback
+        self.interval = interval
+        self._stop = threading.Event()
+        target = self._watch_inotify if INotify is not None else self._watch_polling
+        self._thread = threading.Thread(target=target, name="roster-watcher", daemon=True)
+        self._thread.start()
+
+    def _signature(self):
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _watch_polling(self):
+        last = self._signature()
+        while not self._stop.wait(self.interval):
+            current = self._signature()
+            if current != last:
+                last = current
+                self.callback()
+
+    def _watch_inotify(self):
+        # Watch the directory: saves replace the file, which ends a watch on the file itself.
+        inotify = INotify()
+        mask = inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO | inotify_flags.CREATE
+        inotify.add_watch(str(self.path.parent.resolve()), mask)
+        try:
+            while not self._stop.is_set():
+                events = inotify.read(timeout=int(self.interval * 1000))
+                if any(event.name == self.path.name for event in events):
+                    self.callback()
+        finally:
+            inotify.close()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
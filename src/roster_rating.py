@@ -0,0 +1,70 @@
+"""Bulk re-rating of the whole roster from its skill and stamina columns.
+
+The per-click ``calculate_score`` helpers look one player up in
+``SKILL_MAPPING``/``STAMINA_MAPPING``. Here the columns are mapped to level
+indices once and scored through NumPy lookup arrays, so every tier is
+recomputed for a new skill weight in one vectorized step and saved with a
+single CSV write.
+"""
+import numpy as np
+import pandas as pd
+
+import team_select_optimized_lib as lib
+from rating_scales import (
+    MAX_POINT,
+    MIN_POINT,
+    SKILL_LEVELS,
+    SKILL_MAPPING,
+    STAMINA_LEVELS,
+    STAMINA_MAPPING,
+)
+
+SKILL_TABLE = np.array([SKILL_MAPPING[level] for level in SKILL_LEVELS])
+STAMINA_TABLE = np.array([STAMINA_MAPPING[level] for level in STAMINA_LEVELS])
+_STAMINA_VALUES = np.array([float(level) for level in STAMINA_LEVELS])
+
+
+def skill_level_indices(values):
+    """Return the ``SKILL_LEVELS`` index of every value, -1 where unknown."""
+    labels = pd.Series(values, dtype="object").astype("string").str.strip()
+    labels = labels.where(labels.isin(SKILL_LEVELS))
+    return pd.Categorical(labels, categories=SKILL_LEVELS).codes.astype(np.intp)
+
+
+def stamina_level_indices(values):
+    """Return the ``STAMINA_LEVELS`` index of every value, -1 where unknown.
+
+    Numbers are matched by value, so "60", "60.0" and 60 are the same level.
+    """
+    numbers = pd.to_numeric(pd.Series(values, dtype="object"), errors="coerce").to_numpy(dtype=float)
+    positions = np.searchsorted(_STAMINA_VALUES, numbers).clip(0, len(_STAMINA_VALUES) - 1)
+    return np.where(_STAMINA_VALUES[positions] == numbers, positions, -1)
+
+
+def scores_from_levels(skill_idx, stamina_idx, skill_weight):
+    """Vectorized ``calculate_score``; unknown levels count as 0.0 like the dict lookups."""
+    skill_score = np.where(skill_idx >= 0, SKILL_TABLE[skill_idx], 0.0)
+    stamina_score = np.where(stamina_idx >= 0, STAMINA_TABLE[stamina_idx], 0.0)
+    normalized = skill_weight * skill_score + (1.0 - skill_weight) * stamina_score
+    return np.round(MIN_POINT + normalized * MAX_POINT, 1)
+
+
+def rerate_roster(filename=lib.CSV_FILE, skill_weight=0.5):
+    """Recompute every tier from skill and stamina for ``skill_weight`` and save once.
+
+    Players without a known skill or stamina level keep their hand-set tier.
+    Returns the number of players whose tier changed.
+    """
+    df = pd.read_csv(filename, encoding=lib.DEFAULT_ENCODING)
+    skill_idx = skill_level_indices(df["skill"]) if "skill" in df else np.full(len(df), -1)
+    stamina_idx = stamina_level_indices(df["stamina"]) if "stamina" in df else np.full(len(df), -1)
+
+    rated = (skill_idx >= 0) & (stamina_idx >= 0)
+    scores = scores_from_levels(skill_idx, stamina_idx, skill_weight)
+    old_tiers = pd.to_numeric(df[lib.TIER_KEY], errors="coerce").to_numpy(dtype=float)
+    new_tiers = np.where(rated, scores, old_tiers)
+
+    df[lib.TIER_KEY] = new_tiers
+    df[lib.STRENGTH_KEY] = lib.strength_column(df[lib.TIER_KEY])
+    df.to_csv(filename, index=False, encoding=lib.DEFAULT_ENCODING)
+    return int((rated & (new_tiers != old_tiers)).sum())
@@ -0,0 +1,159 @@
+"""Chunked loading of very large rosters into compact NumPy arrays.
+
+``read_players_from_csv`` builds a DataFrame of the whole file, classifies it
+row by row and then copies it into a list of dicts, so a big federation
+roster is held in memory about three times over. ``stream_roster`` reads the
+CSV ``chunksize`` rows at a time, normalizes each chunk with vectorized
+pandas/NumPy operations and copies it straight into preallocated typed
+arrays, so apart from the arrays themselves peak memory is bounded by one
+chunk. Dicts are only built for the players actually handed to the balancer,
+which is what ``replay_runs`` and ``quality_benchmark`` need when they look
+up a few attendances in a big roster by name.
+"""
+import numpy as np
+import pandas as pd
+
+import team_select_optimized_lib as lib
+from rating_scales import SKILL_LEVELS
+
+CHUNK_ROWS = 50000
+STRENGTH_LABELS = lib.STRENGTH_LABELS + [lib.UNKNOWN_STRENGTH]
+UNKNOWN_POSITION = -1
+UNKNOWN_SKILL = -1
+_POSITION_CODES = {label: code for code, label in enumerate(lib.POSITION_ORDER)}
+_SKILL_CODES = {label: code for code, label in enumerate(SKILL_LEVELS)}
+
+
+def position_codes(values):
+    """Encode ``position_columns`` output for a whole column.
+
+    Returns ``(primary, packed, unknown)``: the ``POSITION_ORDER`` index of
+    the first label (-1 when missing or unknown), every known label in
+    listed order packed as ``code + 1`` in consecutive 3-bit fields, and
+    ``{offset: label}`` for the unknown primary labels. The order matters
+    because ``assign_player_lines`` prefers a player's first-listed lines.
+    """
+    primary, positions = lib.position_columns(values)
+    first = primary.astype(object).tolist()
+    codes = np.array([_POSITION_CODES.get(label, UNKNOWN_POSITION) for label in first], dtype=np.int8)
+    unknown = {offset: label for offset, label in enumerate(first) if label and label not in _POSITION_CODES}
+    # ``position_columns`` already de-duplicated each list.
+    listed = pd.DataFrame(positions.tolist(), index=range(len(positions)))
+    packed = np.zeros(len(positions), dtype=np.uint16)
+    count = np.zeros(len(positions), dtype=np.uint16)
+    for column in listed.columns:
+        code = listed[column].map(_POSITION_CODES).fillna(UNKNOWN_POSITION).to_numpy(dtype=np.int16) + 1
+        packed |= code.astype(np.uint16) << (3 * count)
+        count += code > 0
+    return codes, packed, unknown
+
+
+def unpack_positions(packed):
+    """Return the labels of one ``position_codes`` packed value, in listed order."""
+    packed = int(packed)
+    labels = []
+    while packed:
+        labels.append(lib.POSITION_ORDER[(packed & 7) - 1])
+        packed >>= 3
+    return labels
+
+
+class RosterArrays:
+    """Column-wise roster in typed arrays that grow by doubling."""
+
+    def __init__(self, capacity=CHUNK_ROWS, config=None):
+        self.size = 0
+        self.config = config or lib.DEFAULT_CONFIG
+        self.names = np.empty(capacity, dtype=object)
+        self.tiers = np.empty(capacity, dtype=np.float32)
+        self.stamina = np.empty(capacity, dtype=np.float32)
+        self.positions = np.empty(capacity, dtype=np.int8)
+        self.position_lists = np.empty(capacity, dtype=np.uint16)
+        self.strength = np.empty(capacity, dtype=np.int8)
+        self.skills = np.empty(capacity, dtype=np.int8)
+        self.unknown_positions = {}  # Row -> unrecognized primary position label
+        self._rows = None  # Name -> row, built on first lookup
+
+    def __len__(self):
+        return self.size
+
+    def _reserve(self, extra):
+        needed = self.size + extra
+        capacity = len(self.tiers)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for field in ("names", "tiers", "stamina", "positions", "position_lists", "strength", "skills"):
+            old = getattr(self, field)
+            grown = np.empty(capacity, dtype=old.dtype)
+            grown[:self.size] = old[:self.size]
+            setattr(self, field, grown)
+
+    def append_chunk(self, chunk):
+        """Normalize one DataFrame chunk and copy it onto the end of the arrays."""
+        count = len(chunk)
+        self._reserve(count)
+        end = self.size + count
+        tiers = pd.to_numeric(chunk[lib.TIER_KEY], errors="coerce").to_numpy(dtype=float)
+        self.names[self.size:end] = chunk[lib.NAME_KEY].to_numpy(dtype=object)
+        self.tiers[self.size:end] = tiers
+        if lib.STAMINA_KEY in chunk:
+            self.stamina[self.size:end] = pd.to_numeric(chunk[lib.STAMINA_KEY], errors="coerce").to_numpy(dtype=float)
+        else:
+            self.stamina[self.size:end] = np.nan
+        primary, packed, unknown = position_codes(chunk[lib.POSITION_KEY])
+        self.positions[self.size:end] = primary
+        self.position_lists[self.size:end] = packed
+        self.unknown_positions.update((self.size + offset, label) for offset, label in unknown.items())
+        self.strength[self.size:end] = lib.strength_codes(tiers, self.config)
+        if lib.SKILL_KEY in chunk:
+            skills = chunk[lib.SKILL_KEY].map(_SKILL_CODES).fillna(UNKNOWN_SKILL)
+            self.skills[self.size:end] = skills.to_numpy(dtype=np.int8)
+        else:
+            self.skills[self.size:end] = UNKNOWN_SKILL
+        self.size = end
+        self._rows = None
+
+    def rows_of(self, names):
+        """Return the row of each name, or None for names not on the roster."""
+        if self._rows is None:
+            self._rows = {name: row for row, name in enumerate(self.names[:self.size].tolist())}
+        return [self._rows.get(name) for name in names]
+
+    def players(self, rows=None):
+        """Return player dicts, like ``read_players_from_csv``, for ``rows`` (default all)."""
+        rows = np.arange(self.size) if rows is None else np.asarray(rows)
+        players = []
+        for row in rows.tolist():
+            code = int(self.positions[row])
+            tier = float(self.tiers[row])
+            stamina = float(self.stamina[row])
+            skill = int(self.skills[row])
+            players.append({
+                lib.NAME_KEY: self.names[row],
+                lib.TIER_KEY: round(tier, 2) if tier == tier else None,
+                lib.POSITION_KEY: (
+                    lib.POSITION_ORDER[code] if code != UNKNOWN_POSITION else self.unknown_positions.get(row, "")
+                ),
+                lib.POSITIONS_KEY: unpack_positions(self.position_lists[row]),
+                lib.STAMINA_KEY: stamina if stamina == stamina else None,
+                lib.SKILL_KEY: SKILL_LEVELS[skill] if skill != UNKNOWN_SKILL else None,
+                lib.STRENGTH_KEY: STRENGTH_LABELS[self.strength[row]],
+            })
+        return players
+
+
+def stream_roster(filename=lib.CSV_FILE, chunksize=CHUNK_ROWS, config=None):
+    """Load a roster CSV chunk by chunk into a ``RosterArrays``, classifying strength with ``config``."""
+    arrays = RosterArrays(capacity=chunksize, config=config)
+    columns = [lib.NAME_KEY, lib.TIER_KEY, lib.POSITION_KEY, lib.STAMINA_KEY, lib.SKILL_KEY]
+    reader = pd.read_csv(
+        filename,
+        encoding=lib.DEFAULT_ENCODING,
+        usecols=lambda column: column in columns,
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        arrays.append_chunk(chunk)
+    return arrays
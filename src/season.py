@@ -0,0 +1,146 @@
+"""Season mode that spreads teammates around over many matchdays.
+
+``SeasonScheduler`` keeps a player x player co-occurrence matrix (int16) of
+how often two players were on the same team. Candidate splits for a
+matchday are scored by the usual line fairness and attribute balance plus a
+variety penalty: the mean co-occurrence of the pairs each split puts
+together. The penalty for a whole pool of candidates is computed from one
+gathered sub-matrix, so its cost depends on the attendance, not on how many
+matchdays have been played.
+"""
+import numpy as np
+
+import team_select_optimized_lib as lib
+from fairness_config import ATTRIBUTE_WEIGHTS
+
+VARIETY_WEIGHT = 0.5        # Cost per prior shared match of an average same-team pair
+SEASON_CANDIDATES = 24      # Candidate splits scored per matchday
+COUNT_LIMIT = np.iinfo(np.int16).max
+
+
+class SeasonScheduler:
+    """Plan matchdays while remembering who already played together."""
+
+    def __init__(self, names=(), variety_weight=VARIETY_WEIGHT, candidates=SEASON_CANDIDATES,
+                 attribute_weights=ATTRIBUTE_WEIGHTS, config=None):
+        self.variety_weight = variety_weight
+        self.candidates = candidates
+        self.attribute_weights = attribute_weights
+        self.config = config or lib.DEFAULT_CONFIG
+        self.rng = self.config.rng()
+        self.index = {}
+        self.together = np.zeros((0, 0), dtype=np.int16)
+        self._register(names)
+
+    def _register(self, names):
+        new_names = [name for name in dict.fromkeys(names) if name not in self.index]
+        if not new_names:
+            return
+        for name in new_names:
+            self.index[name] = len(self.index)
+        size = len(self.index)
+        grown = np.zeros((size, size), dtype=np.int16)
+        old = self.together.shape[0]
+        grown[:old, :old] = self.together
+        self.together = grown
+
+    def _indices(self, players):
+        names = [player[lib.NAME_KEY] for player in players]
+        self._register(names)
+        return np.array([self.index[name] for name in names], dtype=np.intp)
+
+    def times_together(self, name_a, name_b):
+        """Return how many recorded matches had both players on the same team."""
+        if name_a not in self.index or name_b not in self.index:
+            return 0
+        return int(self.together[self.index[name_a], self.index[name_b]])
+
+    def variety_penalties(self, players, labels):
+        """Return the mean prior co-occurrence of same-team pairs for each candidate.
+
+        ``labels`` is a (candidates, players) array of team indices for the
+        players in ``players``.
+        """
+        idx = self._indices(players)
+        counts = self.together[np.ix_(idx, idx)].astype(np.int32)
+        np.fill_diagonal(counts, 0)
+        same_team = labels[:, :, None] == labels[:, None, :]
+        shared = (same_team * counts).sum(axis=(1, 2))
+        pairs = same_team.sum(axis=(1, 2)) - labels.shape[1]
+        return shared / np.maximum(pairs, 1)
+
+    def record(self, teams):
+        """Add one played matchday to the co-occurrence matrix."""
+        for team in teams:
+            idx = self._indices(team)
+            block = self.together[np.ix_(idx, idx)].astype(np.int32) + 1
+            self.together[np.ix_(idx, idx)] = np.minimum(block, COUNT_LIMIT)
+
+    def plan_matchday(self, players, team_count=None, record=True):
+        """Pick the best of ``candidates`` splits, penalising repeated teammates.
+
+        Accepted splits are preferred, as in ``generate_balanced_teams``; among
+        them the attribute imbalance plus the weighted variety penalty decides.
+        Strength, fairness limits and the team count default to ``config``.
+        """
+        team_count = self.config.team_count if team_count is None else team_count
+        lib.assign_player_lines(players, team_count=team_count)
+        pool = []
+        for attempt_idx in range(1, self.candidates + 1):
+            teams = lib.balance_teams(
+                players,
+                team_count=team_count,
+                attribute_weights=self.attribute_weights,
+                config=self.config,
+                rng=self.rng,
+            )
+            pool.append({
+                "teams": teams,
+                "fairness": lib.evaluate_fairness(teams, self.config),
+                "attributes": lib.attribute_summary(teams, self.attribute_weights),
+                "attempt_index": attempt_idx,
+            })
+
+        position = {player[lib.NAME_KEY]: col for col, player in enumerate(players)}
+        labels = np.zeros((len(pool), len(players)), dtype=np.int16)
+        for row, candidate in enumerate(pool):
+            for team_idx, team in enumerate(candidate["teams"]):
+                labels[row, [position[player[lib.NAME_KEY]] for player in team]] = team_idx
+        penalties = self.variety_penalties(players, labels)
+
+        for candidate, penalty in zip(pool, penalties):
+            candidate["variety_penalty"] = float(penalty)
+        chosen = min(
+            pool,
+            key=lambda candidate: (
+                not candidate["fairness"]["accepted"],
+                candidate["fairness"]["violation_score"]
+                + candidate["attributes"]["imbalance"]
+                + self.variety_weight * candidate["variety_penalty"],
+            ),
+        )
+        chosen["selection"] = "accepted" if chosen["fairness"]["accepted"] else "fallback"
+        chosen["retries_used"] = len(pool) - 1
+        if record:
+            self.record(chosen["teams"])
+        return chosen
+
+    def plan_season(self, matchdays, team_count=None):
+        """Plan a list of matchday attendances in order, recording each one."""
+        return [self.plan_matchday(players, team_count=team_count) for players in matchdays]
+
+    def save(self, filename):
+        """Store the co-occurrence matrix and player names in an ``.npz`` file.
+
+        Names are stored as a fixed-width unicode array, so the file can be
+        read back without unpickling anything.
+        """
+        names = np.array(sorted(self.index, key=self.index.get), dtype=str)
+        np.savez_compressed(filename, names=names, together=self.together)
+
+    @classmethod
+    def load(cls, filename, **kwargs):
+        with np.load(filename, allow_pickle=False) as data:
+            scheduler = cls(names=data["names"].tolist(), **kwargs)
+            scheduler.together = data["together"].astype(np.int16)
+        return scheduler
@@ -0,0 +1,206 @@
+"""Low-overhead sampling profiler for the GUI sessions.
+
+Slowness in the PyQt and Tk apps cannot be reproduced with a profiler
+attached from outside, so both apps can start one themselves: set
+``SQUAD_PROFILE=<output file>`` or pass ``--profile[=<output file>]``. A
+daemon thread then reads every thread's Python stack with
+``sys._current_frames`` a hundred times a second; nothing is hooked
+into the profiled code, so the apps run at full speed between samples.
+
+When the session ends the samples are written as collapsed stacks, one
+``category;thread;frame;...;frame count`` line per distinct stack, ready
+for ``flamegraph.pl`` or speedscope. The category is taken from the
+innermost frame on the stack that belongs to one of ``CATEGORY_FRAMES``:
+roster I/O, widget rebuilds or team assignment (so the CSV read inside
+``load_data`` counts as roster I/O, the rest of it as a widget rebuild, and
+a UI thread waiting for ``RosterModel.flush`` as roster I/O). Frames are
+matched by module and function name, which every Python version provides.
+Samples of other threads parked in the event loop (Qt's ``exec_`` or Tk's
+``mainloop``) or waiting on a lock are counted as ``idle``; everything else
+is ``other``. Totals per category are printed to stderr.
+"""
+import atexit
+import collections
+import os
+import sys
+import threading
+from pathlib import Path
+
+PROFILE_ENV = "SQUAD_PROFILE"
+PROFILE_FLAG = "--profile"
+DEFAULT_OUTPUT = "squad_profile.folded"
+SAMPLE_INTERVAL = 0.01       # Seconds between samples (100 Hz, about 3% overhead)
+IDLE_CATEGORY = "idle"
+OTHER_CATEGORY = "other"
+CATEGORY_FRAMES = {
+    "roster_io": {
+        "roster_model.RosterModel.load",
+        "roster_model.RosterModel.sync_from_disk",
+        "roster_model.RosterModel.flush",
+        "roster_model.RosterModel._write_snapshot",
+        "team_select_optimized_lib.read_players_from_csv",
+        "team_select_optimized_lib.write_players_to_csv",
+    },
+    "widget_rebuild": {
+        "team_select_pyqt.TeamSelectionWindow._load_players",
+        "team_select_pyqt.PlayerTableModel._roster_reset",
+        "PyQT_Random_Squad.RandomSquadWindow.load_data",
+        "PyQT_Random_Squad.RandomSquadWindow._fill_name_combo",
+        "calculate_point_player.reload_player_names",
+    },
+    "team_assignment": {
+        "team_select_optimized_lib.run_team_assignment",
+        "team_select_optimized_lib.generate_balanced_teams",
+        "team_select_optimized_lib.balance_teams",
+    },
+}
+# (module, function) of innermost frames that wait: Condition/Event.wait,
+# Thread.join and Tk's ``Misc.mainloop``.
+_IDLE_FRAMES = {
+    ("threading", "wait"),
+    ("threading", "join"),
+    ("tkinter", "mainloop"),
+}
+
+
+def _frame_key(label):
+    """Return the (module, function) pair of a ``CATEGORY_FRAMES`` label."""
+    return label.split(".", 1)[0], label.rsplit(".", 1)[-1]
+
+
+def _code_module(code):
+    """Return the module name of a code object's file, a package's name for its ``__init__``."""
+    path = Path(code.co_filename)
+    return path.parent.name if path.stem == "__init__" else path.stem
+
+
+class SamplingProfiler:
+    """Sample the stacks of all other threads every ``interval`` seconds."""
+
+    def __init__(self, output=DEFAULT_OUTPUT, interval=SAMPLE_INTERVAL):
+        self.output = Path(output)
+        self.interval = interval
+        self.samples = collections.Counter()  # (category, thread, frames) -> count
+        self._labels = {}                     # Code object -> ("module.qualname", (module, function))
+        self._categories = {
+            _frame_key(label): name for name, labels in CATEGORY_FRAMES.items() for label in labels
+        }
+        self._entry_code = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, entry_code=None):
+        """Start sampling.
+
+        Threads whose innermost Python frame runs ``entry_code`` (by default
+        the caller's code, i.e. the function running the event loop) are
+        counted as idle.
+        """
+        if self._thread is not None:
+            return self
+        self._entry_code = entry_code or sys._getframe(1).f_code
+        self._thread = threading.Thread(target=self._run, name="session-profiler", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def stop(self):
+        """Stop sampling and write the collapsed stacks; safe to call twice."""
+        if self._thread is None or self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        atexit.unregister(self.stop)
+        self.write()
+        print(format_totals(self.totals()), file=sys.stderr)
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self._sample(own)
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            module = _code_module(code)
+            name = getattr(code, "co_qualname", code.co_name)  # Python 3.11+; plain name before
+            label = self._labels[code] = (f"{module}.{name}", (module, code.co_name))
+        return label
+
+    def _sample(self, own):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            leaf = frame.f_code
+            labels = []
+            while frame is not None:
+                labels.append(self._label(frame.f_code))
+                frame = frame.f_back
+            # Known work wins over the idle rules: a UI thread blocked on a
+            # lock inside RosterModel.flush is waiting for roster I/O.
+            category = next((self._categories[key] for _, key in labels if key in self._categories), None)
+            if category is None:
+                idle = leaf is self._entry_code or labels[0][1] in _IDLE_FRAMES
+                category = IDLE_CATEGORY if idle else OTHER_CATEGORY
+            stack = tuple(label for label, _ in reversed(labels))
+            self.samples[category, names.get(ident, str(ident)), stack] += 1
+
+    def totals(self):
+        """Return ``{category: seconds}`` estimated from the sample counts."""
+        totals = collections.Counter()
+        for (category, _, _), count in self.samples.items():
+            totals[category] += count * self.interval
+        return dict(totals)
+
+    def write(self, output=None):
+        """Write the samples as collapsed stacks, one line per distinct stack."""
+        lines = [
+            ";".join((category, thread.replace(";", ":")) + stack) + f" {count}"
+            for (category, thread, stack), count in sorted(self.samples.items())
+        ]
+        Path(output or self.output).write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def format_totals(totals):
+    busy = sum(seconds for category, seconds in totals.items() if category != IDLE_CATEGORY)
+    lines = ["Profile (approximate seconds across threads):"]
+    for category, seconds in sorted(totals.items(), key=lambda item: -item[1]):
+        share = f" ({seconds / busy:.0%} of busy)" if busy and category != IDLE_CATEGORY else ""
+        lines.append(f"  {category:16s} {seconds:8.2f}{share}")
+    return "\n".join(lines)
+
+
+def profile_output(argv=None):
+    """Return the requested output path and ``argv`` without the profile flag.
+
+    ``--profile=<file>`` wins over the ``SQUAD_PROFILE`` environment
+    variable; a bare ``--profile`` uses the variable's path or
+    ``DEFAULT_OUTPUT``. The path is None when neither asks for a profile.
+    """
+    argv = list(sys.argv if argv is None else argv)
+    output = os.environ.get(PROFILE_ENV) or None
+    remaining = []
+    for arg in argv:
+        if arg == PROFILE_FLAG:
+            output = output or DEFAULT_OUTPUT
+        elif arg.startswith(PROFILE_FLAG + "="):
+            output = arg.split("=", 1)[1] or DEFAULT_OUTPUT
+        else:
+            remaining.append(arg)
+    return output, remaining
+
+
+def start_session(argv=None):
+    """Start a profiler when the session asked for one; returns it or None.
+
+    Call it from the frame that runs the GUI event loop so the time spent
+    waiting for events is counted as idle.
+    """
+    output, _ = profile_output(argv)
+    if output is None:
+        return None
+    profiler = SamplingProfiler(output)
+    profiler.start(entry_code=sys._getframe(1).f_code)
+    print(f"Profiling this session to {output}", file=sys.stderr)
+    return profiler
@@ -0,0 +1,327 @@
+"""Rebalancing of announced teams for late arrivals and withdrawals.
+
+Instead of reshuffling everyone with ``generate_balanced_teams``, the
+existing split is kept and repaired by moving players between teams. Late
+arrivals are placed first; placing them is not counted as a move. Then
+every way of moving up to ``EXACT_MOVE_LIMIT`` existing players is searched
+in order of the number of players moved, using team sizes, GK counts and
+tier sums updated in one array pass per block of candidates. Only the
+candidates that pass those cheap checks are judged by line fairness. The
+first fair split found therefore moves provably the fewest players; ties go
+to the lowest attribute imbalance.
+
+When no fair split is that close, the search falls back to a greedy
+heuristic: one transfer or same-line swap at a time, scored incrementally
+from the per-team attribute-sum vectors, always taking the move with the
+largest gain per moved player. That result is not guaranteed to use the
+fewest moves, and the returned ``minimal`` flag says which case applied.
+"""
+import itertools
+
+import numpy as np
+
+import team_select_optimized_lib as lib
+from fairness_config import ATTRIBUTE_WEIGHTS
+
+REBALANCE_TIER_TOLERANCE = 0.5   # Tier-sum gap between teams accepted without further moves
+SIZE_PENALTY = 10.0              # Cost per player of team-size gap beyond one
+GK_PENALTY = 10.0                # Cost per team left without a GK
+CANDIDATE_POOL = 8               # Best vector-scored greedy moves re-checked against line fairness
+EXACT_MOVE_LIMIT = 3             # Moved players searched exhaustively before falling back to greedy moves
+ARRIVAL_PLACEMENT_LIMIT = 16     # Arrival placements tried exhaustively; more are placed greedily
+SEARCH_BLOCK = 4096              # Candidate splits checked per array pass
+
+
+def _player_name(player):
+    return player if isinstance(player, str) else player[lib.NAME_KEY]
+
+
+class _RebalanceState:
+    """Team membership plus incrementally maintained per-team aggregates.
+
+    Players with team ``-1`` are arrivals that have not been placed yet.
+    """
+
+    def __init__(self, players, team_of, team_count, attribute_weights, config=None):
+        self.players = players
+        self.config = config or lib.DEFAULT_CONFIG
+        self.team_of = np.array(team_of, dtype=int)
+        self.team_count = team_count
+        matrix = lib.player_attribute_matrix(players)
+        weights = lib.attribute_weight_vector(attribute_weights)
+        self.vectors = matrix * (weights / lib.attribute_scales(matrix))
+        self.tiers = matrix[:, lib.ATTRIBUTE_KEYS.index(lib.TIER_KEY)]
+        self.lines = np.array([lib.POSITION_ORDER.index(player[lib.POSITION_KEY]) for player in players], dtype=int)
+        self.is_gk = (self.lines == lib.POSITION_ORDER.index(lib.GK_LABEL)).astype(int)
+        self.reset(self.team_of)
+
+    def reset(self, team_of):
+        """Replace the whole membership and recompute the aggregates."""
+        self.team_of = np.array(team_of, dtype=int)
+        placed = self.team_of >= 0
+        self.sums = np.zeros((self.team_count, self.vectors.shape[1]))
+        np.add.at(self.sums, self.team_of[placed], self.vectors[placed])
+        self.sizes = np.bincount(self.team_of[placed], minlength=self.team_count)
+        self.gk_counts = np.bincount(
+            self.team_of[placed], weights=self.is_gk[placed], minlength=self.team_count
+        ).astype(int)
+
+    def teams(self, team_of=None):
+        team_of = self.team_of if team_of is None else team_of
+        teams = [[] for _ in range(self.team_count)]
+        for idx, team_idx in enumerate(team_of):
+            if team_idx >= 0:
+                teams[team_idx].append(self.players[idx])
+        return teams
+
+    def objective(self, sums, sizes, gk_counts):
+        """Vector objective; leading axes of the arguments index candidate moves."""
+        score = lib.attribute_imbalance(sums, np.ones(sums.shape[-1]))
+        size_gap = sizes.max(axis=-1) - sizes.min(axis=-1)
+        score = score + SIZE_PENALTY * np.maximum(0, size_gap - 1)
+        if lib.REQUIRE_GK_PER_TEAM:
+            score = score + GK_PENALTY * (gk_counts == 0).sum(axis=-1)
+        return score
+
+    def current_objective(self):
+        return float(self.objective(self.sums, self.sizes, self.gk_counts))
+
+    def transfer_candidates(self):
+        """Score moving every player to every other team in one broadcast."""
+        count = len(self.players)
+        teams = np.arange(self.team_count)
+        rows = np.arange(count)
+        if (self.team_of < 0).any():
+            raise RuntimeError("All arrivals must be placed before scoring transfers.")
+
+        sums = np.broadcast_to(self.sums, (count, self.team_count) + self.sums.shape).copy()
+        sums[rows, :, self.team_of] -= self.vectors[:, None, :]
+        sums[rows[:, None], teams[None, :], teams[None, :]] += self.vectors[:, None, :]
+
+        sizes = np.broadcast_to(self.sizes, (count, self.team_count, self.team_count)).copy()
+        sizes[rows, :, self.team_of] -= 1
+        sizes[rows[:, None], teams[None, :], teams[None, :]] += 1
+
+        gk_counts = np.broadcast_to(self.gk_counts, (count, self.team_count, self.team_count)).copy()
+        gk_counts[rows, :, self.team_of] -= self.is_gk[:, None]
+        gk_counts[rows[:, None], teams[None, :], teams[None, :]] += self.is_gk[:, None]
+
+        scores = self.objective(sums, sizes, gk_counts)
+        scores[rows, self.team_of] = np.inf
+        return [
+            (float(scores[idx, target]), 1, ("transfer", idx, target))
+            for idx, target in zip(*np.nonzero(np.isfinite(scores)))
+        ]
+
+    def swap_candidates(self):
+        """Score every same-line swap between each pair of teams in one broadcast per pair."""
+        candidates = []
+        for team_a in range(self.team_count):
+            idx_a = np.nonzero(self.team_of == team_a)[0]
+            for team_b in range(team_a + 1, self.team_count):
+                idx_b = np.nonzero(self.team_of == team_b)[0]
+                if not len(idx_a) or not len(idx_b):
+                    continue
+                moved = self.vectors[idx_a][:, None, :] - self.vectors[idx_b][None, :, :]
+                sums = np.broadcast_to(self.sums, moved.shape[:2] + self.sums.shape).copy()
+                sums[:, :, team_a] -= moved
+                sums[:, :, team_b] += moved
+                scores = self.objective(sums, self.sizes, self.gk_counts)
+                same_line = self.lines[idx_a][:, None] == self.lines[idx_b][None, :]
+                for pos_a, pos_b in zip(*np.nonzero(same_line)):
+                    candidates.append(
+                        (float(scores[pos_a, pos_b]), 2, ("swap", int(idx_a[pos_a]), int(idx_b[pos_b])))
+                    )
+        return candidates
+
+    def apply(self, move):
+        kind, first, second = move
+        if kind == "transfer":
+            self.relocate(first, second)
+        else:
+            team_a, team_b = self.team_of[first], self.team_of[second]
+            self.relocate(first, team_b)
+            self.relocate(second, team_a)
+
+    def relocate(self, idx, target):
+        """Move player ``idx`` to team ``target``, updating the aggregates."""
+        source = self.team_of[idx]
+        if source >= 0:
+            self.sums[source] -= self.vectors[idx]
+            self.sizes[source] -= 1
+            self.gk_counts[source] -= self.is_gk[idx]
+        self.sums[target] += self.vectors[idx]
+        self.sizes[target] += 1
+        self.gk_counts[target] += self.is_gk[idx]
+        self.team_of[idx] = target
+
+    def placement_scores(self, idx):
+        """Score placing the unplaced player ``idx`` on each team."""
+        teams = np.arange(self.team_count)
+        sums = np.broadcast_to(self.sums, (self.team_count,) + self.sums.shape).copy()
+        sums[teams, teams] += self.vectors[idx]
+        sizes = np.broadcast_to(self.sizes, (self.team_count, self.team_count)).copy()
+        sizes[teams, teams] += 1
+        gk_counts = np.broadcast_to(self.gk_counts, (self.team_count, self.team_count)).copy()
+        gk_counts[teams, teams] += self.is_gk[idx]
+        return self.objective(sums, sizes, gk_counts)
+
+    def cheap_checks(self, team_of):
+        """Size, GK and tier-sum checks for a (candidates, players) membership array.
+
+        Returns the boolean pass mask, the team attribute sums, sizes and GK
+        counts of every candidate.
+        """
+        member = team_of[:, :, None] == np.arange(self.team_count)
+        sizes = member.sum(axis=1)
+        gk_counts = (member * self.is_gk[None, :, None]).sum(axis=1)
+        team_tiers = (member * self.tiers[None, :, None]).sum(axis=1)
+        sums = np.einsum("cpt,pd->ctd", member, self.vectors)
+        passed = sizes.max(axis=1) - sizes.min(axis=1) <= 1
+        if lib.REQUIRE_GK_PER_TEAM:
+            passed &= (gk_counts > 0).all(axis=1)
+        passed &= team_tiers.max(axis=1) - team_tiers.min(axis=1) <= REBALANCE_TIER_TOLERANCE + 1e-9
+        return passed, sums, sizes, gk_counts
+
+    def is_fair(self, team_of=None):
+        team_of = self.team_of if team_of is None else np.asarray(team_of)
+        if not self.cheap_checks(team_of[None])[0][0]:
+            return False
+        return lib.evaluate_fairness(self.teams(team_of), self.config)["accepted"]
+
+
+def _full_score(state, move, vector_score):
+    """Vector score plus line-fairness violations of the split after ``move``."""
+    team_of = state.team_of.copy()
+    kind, first, second = move
+    if kind == "transfer":
+        team_of[first] = second
+    else:
+        team_of[first], team_of[second] = team_of[second], team_of[first]
+    return vector_score + lib.evaluate_fairness(state.teams(team_of), state.config)["violation_score"]
+
+
+def _moved_splits(base, movable, moved_count, team_count):
+    """Yield blocks of memberships that move exactly ``moved_count`` of ``movable`` players."""
+    offsets = np.array(list(itertools.product(range(1, team_count), repeat=moved_count)), dtype=int)
+    combos = itertools.combinations(movable, moved_count)
+    while True:
+        block = np.array(list(itertools.islice(combos, max(1, SEARCH_BLOCK // len(offsets)))), dtype=int)
+        if not len(block):
+            return
+        block = block.reshape(len(block), moved_count)
+        candidates = np.repeat(base[None], len(block) * len(offsets), axis=0)
+        rows = np.arange(len(candidates))[:, None]
+        picked = np.repeat(block, len(offsets), axis=0)
+        shifts = np.tile(offsets, (len(block), 1))
+        candidates[rows, picked] = (base[picked] + shifts) % team_count
+        yield candidates
+
+
+def _fewest_move_split(state, arrival_placements, existing_count, move_limit):
+    """Search memberships by number of moved players; returns ``(moves, team_of)`` or None."""
+    movable = list(range(existing_count))
+    for moved_count in range(move_limit + 1):
+        best = None
+        for base in arrival_placements:
+            blocks = [base[None]] if moved_count == 0 else _moved_splits(base, movable, moved_count, state.team_count)
+            for candidates in blocks:
+                passed, sums, sizes, gk_counts = state.cheap_checks(candidates)
+                if not passed.any():
+                    continue
+                scores = state.objective(sums[passed], sizes[passed], gk_counts[passed])
+                for score, team_of in sorted(zip(scores.tolist(), candidates[passed]), key=lambda item: item[0]):
+                    if best is not None and score >= best[0]:
+                        break
+                    if lib.evaluate_fairness(state.teams(team_of), state.config)["accepted"]:
+                        best = (score, team_of)
+                        break
+        if best is not None:
+            return moved_count, best[1]
+    return None
+
+
+def rebalance_teams(teams, added_players=(), removed_players=(), attribute_weights=ATTRIBUTE_WEIGHTS,
+                    max_moves=None, config=None):
+    """Update an existing split for late arrivals and withdrawals with few moves.
+
+    ``teams`` is the ``teams`` list returned by ``generate_balanced_teams`` or
+    ``run_team_assignment(return_details=True)``. ``removed_players`` may hold
+    names or player dicts. Returns the new teams with their fairness and
+    attribute summaries, the ``moves`` made, ``selection`` ("accepted" or
+    "best_effort") and ``minimal``, which is True when the split is proven
+    to move the fewest players (see the module docstring).
+    """
+    config = config or lib.DEFAULT_CONFIG
+    team_count = len(teams)
+    removed_names = {_player_name(player) for player in removed_players}
+
+    players = []
+    home = []
+    for team_idx, team in enumerate(teams):
+        for player in team:
+            if player[lib.NAME_KEY] not in removed_names:
+                players.append(player)
+                home.append(team_idx)
+
+    existing_count = len(players)
+    added = [player for player in added_players if player[lib.NAME_KEY] not in removed_names]
+    lib.assign_player_lines(added, team_count=team_count)
+    for player in added + players:
+        player[lib.POSITION_KEY] = lib.normalize_position(player.get(lib.POSITION_KEY, ""))
+        if player[lib.POSITION_KEY] not in lib.POSITION_ORDER:
+            raise ValueError(f"Unsupported position '{player[lib.POSITION_KEY]}' for {player[lib.NAME_KEY]}.")
+        player[lib.STRENGTH_KEY] = lib.classify_strength_from_tier(player[lib.TIER_KEY], config)
+
+    # Greedy arrival placement, GKs first; also the start of the greedy fallback.
+    state = _RebalanceState(players + added, home + [-1] * len(added), team_count, attribute_weights, config)
+    arrivals = sorted(range(existing_count, len(state.players)), key=lambda idx: -state.is_gk[idx])
+    for idx in arrivals:
+        state.relocate(idx, int(state.placement_scores(idx).argmin()))
+    greedy_start = state.team_of.copy()
+
+    if max_moves is None:
+        max_moves = existing_count
+    placements = [greedy_start]
+    if added and team_count ** len(added) <= ARRIVAL_PLACEMENT_LIMIT:
+        for teams_of_arrivals in itertools.product(range(team_count), repeat=len(added)):
+            placement = greedy_start.copy()
+            placement[existing_count:] = teams_of_arrivals
+            placements.append(placement)
+
+    found = _fewest_move_split(state, placements, existing_count, min(EXACT_MOVE_LIMIT, max_moves))
+    if found is not None:
+        state.reset(found[1])
+    else:
+        moves_used = 0
+        while moves_used < max_moves and not state.is_fair():
+            current = state.current_objective() + lib.evaluate_fairness(state.teams(), config)["violation_score"]
+            candidates = state.transfer_candidates() + state.swap_candidates()
+            candidates = [item for item in candidates if moves_used + item[1] <= max_moves]
+            candidates.sort(key=lambda item: (item[0] - current) / item[1])
+
+            best = None
+            for vector_score, cost, move in candidates[:CANDIDATE_POOL]:
+                gain = (current - _full_score(state, move, vector_score)) / cost
+                if gain > 1e-9 and (best is None or gain > best[0]):
+                    best = (gain, cost, move)
+            if best is None:
+                break
+
+            state.apply(best[2])
+            moves_used += best[1]
+
+    final_teams = state.teams()
+    moves = [
+        {"name": state.players[idx][lib.NAME_KEY], "from": home[idx] + 1, "to": int(state.team_of[idx]) + 1}
+        for idx in range(existing_count)
+        if state.team_of[idx] != home[idx]
+    ]
+    return {
+        "teams": final_teams,
+        "fairness": lib.evaluate_fairness(final_teams, config),
+        "attributes": lib.attribute_summary(final_teams, attribute_weights),
+        "moves": moves,
+        "selection": "accepted" if state.is_fair() else "best_effort",
+        "minimal": found is not None,
+    }
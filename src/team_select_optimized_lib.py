@@ -8,27 +8,106 @@ TIER_KEY = "tier"                   # Column used to evaluate players
 POSITION_KEY = "position"
 NAME_KEY = "name"
 STRENGTH_KEY = "strength"
+POSITIONS_KEY = "positions"         # All eligible positions for multi-position players
+STAMINA_KEY = "stamina"
+SKILL_KEY = "skill"
+ATTRIBUTE_KEYS = [TIER_KEY, STAMINA_KEY, SKILL_KEY]  # Columns balanced as a vector
 GK_LABEL = "GK"
-DEFAULT_ENCODING = "utf-8"
+POSITION_ORDER = [GK_LABEL, "DF", "MF", "ST"]
+LINE_COUNT_WEIGHT = 1.0             # Cost per squared slot away from a line's target size
+LINE_PREFERENCE_WEIGHT = 0.05       # Cost per step down a player's listed position order
+LINE_FIT_WEIGHT = 0.1               # Cost per tier point away from the line's median
+PLAYER_FORM_SIGMA = 0.5             # Match-day spread of a player's performance around their tier
+BASE_GOAL_RATE = 2.0                # Expected goals per team in an even match
+GOAL_RATE_SCALE = 0.15              # Log goal-rate change per point of attack over opposing defence
+LINE_ATTACK_WEIGHTS = {GK_LABEL: 0.0, "DF": 0.2, "MF": 0.5, "ST": 1.0}
+LINE_DEFENCE_WEIGHTS = {GK_LABEL: 1.0, "DF": 1.0, "MF": 0.5, "ST": 0.0}
+DEFAULT_ENCODING = "utf-8"          # Every roster CSV and log; pandas drops a BOM (Excel exports) on read
+RUN_LOG_ENV = "SQUAD_RUN_LOG"       # When set, every run_team_assignment call is appended to this file
+STRENGTH_LABELS = ["weak", "balanced", "strong"]
+UNKNOWN_STRENGTH = "unknown"
+NUMERIC_COLUMNS = [TIER_KEY, STAMINA_KEY]  # Coerced to float; unparseable values become NaN
 
 # === Core Logic ===
+import contextlib
+import dataclasses
+import hashlib
+import importlib
+import json
+import os
 import random
+import time
+import numpy as np
 import pandas as pd
 import tkinter as tk
 from tkinter import messagebox
-from fairness_config import DEFAULT_MEDIAN_DELTA, DEFAULT_IQR_DELTA, MAX_RETRIES
-
-
-def classify_strength_from_tier(tier_value):
+from fairness_config import (
+    DEFAULT_MEDIAN_DELTA,
+    DEFAULT_IQR_DELTA,
+    MAX_RETRIES,
+    ATTRIBUTE_WEIGHTS,
+    ATTRIBUTE_SWAP_TIER_TOLERANCE,
+    WIN_PROBABILITY_TOLERANCE,
+    WIN_SIMULATIONS,
+)
+from rating_scales import SKILL_MAPPING
+
+
+@dataclasses.dataclass(frozen=True)
+class BalanceConfig:
+    """Settings for one team assignment, passed explicitly instead of module globals.
+
+    Instances are immutable, hashable and picklable, so differently configured
+    assignments can run side by side in threads or worker processes. Line
+    limits may be given as dicts; they are stored as sorted ``(line, delta)``
+    tuples. ``seed`` fixes the random stream of an assignment (None: fresh).
+    """
+
+    tier_threshold_low: float = TIER_THRESHOLD_LOW
+    tier_threshold_high: float = TIER_THRESHOLD_HIGH
+    median_delta: tuple = tuple(sorted(DEFAULT_MEDIAN_DELTA.items()))
+    iqr_delta: tuple = tuple(sorted(DEFAULT_IQR_DELTA.items()))
+    team_count: int = TEAM_COUNT
+    seed: object = None
+
+    def __post_init__(self):
+        for name in ("median_delta", "iqr_delta"):
+            value = getattr(self, name)
+            items = value.items() if isinstance(value, dict) else value
+            object.__setattr__(self, name, tuple(sorted((line, float(delta)) for line, delta in items)))
+        if self.tier_threshold_low >= self.tier_threshold_high:
+            raise ValueError("Tier threshold must be lower than carrier threshold.")
+        if self.team_count < 2:
+            raise ValueError("At least 2 teams are required.")
+
+    def median_limit(self, line):
+        return dict(self.median_delta)[line]
+
+    def iqr_limit(self, line):
+        return dict(self.iqr_delta)[line]
+
+    def replace(self, **changes):
+        return dataclasses.replace(self, **changes)
+
+    def rng(self):
+        """Return a new ``random.Random`` for this config's seed."""
+        return random.Random(self.seed)
+
+
+DEFAULT_CONFIG = BalanceConfig()
+
+
+def classify_strength_from_tier(tier_value, config=None):
     """Return the strength classification for a tier value."""
+    config = config or DEFAULT_CONFIG
     try:
         tier = float(tier_value)
     except (TypeError, ValueError):
         return "unknown"
 
-    if tier <= TIER_THRESHOLD_LOW:
+    if tier <= config.tier_threshold_low:
         return "weak"
-    if tier >= TIER_THRESHOLD_HIGH:
+    if tier >= config.tier_threshold_high:
         return "strong"
     return "balanced"
 
@@ -60,31 +139,272 @@ def show_popup(title, text):
 
     root.mainloop()
 
+def strength_codes(tiers, config=None):
+    """Vectorized ``classify_strength_from_tier`` as indices into ``STRENGTH_LABELS + [UNKNOWN_STRENGTH]``."""
+    config = config or DEFAULT_CONFIG
+    low, high = config.tier_threshold_low, config.tier_threshold_high
+    tiers = pd.to_numeric(pd.Series(tiers), errors="coerce").to_numpy(dtype=float)
+    return np.select([np.isnan(tiers), tiers <= low, tiers >= high], [3, 0, 2], default=1).astype(np.int8)
+
+
+def strength_column(tiers, config=None):
+    """Vectorized ``classify_strength_from_tier`` for a whole tier column."""
+    return np.array(STRENGTH_LABELS + [UNKNOWN_STRENGTH], dtype=object)[strength_codes(tiers, config)]
+
+
+def position_columns(values):
+    """Vectorized ``normalize_position``/``parse_positions`` for a whole column.
+
+    Returns the primary position as a categorical over ``POSITION_ORDER``
+    (missing labels become "", unknown ones are kept so errors can name
+    them) and the list of every label.
+    """
+    cleaned = (
+        pd.Series(values, dtype="object")
+        .where(lambda column: column.map(type) == str, "")
+        .str.upper()
+        .str.replace(r"[\[\]'\"\s]", "", regex=True)
+    )
+    labels = cleaned.tolist()
+    positions = [[label] if label else [] for label in labels]
+    # Only multi-position rows need splitting and de-duplication.
+    for row in np.flatnonzero(cleaned.str.contains(",", regex=False).to_numpy(dtype=bool)):
+        positions[row] = list(dict.fromkeys(label for label in labels[row].split(",") if label))
+    first = [labels[0] if labels else "" for labels in positions]
+    unknown = sorted(set(first).difference(POSITION_ORDER, [""]))
+    primary = pd.Categorical(first, categories=POSITION_ORDER + [""] + unknown)
+    positions = pd.Series(positions, index=cleaned.index, dtype="object")
+    return primary, positions
+
+
+def normalize_roster_frame(df, positions=True):
+    """Bring a roster DataFrame to the typed schema in one vectorized pass.
+
+    ``NUMERIC_COLUMNS`` become floats (so stamina "60" and "60.0" match),
+    strength is recomputed from tier and, when ``positions`` is true, the
+    position column is parsed into a categorical primary position plus the
+    ``POSITIONS_KEY`` list column.
+    """
+    for column in NUMERIC_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype(float)
+    if TIER_KEY in df.columns:
+        df[STRENGTH_KEY] = strength_column(df[TIER_KEY])
+    if positions and POSITION_KEY in df.columns:
+        df[POSITION_KEY], df[POSITIONS_KEY] = position_columns(df[POSITION_KEY])
+    return df
+
+
+def format_stamina(value):
+    """Return a numeric stamina as its level label, e.g. 60.0 -> "60"; None when missing."""
+    try:
+        stamina = float(value)
+    except (TypeError, ValueError):
+        return None
+    if stamina != stamina:
+        return None
+    return f"{stamina:g}"
+
+
 def write_players_to_csv(filename, players):
     df = pd.DataFrame(players)
     if TIER_KEY in df.columns:
-        df[STRENGTH_KEY] = df[TIER_KEY].apply(classify_strength_from_tier)
+        df[STRENGTH_KEY] = strength_column(df[TIER_KEY])
     df.to_csv(filename, index=False, encoding=DEFAULT_ENCODING)
 
 def read_players_from_csv(filename):
-    df = pd.read_csv(filename, encoding=DEFAULT_ENCODING)
-    if TIER_KEY in df.columns:
-        df[STRENGTH_KEY] = df[TIER_KEY].apply(classify_strength_from_tier)
-    df[POSITION_KEY] = df[POSITION_KEY].apply(normalize_position)
-    return df.to_dict(orient='records')
+    df = normalize_roster_frame(pd.read_csv(filename, encoding=DEFAULT_ENCODING))
+    # Zipping native column lists is much cheaper than ``to_dict(orient='records')``.
+    columns = list(df.columns)
+    return [dict(zip(columns, row)) for row in zip(*(df[column].tolist() for column in columns))]
 
 
-def normalize_position(position_value):
-    """Normalize position values to a single label: GK/DF/MF/ST."""
+def parse_positions(position_value):
+    """Return every position label in a value such as "DF" or "['DF','MF']"."""
     if not isinstance(position_value, str):
-        return ""
+        return []
 
     cleaned = position_value.strip()
     if cleaned.startswith("[") and cleaned.endswith("]"):
-        parts = cleaned.strip("[]").replace("'", "").split(',')
-        cleaned = parts[0].strip() if parts else ""
+        parts = cleaned.strip("[]").replace("'", "").replace('"', "").split(',')
+    else:
+        parts = [cleaned]
+
+    positions = []
+    for part in parts:
+        label = part.strip().upper()
+        if label and label not in positions:
+            positions.append(label)
+    return positions
+
+
+def normalize_position(position_value):
+    """Normalize position values to a single label: GK/DF/MF/ST."""
+    positions = parse_positions(position_value)
+    return positions[0] if positions else ""
+
+
+def _player_positions(player):
+    """Return the eligible positions of a player, keeping them on the player."""
+    positions = player.get(POSITIONS_KEY)
+    if not isinstance(positions, list) or not positions:
+        positions = parse_positions(player.get(POSITION_KEY, ""))
+        player[POSITIONS_KEY] = positions
+    return positions
+
+
+def _min_cost_assignment(cost):
+    """Solve a rectangular assignment problem (rows <= columns) in O(n^2 m).
+
+    Uses the Hungarian method with potentials and returns the column index
+    assigned to each row. The scan over the columns is done in NumPy, so the
+    Python-level work is O(n^2): about 0.4 s for 200 players who all list
+    several lines, against 2 s for a plain-Python column loop.
+    """
+    row_count = len(cost)
+    if row_count == 0:
+        return []
+    cost = np.asarray(cost, dtype=float)
+    col_count = cost.shape[1]
+    u = np.zeros(row_count + 1)
+    v = np.zeros(col_count + 1)
+    owner = np.zeros(col_count + 1, dtype=int)
+    way = np.zeros(col_count + 1, dtype=int)
+
+    for row in range(1, row_count + 1):
+        owner[0] = row
+        col0 = 0
+        min_reduced = np.full(col_count + 1, np.inf)
+        used = np.zeros(col_count + 1, dtype=bool)
+        while True:
+            used[col0] = True
+            row0 = owner[col0]
+            free = ~used
+            free[0] = False
+            reduced = np.full(col_count + 1, np.inf)
+            reduced[1:] = cost[row0 - 1] - u[row0] - v[1:]
+            better = free & (reduced < min_reduced)
+            min_reduced[better] = reduced[better]
+            way[better] = col0
+            # argmin keeps the first of equal columns, as a left-to-right scan would.
+            col1 = int(np.where(free, min_reduced, np.inf).argmin())
+            delta = min_reduced[col1]
+            u[owner[used]] += delta
+            v[used] -= delta
+            min_reduced[free] -= delta
+            col0 = col1
+            if owner[col0] == 0:
+                break
+        while col0:
+            col1 = way[col0]
+            owner[col0] = owner[col1]
+            col0 = col1
+
+    assignment = [0] * row_count
+    for col in range(1, col_count + 1):
+        if owner[col]:
+            assignment[owner[col] - 1] = col - 1
+    return assignment
+
+
+def _line_targets(fixed_counts, flexible, team_count):
+    """Return target line sizes, rounded to multiples of ``team_count`` where possible."""
+    targets = {}
+    gk_capable = sum(1 for _, options in flexible if GK_LABEL in options)
+    fixed_gk = fixed_counts[GK_LABEL]
+    targets[GK_LABEL] = max(fixed_gk, min(team_count, fixed_gk + gk_capable))
+
+    outfield_lines = ["DF", "MF", "ST"]
+    demand = {line: float(fixed_counts[line]) for line in outfield_lines}
+    for _, options in flexible:
+        outfield_options = [line for line in options if line in demand]
+        for line in outfield_options:
+            demand[line] += 1.0 / len(outfield_options)
+
+    outfield_total = (
+        sum(fixed_counts[line] for line in outfield_lines)
+        + len(flexible)
+        - (targets[GK_LABEL] - fixed_gk)
+    )
+    demand_total = sum(demand.values())
+    if demand_total <= 0 or outfield_total <= 0:
+        targets.update({line: fixed_counts[line] for line in outfield_lines})
+        return targets
+
+    shares = {line: demand[line] / demand_total * outfield_total / team_count for line in outfield_lines}
+    units = {line: int(shares[line]) for line in outfield_lines}
+    remaining_units = outfield_total // team_count - sum(units.values())
+    by_remainder = sorted(outfield_lines, key=lambda line: shares[line] - units[line], reverse=True)
+    for line in by_remainder[:remaining_units]:
+        units[line] += 1
+    for line in outfield_lines:
+        targets[line] = units[line] * team_count
+    targets[by_remainder[0]] += outfield_total % team_count
+    return targets
+
+
+def assign_player_lines(players, team_count=2):
+    """Assign every multi-position player to a single line before team splitting.
+
+    Flexible players are matched to line slots with a min-cost assignment.
+    The slot costs are convex in the resulting line size, so lines fill
+    towards sizes divisible by ``team_count`` and split evenly in the
+    round-based assignment. With ``REQUIRE_GK_PER_TEAM``, GK-capable players
+    fill the missing goals before any outfield line is considered. Ties
+    favour the player's listed order and the line whose fixed players have
+    the closest median tier.
+
+    Like ``balance_teams``, this works in place: the chosen line is written
+    to each flexible player's ``POSITION_KEY`` (``POSITIONS_KEY`` keeps every
+    option), so pass copies when the dicts must stay untouched.
+    """
+    fixed_counts = {line: 0 for line in POSITION_ORDER}
+    fixed_tiers = {line: [] for line in POSITION_ORDER}
+    flexible = []
+
+    for player in players:
+        options = [line for line in _player_positions(player) if line in fixed_counts]
+        if len(options) > 1:
+            flexible.append((player, options))
+            continue
+        line = options[0] if options else normalize_position(player.get(POSITION_KEY, ""))
+        if line in fixed_counts:
+            fixed_counts[line] += 1
+            fixed_tiers[line].append(float(player[TIER_KEY]))
+
+    if not flexible:
+        return
+
+    targets = _line_targets(fixed_counts, flexible, team_count)
+    line_medians = {line: median(tiers) for line, tiers in fixed_tiers.items() if tiers}
+
+    infeasible = 1e9
+    required = -1e6
+    slots = []
+    for line in POSITION_ORDER:
+        capacity = sum(1 for _, options in flexible if line in options)
+        for extra in range(1, capacity + 1):
+            size_over = fixed_counts[line] + extra - targets[line]
+            if line == GK_LABEL and REQUIRE_GK_PER_TEAM and size_over <= 0:
+                slots.append((line, required))
+            else:
+                slots.append((line, LINE_COUNT_WEIGHT * (2 * size_over - 1)))
+
+    cost = []
+    for player, options in flexible:
+        tier = float(player[TIER_KEY])
+        row = []
+        for line, marginal_cost in slots:
+            if line not in options:
+                row.append(infeasible)
+                continue
+            fit = abs(tier - line_medians[line]) if line in line_medians else 0.0
+            row.append(marginal_cost + LINE_PREFERENCE_WEIGHT * options.index(line) + LINE_FIT_WEIGHT * fit)
+        cost.append(row)
+
+    for (player, _), slot_index in zip(flexible, _min_cost_assignment(cost)):
+        player[POSITION_KEY] = slots[slot_index][0]
 
-    return cleaned.upper()
 
 def evaluate_team(team):
     return sum(player[TIER_KEY] for player in team)
@@ -136,7 +456,9 @@ def _line_tiers(team):
     return lines
 
 
-def _evaluate_fairness(teams):
+def evaluate_fairness(teams, config=None):
+    """Compare the per-line tier medians and IQRs of two teams with the config limits."""
+    config = config or DEFAULT_CONFIG
     if len(teams) != 2:
         return {
             "accepted": True,
@@ -168,11 +490,13 @@ def _evaluate_fairness(teams):
         iqr_delta[line] = abs(iqrs["team1"][line] - iqrs["team2"][line])
 
         epsilon = 1e-9
-        median_over = max(0.0, median_delta[line] - DEFAULT_MEDIAN_DELTA[line] - epsilon)
-        iqr_over = max(0.0, iqr_delta[line] - DEFAULT_IQR_DELTA[line] - epsilon)
+        median_limit = config.median_limit(line)
+        iqr_limit = config.iqr_limit(line)
+        median_over = max(0.0, median_delta[line] - median_limit - epsilon)
+        iqr_over = max(0.0, iqr_delta[line] - iqr_limit - epsilon)
         violation_score += median_over + iqr_over
 
-        if median_delta[line] - DEFAULT_MEDIAN_DELTA[line] > epsilon or iqr_delta[line] - DEFAULT_IQR_DELTA[line] > epsilon:
+        if median_delta[line] - median_limit > epsilon or iqr_delta[line] - iqr_limit > epsilon:
             accepted = False
 
     return {
@@ -185,15 +509,272 @@ def _evaluate_fairness(teams):
     }
 
 
-def generate_balanced_teams(players, team_count=2, max_retries=MAX_RETRIES):
+def _attribute_value(player, key):
+    """Return a numeric attribute value, or NaN when the column is missing or invalid."""
+    value = player.get(key)
+    if key == SKILL_KEY:
+        if isinstance(value, str):
+            return SKILL_MAPPING.get(value.strip(), np.nan)
+        return np.nan
+
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return np.nan
+    if key == STAMINA_KEY:
+        return number / 100.0
+    return number
+
+
+def player_attribute_matrix(players):
+    """Return an (n_players, len(ATTRIBUTE_KEYS)) array of attribute values.
+
+    Stamina is scaled to 0-1 and skill is read through ``SKILL_MAPPING``.
+    Missing values get the column mean so they do not pull on the balance.
+    """
+    matrix = np.array(
+        [[_attribute_value(player, key) for key in ATTRIBUTE_KEYS] for player in players],
+        dtype=float,
+    ).reshape(len(players), len(ATTRIBUTE_KEYS))
+    if matrix.size == 0:
+        return matrix
+
+    missing = np.isnan(matrix)
+    counts = (~missing).sum(axis=0)
+    means = np.where(counts > 0, np.where(missing, 0.0, matrix).sum(axis=0) / np.maximum(counts, 1), 0.0)
+    return np.where(missing, means, matrix)
+
+
+def attribute_weight_vector(attribute_weights):
+    """Return attribute weights as an array ordered like ``ATTRIBUTE_KEYS``."""
+    weights = ATTRIBUTE_WEIGHTS if attribute_weights is None else attribute_weights
+    return np.array([float(weights.get(key, 0.0)) for key in ATTRIBUTE_KEYS])
+
+
+def attribute_scales(matrix):
+    """Per-attribute spread used to make tier, stamina and skill comparable."""
+    scales = matrix.std(axis=0) if len(matrix) else np.ones(len(ATTRIBUTE_KEYS))
+    return np.where(scales > 1e-9, scales, 1.0)
+
+
+def attribute_imbalance(team_sums, weights):
+    """Weighted sum over attributes of the gap between the highest and lowest team.
+
+    ``team_sums`` may carry leading batch dimensions; the last two axes are
+    (team, attribute).
+    """
+    spread = team_sums.max(axis=-2) - team_sums.min(axis=-2)
+    return spread @ weights
+
+
+def attribute_summary(teams, attribute_weights):
+    """Return per-team attribute sums and the weighted imbalance of a split."""
+    players = [player for team in teams for player in team]
+    matrix = player_attribute_matrix(players)
+    membership = np.repeat(np.arange(len(teams)), [len(team) for team in teams])
+    sums = np.zeros((len(teams), len(ATTRIBUTE_KEYS)))
+    np.add.at(sums, membership, matrix)
+    weights = attribute_weight_vector(attribute_weights) / attribute_scales(matrix)
+    return {
+        "sums": [dict(zip(ATTRIBUTE_KEYS, team_sums.round(4).tolist())) for team_sums in sums],
+        "imbalance": float(attribute_imbalance(sums, weights)) if len(teams) else 0.0,
+    }
+
+
+def _refine_attribute_balance(teams, attribute_weights):
+    """Swap same-line players between teams while the attribute imbalance drops.
+
+    Each team keeps an attribute-sum vector that is updated in place after
+    every swap. All candidate swaps of a team pair are scored in a single
+    broadcast, so extra attributes only widen the last array axis. Swaps are
+    limited to players whose tiers differ by at most
+    ``ATTRIBUTE_SWAP_TIER_TOLERANCE`` to keep the line medians intact.
+    """
+    weights = attribute_weight_vector(attribute_weights)
+    if len(teams) < 2 or not weights.any():
+        return
+
+    players = [player for team in teams for player in team]
+    matrix = player_attribute_matrix(players)
+    scaled = matrix * (weights / attribute_scales(matrix))
+    tiers = matrix[:, ATTRIBUTE_KEYS.index(TIER_KEY)]
+    lines = np.array([POSITION_ORDER.index(player[POSITION_KEY]) for player in players])
+
+    members = []
+    start = 0
+    for team in teams:
+        members.append(list(range(start, start + len(team))))
+        start += len(team)
+    team_sums = np.array([scaled[idx].sum(axis=0) for idx in members])
+
+    for _ in range(len(players)):
+        current = attribute_imbalance(team_sums, np.ones(len(ATTRIBUTE_KEYS)))
+        best = None
+        for team_a in range(len(teams)):
+            for team_b in range(team_a + 1, len(teams)):
+                idx_a = np.array(members[team_a], dtype=int)
+                idx_b = np.array(members[team_b], dtype=int)
+                if not len(idx_a) or not len(idx_b):
+                    continue
+                moved = scaled[idx_a][:, None, :] - scaled[idx_b][None, :, :]
+                new_a = team_sums[team_a] - moved
+                new_b = team_sums[team_b] + moved
+                high = np.maximum(new_a, new_b)
+                low = np.minimum(new_a, new_b)
+                others = np.delete(team_sums, [team_a, team_b], axis=0)
+                if len(others):
+                    high = np.maximum(high, others.max(axis=0))
+                    low = np.minimum(low, others.min(axis=0))
+                objective = (high - low).sum(axis=-1)
+                allowed = (lines[idx_a][:, None] == lines[idx_b][None, :]) & (
+                    np.abs(tiers[idx_a][:, None] - tiers[idx_b][None, :]) <= ATTRIBUTE_SWAP_TIER_TOLERANCE + 1e-9
+                )
+                objective = np.where(allowed, objective, np.inf)
+                flat = int(objective.argmin())
+                pos_a, pos_b = divmod(flat, len(idx_b))
+                if best is None or objective[pos_a, pos_b] < best[0]:
+                    best = (objective[pos_a, pos_b], team_a, team_b, pos_a, pos_b)
+
+        if best is None or best[0] >= current - 1e-9:
+            break
+
+        _, team_a, team_b, pos_a, pos_b = best
+        player_a = members[team_a][pos_a]
+        player_b = members[team_b][pos_b]
+        moved = scaled[player_a] - scaled[player_b]
+        team_sums[team_a] -= moved
+        team_sums[team_b] += moved
+        members[team_a][pos_a] = player_b
+        members[team_b][pos_b] = player_a
+
+    for team, idx in zip(teams, members):
+        team[:] = [players[i] for i in idx]
+
+
+def estimate_win_probabilities(teams, simulations=WIN_SIMULATIONS, rng=None):
+    """Estimate each team's win probability by simulating ``simulations`` matches.
+
+    Every simulation draws each player's form around their tier, sums it per
+    line, and turns attack against the opposing defence into Poisson goal
+    counts. With more than two teams the result is the average over every
+    pairing. Returns ``{"win": [...], "draw": p}``.
+    """
+    team_count = len(teams)
+    if team_count < 2:
+        return {"win": [1.0] * team_count, "draw": 0.0}
+    if rng is None:
+        rng = np.random.default_rng(random.getrandbits(32))
+
+    players = [player for team in teams for player in team]
+    tiers = np.array([float(player[TIER_KEY]) for player in players])
+    membership = np.repeat(np.arange(team_count), [len(team) for team in teams])
+    positions = [normalize_position(player.get(POSITION_KEY, "")) for player in players]
+    attack = np.zeros((len(players), team_count))
+    defence = np.zeros((len(players), team_count))
+    attack[np.arange(len(players)), membership] = [LINE_ATTACK_WEIGHTS.get(pos, 0.5) for pos in positions]
+    defence[np.arange(len(players)), membership] = [LINE_DEFENCE_WEIGHTS.get(pos, 0.5) for pos in positions]
+
+    form = tiers + rng.normal(0.0, PLAYER_FORM_SIGMA, size=(simulations, len(players)))
+    team_attack = form @ attack
+    team_defence = form @ defence
+
+    wins = np.zeros(team_count)
+    draws = 0.0
+    for team_a in range(team_count):
+        for team_b in range(team_a + 1, team_count):
+            edge_a = team_attack[:, team_a] - team_defence[:, team_b]
+            edge_b = team_attack[:, team_b] - team_defence[:, team_a]
+            center = (edge_a + edge_b) / 2
+            goals_a = rng.poisson(BASE_GOAL_RATE * np.exp(GOAL_RATE_SCALE * (edge_a - center)))
+            goals_b = rng.poisson(BASE_GOAL_RATE * np.exp(GOAL_RATE_SCALE * (edge_b - center)))
+            wins[team_a] += np.mean(goals_a > goals_b)
+            wins[team_b] += np.mean(goals_b > goals_a)
+            draws += np.mean(goals_a == goals_b)
+
+    pairings = team_count * (team_count - 1) / 2
+    return {
+        "win": (wins / (team_count - 1)).round(4).tolist(),
+        "draw": round(float(draws / pairings), 4),
+    }
+
+
+def _evaluate_win_probability(teams, config=None):
+    """Acceptance on simulated win probabilities; line statistics are kept for reporting."""
+    config = config or DEFAULT_CONFIG
+    fairness = evaluate_fairness(teams, config)
+    probabilities = estimate_win_probabilities(teams, rng=np.random.default_rng(config.seed))
+    gap = max(probabilities["win"]) - min(probabilities["win"])
+    fairness["line_accepted"] = fairness["accepted"]
+    fairness["accepted"] = gap <= WIN_PROBABILITY_TOLERANCE
+    fairness["violation_score"] = max(0.0, gap - WIN_PROBABILITY_TOLERANCE)
+    fairness["win_probability"] = probabilities
+    return fairness
+
+
+FAIRNESS_CRITERIA = {
+    "lines": evaluate_fairness,
+    "win_probability": _evaluate_win_probability,
+}
+
+# Split engines: engine(players, team_count=, attribute_weights=, config=, rng=) -> teams.
+# Filled in below; other modules may add their own under a new name.
+ENGINES = {}
+# Engines registered by their own module, imported the first time they are requested.
+ENGINE_MODULES = {"dp": "dp_engine"}
+
+
+def resolve_engine(engine):
+    """Return the split function registered as ``engine``, importing its module if needed."""
+    if engine not in ENGINES and engine in ENGINE_MODULES:
+        importlib.import_module(ENGINE_MODULES[engine])
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown balancing engine '{engine}'.")
+    return ENGINES[engine]
+
+
+def _stage(tracker, name):
+    return tracker.stage(name) if tracker is not None else contextlib.nullcontext()
+
+
+def generate_balanced_teams(players, team_count=None, max_retries=MAX_RETRIES, attribute_weights=ATTRIBUTE_WEIGHTS,
+                            criterion="lines", progress=None, config=None, engine="rounds", tracker=None):
+    """Retry the split ``engine`` (default ``balance_teams``) until a split passes ``criterion``.
+
+    ``team_count`` defaults to ``config.team_count``. All attempts draw from
+    one random stream seeded by ``config.seed``.
+    ``progress(attempt_index, max_retries, best_violation_score)`` is called
+    after every rejected attempt; returning False stops the search and the
+    best split so far is returned with selection "cancelled". A ``tracker``
+    (see ``alloc_tracking.AllocationTracker``) is told where each attempt and
+    its split/fairness/attributes stages start and end.
+    """
+    if criterion not in FAIRNESS_CRITERIA:
+        raise ValueError(f"Unknown fairness criterion '{criterion}'.")
+    config = config or DEFAULT_CONFIG
+    team_count = config.team_count if team_count is None else team_count
+    split = resolve_engine(engine)
+    evaluate = FAIRNESS_CRITERIA[criterion]
+    rng = config.rng()
     attempts = []
+    best_violation = float("inf")
+    cancelled = False
+    assign_player_lines(players, team_count=team_count)
 
     for attempt_idx in range(1, max_retries + 1):
-        candidate_teams = balance_teams(players, team_count=team_count)
-        fairness = _evaluate_fairness(candidate_teams)
+        if tracker is not None:
+            tracker.begin_attempt(attempt_idx)
+        with _stage(tracker, "split"):
+            candidate_teams = split(
+                players, team_count=team_count, attribute_weights=attribute_weights, config=config, rng=rng
+            )
+        with _stage(tracker, "fairness"):
+            fairness = evaluate(candidate_teams, config)
+        with _stage(tracker, "attributes"):
+            attributes = attribute_summary(candidate_teams, attribute_weights)
         attempt_payload = {
             "teams": candidate_teams,
             "fairness": fairness,
+            "attributes": attributes,
             "attempt_index": attempt_idx,
         }
         attempts.append(attempt_payload)
@@ -203,9 +784,17 @@ def generate_balanced_teams(players, team_count=2, max_retries=MAX_RETRIES):
             attempt_payload["attempts_evaluated"] = attempts
             return attempt_payload
 
-    chosen = min(attempts, key=lambda attempt: attempt["fairness"]["violation_score"])
-    chosen["selection"] = "fallback"
-    chosen["retries_used"] = max_retries
+        best_violation = min(best_violation, fairness["violation_score"])
+        if progress is not None and progress(attempt_idx, max_retries, best_violation) is False:
+            cancelled = True
+            break
+
+    chosen = min(
+        attempts,
+        key=lambda attempt: (attempt["fairness"]["violation_score"], attempt["attributes"]["imbalance"]),
+    )
+    chosen["selection"] = "cancelled" if cancelled else "fallback"
+    chosen["retries_used"] = len(attempts)
     chosen["attempts_evaluated"] = attempts
     return chosen
 
@@ -259,39 +848,44 @@ def generate_balanced_teams(players, team_count=2, max_retries=MAX_RETRIES):
 #    return teams_list[best_index]
 
 # new team balance
-def _lowest_score_team_index(team_scores):
+def _lowest_score_team_index(team_scores, rng=random):
     """Return a random index among teams with the current lowest score."""
     min_score = min(team_scores)
     candidates = [idx for idx, score in enumerate(team_scores) if score == min_score]
-    return random.choice(candidates)
+    return rng.choice(candidates)
 
 
-def _assign_players_in_rounds(teams, players, team_scores, team_count):
-    """Assign players in top-tier rounds; leftover players go to lowest-score teams."""
+def assign_players_in_rounds(teams, players, team_scores, team_count, rng=random):
+    """Deal ``players`` into ``teams`` in top-tier rounds, updating ``team_scores`` in place.
+
+    Leftover players of an incomplete round go to the lowest-score teams.
+    """
     ordered_players = list(players)
-    random.shuffle(ordered_players)
+    rng.shuffle(ordered_players)
     ordered_players.sort(key=lambda p: p[TIER_KEY], reverse=True)
 
     for start in range(0, len(ordered_players), team_count):
         batch = ordered_players[start:start + team_count]
         if len(batch) == team_count:
-            random.shuffle(batch)
+            rng.shuffle(batch)
             for team_idx, player in enumerate(batch):
                 teams[team_idx].append(player)
                 team_scores[team_idx] += player[TIER_KEY]
             continue
 
         for player in batch:
-            team_idx = _lowest_score_team_index(team_scores)
+            team_idx = _lowest_score_team_index(team_scores, rng)
             teams[team_idx].append(player)
             team_scores[team_idx] += player[TIER_KEY]
 
 
-def balance_teams(players, team_count=2):
-    position_order = [GK_LABEL, "DF", "MF", "ST"]
+def balance_teams(players, team_count=None, attribute_weights=None, config=None, rng=None):
+    config = config or DEFAULT_CONFIG
+    team_count = config.team_count if team_count is None else team_count
+    rng = config.rng() if rng is None else rng
     teams = [[] for _ in range(team_count)]
     team_scores = [0.0] * team_count
-    players_by_position = {position: [] for position in position_order}
+    players_by_position = {position: [] for position in POSITION_ORDER}
 
     for player in players:
         position = normalize_position(player.get(POSITION_KEY, ""))
@@ -299,7 +893,7 @@ def balance_teams(players, team_count=2):
         if position not in players_by_position:
             raise ValueError(f"Unsupported position '{position}' for {player[NAME_KEY]}.")
         players_by_position[position].append(player)
-        player[STRENGTH_KEY] = classify_strength_from_tier(player[TIER_KEY])
+        player[STRENGTH_KEY] = classify_strength_from_tier(player[TIER_KEY], config)
 
     gk_players = players_by_position[GK_LABEL]
     minimum_required_gk = 2
@@ -308,7 +902,7 @@ def balance_teams(players, team_count=2):
 
     mandatory_gks = list(gk_players[:team_count])
     if mandatory_gks:
-        _assign_players_in_rounds(teams, mandatory_gks, team_scores, team_count)
+        assign_players_in_rounds(teams, mandatory_gks, team_scores, team_count, rng)
 
     extra_gks = gk_players[team_count:]
 
@@ -317,24 +911,113 @@ def balance_teams(players, team_count=2):
         if not position_players:
             continue
 
-        _assign_players_in_rounds(teams, position_players, team_scores, team_count)
+        assign_players_in_rounds(teams, position_players, team_scores, team_count, rng)
 
     if extra_gks:
-        _assign_players_in_rounds(teams, extra_gks, team_scores, team_count)
+        assign_players_in_rounds(teams, extra_gks, team_scores, team_count, rng)
+
+    if attribute_weights is not None:
+        _refine_attribute_balance(teams, attribute_weights)
 
     return teams
 
-def run_team_assignment(filename=CSV_FILE, selected_players=None, team_count=2, return_details=False):
-    all_players = read_players_from_csv(filename)
-    if selected_players is not None:
-        selected_names = [p[NAME_KEY] for p in selected_players]
-        players = [p for p in all_players if p[NAME_KEY] in selected_names]
-    else:
-        players = all_players
 
-    selection = generate_balanced_teams(players, team_count=team_count)
+ENGINES["rounds"] = balance_teams
+
+
+def roster_hash(filename):
+    """Return a short content hash identifying a roster file snapshot."""
+    with open(filename, "rb") as handle:
+        return hashlib.sha1(handle.read()).hexdigest()[:16]
+
+
+def log_run(log_path, filename, players, team_count, config, criterion, max_retries, engine,
+            attribute_weights=ATTRIBUTE_WEIGHTS):
+    """Append the inputs of one assignment as a compact JSON line for later replay.
+
+    The roster is logged by its absolute path, so the log replays from any directory.
+    """
+    record = {
+        "ts": int(time.time()),
+        "roster": os.path.realpath(filename),
+        "roster_hash": roster_hash(filename),
+        "attendance": [player[NAME_KEY] for player in players],
+        "team_count": team_count,
+        "thresholds": [config.tier_threshold_low, config.tier_threshold_high],
+        "median_delta": dict(config.median_delta),
+        "iqr_delta": dict(config.iqr_delta),
+        "seed": config.seed,
+        "criterion": criterion,
+        "max_retries": max_retries,
+        "engine": engine,
+        "attribute_weights": dict(attribute_weights),
+    }
+    with open(log_path, "a", encoding=DEFAULT_ENCODING) as handle:
+        handle.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+
+def config_from_log(record):
+    """Rebuild the ``BalanceConfig`` of a logged run."""
+    return BalanceConfig(
+        tier_threshold_low=record["thresholds"][0],
+        tier_threshold_high=record["thresholds"][1],
+        median_delta=record["median_delta"],
+        iqr_delta=record["iqr_delta"],
+        team_count=record["team_count"],
+        seed=record["seed"],
+    )
+
+
+def attribute_weights_from_log(record):
+    """Return the attribute weights of a logged run (the defaults for older logs)."""
+    return record.get("attribute_weights", ATTRIBUTE_WEIGHTS)
+
+
+def run_team_assignment(filename=CSV_FILE, selected_players=None, team_count=None, return_details=False,
+                        attribute_weights=ATTRIBUTE_WEIGHTS, criterion="lines", max_retries=MAX_RETRIES,
+                        progress=None, config=None, engine="rounds", run_log=None, players=None):
+    """Split the selected players into teams and format the result.
+
+    The players are read from ``filename`` and filtered to the names in
+    ``selected_players``, unless ``players`` are given: those player dicts
+    (e.g. rows of the shared ``RosterModel``) are balanced as they are and
+    the CSV is not read. With ``run_log`` (or the ``SQUAD_RUN_LOG``
+    environment variable) the inputs are appended to that JSON-lines file
+    first; an unseeded config then gets a fresh seed so the run can be
+    replayed exactly.
+    """
+    config = config or DEFAULT_CONFIG
+    team_count = config.team_count if team_count is None else team_count
+    if players is None:
+        all_players = read_players_from_csv(filename)
+        if selected_players is not None:
+            selected_names = [p[NAME_KEY] for p in selected_players]
+            players = [p for p in all_players if p[NAME_KEY] in selected_names]
+        else:
+            players = all_players
+
+    run_log = run_log or os.environ.get(RUN_LOG_ENV)
+    if run_log:
+        if config.seed is None:
+            config = config.replace(seed=random.getrandbits(32))
+        log_run(run_log, filename, players, team_count, config, criterion, max_retries, engine, attribute_weights)
+
+    selection = generate_balanced_teams(
+        players,
+        team_count=team_count,
+        max_retries=max_retries,
+        attribute_weights=attribute_weights,
+        criterion=criterion,
+        progress=progress,
+        config=config,
+        engine=engine,
+    )
     teams = selection["teams"]
     fairness = selection["fairness"]
+    win_probability = fairness.get("win_probability") or estimate_win_probabilities(
+        teams, rng=np.random.default_rng(config.seed)
+    )
+    attribute_sums = selection["attributes"]["sums"]
 
     result = []
     team_scores = []
@@ -351,9 +1034,19 @@ def run_team_assignment(filename=CSV_FILE, selected_players=None, team_count=2,
         team_scores.append(score)
         result.append(f"Team {idx} Score: {score} (Players: {len(team)})")
         result.append(f"Team {idx} Median Point: {team_median}")
+        if team:
+            result.append(
+                f"Team {idx} Avg Stamina: {attribute_sums[idx - 1][STAMINA_KEY] * 100 / len(team):.0f} | "
+                f"Avg Skill: {attribute_sums[idx - 1][SKILL_KEY] / len(team):.2f}"
+            )
 
     balance_diff = max(team_scores) - min(team_scores)
     result.append(f"\nBalance Difference: {balance_diff}")
+    result.append(
+        "Win Probability: "
+        + " / ".join(f"T{idx} {prob:.0%}" for idx, prob in enumerate(win_probability["win"], start=1))
+        + f" (Draw {win_probability['draw']:.0%})"
+    )
 
     fairness_output = ["", "Fairness Checks:"]
     fairness_output.append(
@@ -365,13 +1058,13 @@ def run_team_assignment(filename=CSV_FILE, selected_players=None, team_count=2,
             fairness_output.append(
                 (
                     f"{line} median T1/T2: {fairness['medians']['team1'][line]} / {fairness['medians']['team2'][line]} "
-                    f"(Δ {fairness['median_delta'][line]}, threshold {DEFAULT_MEDIAN_DELTA[line]})"
+                    f"(Δ {fairness['median_delta'][line]}, threshold {config.median_limit(line)})"
                 )
             )
             fairness_output.append(
                 (
                     f"{line} IQR T1/T2: {fairness['iqr']['team1'][line]} / {fairness['iqr']['team2'][line]} "
-                    f"(Δ {fairness['iqr_delta'][line]}, threshold {DEFAULT_IQR_DELTA[line]})"
+                    f"(Δ {fairness['iqr_delta'][line]}, threshold {config.iqr_limit(line)})"
                 )
             )
     else:
@@ -391,6 +1084,9 @@ def run_team_assignment(filename=CSV_FILE, selected_players=None, team_count=2,
             "selection": selection["selection"],
             "attempt_index": selection["attempt_index"],
             "retries_used": selection["retries_used"],
+            "attribute_sums": attribute_sums,
+            "attribute_imbalance": selection["attributes"]["imbalance"],
+            "win_probability": win_probability,
         }
 
     return text_result
@@ -577,18 +1273,17 @@ def show_attendance_gui(parent=None):
         player_vars.append((var, player[NAME_KEY]))
 
     def handle_shuffle():
-        global TIER_THRESHOLD_LOW, TIER_THRESHOLD_HIGH
         # Get inputs
         try:
             team_count = int(team_count_entry.get())
             players_per_team = int(players_per_team_entry.get())
-            TIER_THRESHOLD_LOW = float(tier_threshold_entry.get())
-            TIER_THRESHOLD_HIGH = float(carrier_threshold_entry.get())
+            tier_threshold = float(tier_threshold_entry.get())
+            carrier_threshold = float(carrier_threshold_entry.get())
         except ValueError:
             messagebox.showerror("Lỗi", "Vui lòng nhập số hợp lệ cho cấu hình chia đội.")
             return
 
-        if TIER_THRESHOLD_LOW >= TIER_THRESHOLD_HIGH:
+        if tier_threshold >= carrier_threshold:
             messagebox.showerror("Lỗi", "Ngưỡng mạnh phải lớn hơn ngưỡng yếu.")
             return
 
@@ -609,7 +1304,10 @@ def show_attendance_gui(parent=None):
             return
 
         try:
-            result = run_team_assignment(selected_players=selected_players, team_count=team_count)
+            config = BalanceConfig(
+                tier_threshold_low=tier_threshold, tier_threshold_high=carrier_threshold, team_count=team_count
+            )
+            result = run_team_assignment(selected_players=selected_players, config=config)
             show_popup("Kết quả chia đội", result)
         except ValueError as e:
             messagebox.showerror("Lỗi", str(e))
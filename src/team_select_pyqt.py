@@ -1,6 +1,10 @@
-from PyQt5.QtCore import Qt
+import threading
+import time
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QObject, QRunnable, Qt, QThreadPool, QTimer, pyqtSignal
 from PyQt5.QtGui import QGuiApplication
 from PyQt5.QtWidgets import (
+    QAbstractItemView,
     QDialog,
     QVBoxLayout,
     QHBoxLayout,
@@ -10,8 +14,7 @@ from PyQt5.QtWidgets import (
     QDoubleSpinBox,
     QMessageBox,
     QTextEdit,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QHeaderView,
     QLineEdit,
 )
@@ -20,17 +23,314 @@ import team_utils as lib
 CSV_PATH = lib.CSV_PATH
 
 
-class TeamSelectionWindow(QDialog):
-    """PyQt window for selecting players and forming balanced teams."""
+class RosterBridge(QObject):
+    """Re-emit ``RosterModel`` change notifications as Qt signals.
+
+    Signals are delivered on the thread that owns the bridge, so a window can
+    connect its widgets directly even when the roster changes elsewhere.
+    ``watch()`` starts a ``RosterWatcher`` whose change events are queued
+    back to this thread, where the roster applies the on-disk diff.
+    """
+
+    rowAdded = pyqtSignal(int)
+    rowUpdated = pyqtSignal(int)
+    rowRemoved = pyqtSignal(int)
+    rosterReset = pyqtSignal()
+    fileChanged = pyqtSignal()
+
+    def __init__(self, roster, parent=None):
+        super().__init__(parent)
+        self.roster = roster
+        self.watcher = None
+        roster.subscribe(self._forward)
+        self.fileChanged.connect(self._sync)
+
+    def watch(self) -> None:
+        if self.watcher is None:
+            self.watcher = lib.RosterWatcher(self.roster.path, self.fileChanged.emit)
+
+    def _sync(self) -> None:
+        self.roster.sync_from_disk()
+
+    def _forward(self, event: str, row) -> None:
+        if event == lib.ROW_ADDED:
+            self.rowAdded.emit(row)
+        elif event == lib.ROW_UPDATED:
+            self.rowUpdated.emit(row)
+        elif event == lib.ROW_REMOVED:
+            self.rowRemoved.emit(row)
+        elif event == lib.ROSTER_RESET:
+            self.rosterReset.emit()
+
+    def detach(self) -> None:
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        self.roster.unsubscribe(self._forward)
+
+
+class PlayerTableModel(QAbstractTableModel):
+    """Table model over a ``RosterModel`` with a maintained selection bitmask.
+
+    Cells are rendered on demand for the rows the view shows. Ticking a row
+    flips one byte and adjusts the selected count, so no pass over the table
+    is needed. Per-line counts and tier sums of the ticked players are kept
+    up to date the same way for the live balance preview. Roster changes
+    arrive through a ``RosterBridge`` and only touch the affected row, except
+    a full reload, which resets the model and the selection. Strength is derived
+    from the tier with the dialog's current thresholds instead of being
+    stored per row.
+    """
 
     SELECT_COL = 0
     NAME_COL = 1
     TIER_COL = 2
     POSITION_COL = 3
     STRENGTH_COL = 4
+    HEADERS = ["Chọn", "Tên", "Tier", "Vị trí", "Strength"]
+
+    selectedCountChanged = pyqtSignal(int)
+
+    def __init__(self, roster, tier_threshold: float, carrier_threshold: float, parent=None):
+        super().__init__(parent)
+        self.roster = roster
+        self.config = lib.DEFAULT_CONFIG.replace(
+            tier_threshold_low=tier_threshold, tier_threshold_high=carrier_threshold
+        )
+        self._clear_selection()
+        self.bridge = RosterBridge(roster, self)
+        self.bridge.rowAdded.connect(self._row_added)
+        self.bridge.rowUpdated.connect(self._row_updated)
+        self.bridge.rowRemoved.connect(self._row_removed)
+        self.bridge.rosterReset.connect(self._roster_reset)
+
+    def _clear_selection(self) -> None:
+        self._selected = bytearray(len(self.roster))
+        self._contributions = {}  # Ticked row -> (line, tier) counted in the aggregates
+        self.selected_count = 0
+        self.line_counts = {line: 0 for line in lib.POSITION_ORDER}
+        self.line_tier_sums = {line: 0.0 for line in lib.POSITION_ORDER}
+
+    def _row_contribution(self, row: int) -> tuple:
+        line = lib.normalize_position(self.roster.value(row, lib.POSITION_KEY))
+        try:
+            tier = float(self.roster.value(row, lib.TIER_KEY))
+        except (TypeError, ValueError):
+            tier = 0.0
+        return line, tier
+
+    def _count_row(self, line: str, tier: float, step: int) -> None:
+        if line in self.line_counts:
+            self.line_counts[line] += step
+            self.line_tier_sums[line] += step * tier
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._selected)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        if index.column() == self.SELECT_COL:
+            return Qt.ItemIsEnabled | Qt.ItemIsUserCheckable
+        return Qt.ItemIsEnabled
+
+    def strength_of(self, tier) -> str:
+        return lib.classify_strength_from_tier(tier, self.config)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if column == self.SELECT_COL:
+            if role == Qt.CheckStateRole:
+                return Qt.Checked if self._selected[row] else Qt.Unchecked
+            return None
+        if role != Qt.DisplayRole:
+            return None
+
+        if column == self.NAME_COL:
+            return str(self.roster.value(row, lib.NAME_KEY))
+        if column == self.TIER_COL:
+            return str(self.roster.value(row, lib.TIER_KEY))
+        if column == self.POSITION_COL:
+            return "/".join(lib.parse_positions(self.roster.value(row, lib.POSITION_KEY)))
+        return self.strength_of(self.roster.value(row, lib.TIER_KEY))
+
+    def setData(self, index, value, role=Qt.EditRole) -> bool:
+        if not index.isValid() or index.column() != self.SELECT_COL or role != Qt.CheckStateRole:
+            return False
+        checked = 1 if value == Qt.Checked else 0
+        row = index.row()
+        if self._selected[row] != checked:
+            self._selected[row] = checked
+            if checked:
+                self._contributions[row] = self._row_contribution(row)
+                self._count_row(*self._contributions[row], 1)
+                self.selected_count += 1
+            else:
+                self._count_row(*self._contributions.pop(row), -1)
+                self.selected_count -= 1
+            self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+            self.selectedCountChanged.emit(self.selected_count)
+        return True
+
+    def _row_added(self, row: int) -> None:
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._selected.append(0)
+        self.endInsertRows()
+
+    def _row_updated(self, row: int) -> None:
+        if row in self._contributions:
+            self._count_row(*self._contributions[row], -1)
+            self._contributions[row] = self._row_contribution(row)
+            self._count_row(*self._contributions[row], 1)
+            self.selectedCountChanged.emit(self.selected_count)
+        self.dataChanged.emit(self.index(row, self.NAME_COL), self.index(row, self.STRENGTH_COL), [Qt.DisplayRole])
+
+    def _row_removed(self, row: int) -> None:
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._selected[row]
+        if row in self._contributions:
+            self._count_row(*self._contributions.pop(row), -1)
+            self.selected_count -= 1
+        self._contributions = {
+            (ticked - 1 if ticked > row else ticked): contribution
+            for ticked, contribution in self._contributions.items()
+        }
+        self.endRemoveRows()
+        self.selectedCountChanged.emit(self.selected_count)
+
+    def _roster_reset(self) -> None:
+        self.beginResetModel()
+        self._clear_selection()
+        self.endResetModel()
+        self.selectedCountChanged.emit(self.selected_count)
+
+    def set_thresholds(self, tier_threshold: float, carrier_threshold: float) -> None:
+        """Update the strength thresholds and refresh the strength column in one signal.
+
+        An inverted pair, as seen while a spin box is being edited, is ignored.
+        """
+        try:
+            self.config = self.config.replace(
+                tier_threshold_low=tier_threshold, tier_threshold_high=carrier_threshold
+            )
+        except ValueError:
+            return
+        if self._selected:
+            self.dataChanged.emit(
+                self.index(0, self.STRENGTH_COL),
+                self.index(len(self._selected) - 1, self.STRENGTH_COL),
+                [Qt.DisplayRole],
+            )
+
+    def selected_players(self) -> list:
+        """Return the ticked players as dicts with an up-to-date strength."""
+        players = []
+        for row, checked in enumerate(self._selected):
+            if checked:
+                player = self.roster.get(self.roster.value(row, lib.NAME_KEY))
+                player[lib.STRENGTH_KEY] = self.strength_of(player.get(lib.TIER_KEY))
+                players.append(player)
+        return players
+
+
+class AssignmentSignals(QObject):
+    progress = pyqtSignal(int, int, float)
+    finished = pyqtSignal(str)
+    failed = pyqtSignal(str)
+
+
+class AssignmentWorker(QRunnable):
+    """Run ``run_team_assignment`` on the thread pool with progress and cancellation.
+
+    Progress is forwarded at most every ``PROGRESS_INTERVAL`` seconds so a large
+    search budget does not flood the event loop. After ``cancel()`` the search
+    stops at the next attempt and the best split so far is reported. A given
+    ``roster`` is flushed on the pool thread first, so the UI thread never
+    waits for the CSV write. Every error ends in ``failed``.
+    """
+
+    PROGRESS_INTERVAL = 0.05
+
+    def __init__(self, roster=None, **assignment_kwargs):
+        super().__init__()
+        self.roster = roster
+        self.assignment_kwargs = assignment_kwargs
+        self.signals = AssignmentSignals()
+        self._cancelled = threading.Event()
+        self._last_progress = 0.0
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def _report(self, attempt_index: int, max_retries: int, best_violation: float) -> bool:
+        now = time.monotonic()
+        if now - self._last_progress >= self.PROGRESS_INTERVAL:
+            self._last_progress = now
+            self.signals.progress.emit(attempt_index, max_retries, best_violation)
+        return not self._cancelled.is_set()
+
+    def run(self) -> None:
+        try:
+            if self.roster is not None:
+                self.roster.flush()
+            result = lib.run_team_assignment(progress=self._report, **self.assignment_kwargs)
+        except Exception as exc:
+            self.signals.failed.emit(str(exc) or type(exc).__name__)
+            return
+        self.signals.finished.emit(result)
+
+
+class PreviewSignals(QObject):
+    finished = pyqtSignal(int, str)
+
+
+class PreviewWorker(QRunnable):
+    """Run one quick ``balance_teams`` split in the background for the preview."""
+
+    def __init__(self, generation: int, players: list, config):
+        super().__init__()
+        self.generation = generation
+        self.players = players
+        self.config = config
+        self.signals = PreviewSignals()
+
+    def run(self) -> None:
+        try:
+            teams = lib.balance_teams(self.players, config=self.config)
+        except Exception as exc:
+            self.signals.finished.emit(self.generation, f"Không chia được: {exc}")
+            return
+        scores = [lib.evaluate_team(team) for team in teams]
+        fairness = lib.evaluate_fairness(teams, self.config)
+        verdict = "đạt" if fairness["accepted"] else "chưa đạt"
+        self.signals.finished.emit(
+            self.generation,
+            f"Chênh lệch dự kiến: {max(scores) - min(scores):.1f} | Kiểm tra tuyến: {verdict}",
+        )
+
+
+class TeamSelectionWindow(QDialog):
+    """PyQt window for selecting players and forming balanced teams."""
 
-    def __init__(self, parent=None):
+    SELECT_COL = PlayerTableModel.SELECT_COL
+    NAME_COL = PlayerTableModel.NAME_COL
+    TIER_COL = PlayerTableModel.TIER_COL
+    POSITION_COL = PlayerTableModel.POSITION_COL
+    STRENGTH_COL = PlayerTableModel.STRENGTH_COL
+    PREVIEW_DELAY_MS = 300
+
+    def __init__(self, parent=None, roster=None):
         super().__init__(parent)
+        self._owns_roster = roster is None
+        self.roster = lib.RosterModel(CSV_PATH) if roster is None else roster
         self.setWindowTitle("Chia đội")
         layout = QVBoxLayout(self)
 
@@ -62,15 +362,24 @@ class TeamSelectionWindow(QDialog):
         self.carrier_spin.setValue(lib.get_carrier_threshold())
         input_row.addWidget(self.carrier_spin)
 
+        input_row.addWidget(QLabel("Số lần thử:"))
+        self.retries_spin = QSpinBox()
+        self.retries_spin.setRange(1, 1000000)
+        self.retries_spin.setValue(lib.MAX_RETRIES)
+        input_row.addWidget(self.retries_spin)
+
         layout.addLayout(input_row)
 
         # Player table (read-only values + selectable checkbox)
-        self.player_table = QTableWidget()
-        self.player_table.setColumnCount(5)
-        self.player_table.setHorizontalHeaderLabels(["Chọn", "Tên", "Tier", "Vị trí", "Strength"])
+        self.player_table = QTableView()
+        self._load_players()
+        if self._owns_roster:
+            # A shared roster is already watched by its owner.
+            self.player_model.bridge.watch()
         self.player_table.verticalHeader().setVisible(False)
-        self.player_table.setSelectionMode(QTableWidget.NoSelection)
-        self.player_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.player_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.player_table.setSelectionMode(QAbstractItemView.NoSelection)
+        self.player_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.player_table.setFocusPolicy(Qt.NoFocus)
         self.player_table.horizontalHeader().setSectionResizeMode(self.NAME_COL, QHeaderView.Stretch)
         self.player_table.horizontalHeader().setSectionResizeMode(self.SELECT_COL, QHeaderView.ResizeToContents)
@@ -78,7 +387,6 @@ class TeamSelectionWindow(QDialog):
         self.player_table.horizontalHeader().setSectionResizeMode(self.POSITION_COL, QHeaderView.ResizeToContents)
         self.player_table.horizontalHeader().setSectionResizeMode(self.STRENGTH_COL, QHeaderView.ResizeToContents)
 
-        self._load_players()
         layout.addWidget(self.player_table)
 
         summary_row = QHBoxLayout()
@@ -93,52 +401,49 @@ class TeamSelectionWindow(QDialog):
         summary_row.addWidget(self.required_count_box)
         layout.addLayout(summary_row)
 
-        self.player_table.itemChanged.connect(self._handle_item_changed)
+        self.player_model.selectedCountChanged.connect(self._update_selection_summary)
+        self.tier_spin.valueChanged.connect(self._update_thresholds)
+        self.carrier_spin.valueChanged.connect(self._update_thresholds)
         self.team_spin.valueChanged.connect(self._update_selection_summary)
         self.players_spin.valueChanged.connect(self._update_selection_summary)
         self._update_selection_summary()
 
+        self.line_summary_label = QLabel("")
+        layout.addWidget(self.line_summary_label)
+        self.preview_label = QLabel("")
+        layout.addWidget(self.preview_label)
+        self._preview_generation = 0
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(self.PREVIEW_DELAY_MS)
+        self._preview_timer.timeout.connect(self._start_preview)
+        self.player_model.selectedCountChanged.connect(self._schedule_preview)
+        self.team_spin.valueChanged.connect(self._schedule_preview)
+        self._update_line_summary()
+
+        self.progress_label = QLabel("")
+        layout.addWidget(self.progress_label)
+
+        button_row = QHBoxLayout()
         self.shuffle_button = QPushButton("Chia đội!!!")
         self.shuffle_button.clicked.connect(self.handle_shuffle)
-        layout.addWidget(self.shuffle_button)
+        button_row.addWidget(self.shuffle_button)
 
-    def _make_readonly_item(self, value: str) -> QTableWidgetItem:
-        item = QTableWidgetItem(value)
-        item.setFlags(Qt.ItemIsEnabled)
-        return item
+        self.cancel_button = QPushButton("Dừng")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.handle_cancel)
+        button_row.addWidget(self.cancel_button)
+        layout.addLayout(button_row)
+        self._worker = None
 
     def _load_players(self) -> None:
-        players = lib.read_players_from_csv(str(CSV_PATH))
-        self.player_table.setRowCount(len(players))
-
-        for row, player in enumerate(players):
-            strength = player.get(lib.STRENGTH_KEY)
-            if not strength:
-                strength = "balanced"
-            player[lib.STRENGTH_KEY] = strength
-
-            checkbox_item = QTableWidgetItem()
-            checkbox_item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsUserCheckable)
-            checkbox_item.setCheckState(Qt.Unchecked)
-            checkbox_item.setData(Qt.UserRole, player)
-            self.player_table.setItem(row, self.SELECT_COL, checkbox_item)
-
-            self.player_table.setItem(row, self.NAME_COL, self._make_readonly_item(str(player.get(lib.NAME_KEY, ""))))
-            self.player_table.setItem(row, self.TIER_COL, self._make_readonly_item(str(player.get(lib.TIER_KEY, ""))))
-            self.player_table.setItem(
-                row,
-                self.POSITION_COL,
-                self._make_readonly_item(str(player.get(lib.POSITION_KEY, ""))),
-            )
-            self.player_table.setItem(row, self.STRENGTH_COL, self._make_readonly_item(str(strength)))
+        self.player_model = PlayerTableModel(
+            self.roster, self.tier_spin.value(), self.carrier_spin.value(), self.player_table
+        )
+        self.player_table.setModel(self.player_model)
 
     def _count_selected_players(self) -> int:
-        count = 0
-        for row in range(self.player_table.rowCount()):
-            check_item = self.player_table.item(row, self.SELECT_COL)
-            if check_item and check_item.checkState() == Qt.Checked:
-                count += 1
-        return count
+        return self.player_model.selected_count
 
     def _update_selection_summary(self) -> None:
         selected_count = self._count_selected_players()
@@ -146,10 +451,71 @@ class TeamSelectionWindow(QDialog):
         self.selected_count_box.setText(str(selected_count))
         self.required_count_box.setText(str(required_count))
 
-    def _handle_item_changed(self, item: QTableWidgetItem) -> None:
-        if item.column() == self.SELECT_COL:
-            self._update_selection_summary()
-
+    def _update_line_summary(self) -> None:
+        """Show per-line counts and average tiers of the ticked players (O(1) per tick)."""
+        model = self.player_model
+        parts = []
+        for line in lib.POSITION_ORDER:
+            count = model.line_counts[line]
+            average = model.line_tier_sums[line] / count if count else 0.0
+            parts.append(f"{line} {count} ({average:.1f})")
+        warnings = []
+        team_count = self.team_spin.value()
+        if model.line_counts[lib.GK_LABEL] < team_count:
+            warnings.append(f"thiếu {lib.GK_LABEL}")
+        uneven = [line for line in ["DF", "MF", "ST"] if model.line_counts[line] % team_count]
+        if uneven:
+            warnings.append("lệch tuyến " + "/".join(uneven))
+        text = " | ".join(parts)
+        if warnings:
+            text += " - " + ", ".join(warnings)
+        self.line_summary_label.setText(text)
+
+    def _schedule_preview(self) -> None:
+        self._update_line_summary()
+        self._preview_generation += 1
+        self._preview_timer.start()
+
+    def _start_preview(self) -> None:
+        team_count = self.team_spin.value()
+        if self.player_model.line_counts[lib.GK_LABEL] < team_count:
+            self.preview_label.setText("")
+            return
+        try:
+            config = lib.BalanceConfig(
+                tier_threshold_low=self.tier_spin.value(),
+                tier_threshold_high=self.carrier_spin.value(),
+                team_count=team_count,
+            )
+        except ValueError as exc:
+            self.preview_label.setText(str(exc))
+            return
+        worker = PreviewWorker(self._preview_generation, self.player_model.selected_players(), config)
+        worker.signals.finished.connect(self._handle_preview)
+        self.preview_label.setText("Đang xem trước...")
+        QThreadPool.globalInstance().start(worker)
+
+    def _handle_preview(self, generation: int, text: str) -> None:
+        # Ticks made while the split ran make its result stale.
+        if generation == self._preview_generation:
+            self.preview_label.setText(text)
+
+    def _update_thresholds(self) -> None:
+        self.player_model.set_thresholds(self.tier_spin.value(), self.carrier_spin.value())
+
+    def done(self, result: int) -> None:
+        # Results still in flight must not open dialogs over a closed window.
+        self._preview_timer.stop()
+        self._preview_generation += 1
+        if self._worker is not None:
+            self._worker.cancel()
+            for signal in (self._worker.signals.progress, self._worker.signals.finished, self._worker.signals.failed):
+                signal.disconnect()
+            self._worker = None
+        self.player_model.bridge.detach()
+        if self._owns_roster:
+            self.roster.close()
+        super().done(result)
 
     def handle_shuffle(self):
         team_count = self.team_spin.value()
@@ -162,29 +528,15 @@ class TeamSelectionWindow(QDialog):
             return
 
         try:
-            lib.set_carrier_threshold(carrier_threshold)
-            lib.set_tier_threshold(tier_threshold)
+            config = lib.BalanceConfig(
+                tier_threshold_low=tier_threshold, tier_threshold_high=carrier_threshold, team_count=team_count
+            )
         except ValueError as exc:
             QMessageBox.warning(self, "Lỗi", str(exc))
             return
 
-        selected_players = []
-        for row in range(self.player_table.rowCount()):
-            check_item = self.player_table.item(row, self.SELECT_COL)
-            player = check_item.data(Qt.UserRole)
-            tier = player.get(lib.TIER_KEY, 0)
-            if tier <= tier_threshold:
-                strength = "weak"
-            elif tier >= carrier_threshold:
-                strength = "strong"
-            else:
-                strength = "balanced"
-            player[lib.STRENGTH_KEY] = strength
-            self.player_table.item(row, self.STRENGTH_COL).setText(strength)
-
-            if check_item.checkState() == Qt.Checked:
-                selected_players.append(player)
-
+        self.player_model.set_thresholds(tier_threshold, carrier_threshold)
+        selected_players = self.player_model.selected_players()
         self._update_selection_summary()
 
         if len(selected_players) < team_count * players_per_team:
@@ -195,18 +547,51 @@ class TeamSelectionWindow(QDialog):
             )
             return
 
-        try:
-            result = lib.run_team_assignment(
-                filename=str(CSV_PATH),
-                selected_players=selected_players,
-                team_count=team_count,
-            )
-        except ValueError as e:
-            QMessageBox.warning(self, "Lỗi", str(e))
+        # Balance the shared roster's rows directly; the worker's flush only
+        # keeps the roster hash of a logged run (SQUAD_RUN_LOG) in step with the file.
+        self._worker = AssignmentWorker(
+            roster=self.roster,
+            filename=str(CSV_PATH),
+            players=selected_players,
+            config=config,
+            max_retries=self.retries_spin.value(),
+        )
+        self._worker.signals.progress.connect(self._handle_progress)
+        self._worker.signals.finished.connect(self._handle_finished)
+        self._worker.signals.failed.connect(self._handle_failed)
+        self.shuffle_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.progress_label.setText("Đang chia đội...")
+        QThreadPool.globalInstance().start(self._worker)
+
+    def handle_cancel(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            self.cancel_button.setEnabled(False)
+
+    def _handle_progress(self, attempt_index: int, max_retries: int, best_violation: float) -> None:
+        self.progress_label.setText(
+            f"Lần thử {attempt_index}/{max_retries} - điểm lệch tốt nhất: {best_violation:.2f}"
+        )
+
+    def _finish_worker(self) -> None:
+        self._worker = None
+        self.shuffle_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.progress_label.setText("")
+
+    def _handle_finished(self, result: str) -> None:
+        if self._worker is None:
             return
-
+        self._finish_worker()
         self.show_result_dialog(result)
 
+    def _handle_failed(self, message: str) -> None:
+        if self._worker is None:
+            return
+        self._finish_worker()
+        QMessageBox.warning(self, "Lỗi", message)
+
     def show_result_dialog(self, text: str) -> None:
         dlg = QDialog(self)
         dlg.setWindowTitle("Kết quả chia đội")
@@ -13,6 +13,14 @@ to keep the GUI working after compilation.
 from pathlib import Path
 import sys
 import team_select_optimized_lib as _base
+import team_rebalance as _rebalance
+import multi_pitch as _multi_pitch
+import match_history as _match_history
+import ratings as _ratings
+import roster_rating as _roster_rating
+import roster_model as _roster_model
+import roster_stream as _roster_stream
+import roster_import as _roster_import
 
 # Paths and constants
 CSV_FILE = _base.CSV_FILE
@@ -28,6 +36,7 @@ def _resolve_csv_path() -> Path:
 
 
 CSV_PATH = _resolve_csv_path()
+HISTORY_PATH = CSV_PATH.with_name("match_history.bin")
 
 TEAM_COUNT = _base.TEAM_COUNT
 NAME_KEY = _base.NAME_KEY
@@ -35,33 +44,49 @@ TIER_KEY = _base.TIER_KEY
 POSITION_KEY = _base.POSITION_KEY
 STRENGTH_KEY = _base.STRENGTH_KEY
 GK_LABEL = _base.GK_LABEL
+MAX_RETRIES = _base.MAX_RETRIES
+POSITION_ORDER = _base.POSITION_ORDER
 
 # Configuration helpers
-
-def get_tier_threshold() -> float:
-    """Return the current low-tier threshold."""
-    return _base.TIER_THRESHOLD_LOW
+# Thresholds are no longer changed on the library module; each assignment
+# gets its own immutable ``BalanceConfig`` instead.
+BalanceConfig = _base.BalanceConfig
+DEFAULT_CONFIG = _base.DEFAULT_CONFIG
 
 
-def set_tier_threshold(value: float) -> None:
-    """Update the low-tier threshold used in team balancing."""
-    if value >= _base.TIER_THRESHOLD_HIGH:
-        raise ValueError("Tier threshold must be lower than carrier threshold.")
-    _base.TIER_THRESHOLD_LOW = value
+def get_tier_threshold() -> float:
+    """Return the default low-tier threshold."""
+    return DEFAULT_CONFIG.tier_threshold_low
 
 
 def get_carrier_threshold() -> float:
-    """Return the current carrier (strong) threshold."""
-    return _base.TIER_THRESHOLD_HIGH
-
-
-def set_carrier_threshold(value: float) -> None:
-    """Update the high-tier threshold used to tag strong players."""
-    if value <= _base.TIER_THRESHOLD_LOW:
-        raise ValueError("Carrier threshold must be greater than tier threshold.")
-    _base.TIER_THRESHOLD_HIGH = value
+    """Return the default carrier (strong) threshold."""
+    return DEFAULT_CONFIG.tier_threshold_high
 
 # Re-exported functions
 read_players_from_csv = _base.read_players_from_csv
+parse_positions = _base.parse_positions
+normalize_position = _base.normalize_position
+format_stamina = _base.format_stamina
+classify_strength_from_tier = _base.classify_strength_from_tier
+balance_teams = _base.balance_teams
+evaluate_team = _base.evaluate_team
+evaluate_fairness = _base.evaluate_fairness
 run_team_assignment = _base.run_team_assignment
 add_new_player_to_csv = _base.add_new_player_to_csv
+rebalance_teams = _rebalance.rebalance_teams
+balance_matches = _multi_pitch.balance_matches
+MatchHistory = _match_history.MatchHistory
+apply_ratings_to_csv = _ratings.apply_ratings_to_csv
+rerate_roster = _roster_rating.rerate_roster
+RosterModel = _roster_model.RosterModel
+ROW_ADDED = _roster_model.ROW_ADDED
+ROW_UPDATED = _roster_model.ROW_UPDATED
+ROW_REMOVED = _roster_model.ROW_REMOVED
+ROSTER_RESET = _roster_model.ROSTER_RESET
+RosterWatcher = _roster_model.RosterWatcher
+stream_roster = _roster_stream.stream_roster
+RosterArrays = _roster_stream.RosterArrays
+import_players = _roster_import.import_players
+read_import_file = _roster_import.read_import_file
+format_import_report = _roster_import.format_report
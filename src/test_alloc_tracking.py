@@ -0,0 +1,66 @@
+import tracemalloc
+
+import pytest
+
+import quality_benchmark
+from alloc_tracking import ATTEMPT_ALLOCATION_BUDGET, AllocationTracker, format_summary
+
+BLOCK = 200_000
+
+
+def _attempt(tracker, index, size):
+    tracker.begin_attempt(index)
+    with tracker.stage("split"):
+        block = bytearray(size)
+        del block
+    with tracker.stage("fairness"):
+        pass
+
+
+def test_stage_and_attempt_peaks_count_transient_allocations():
+    with AllocationTracker() as tracker:
+        _attempt(tracker, 1, BLOCK)
+        _attempt(tracker, 2, 0)
+
+    first, second = tracker.attempts
+    assert first["attempt"] == 1
+    assert BLOCK <= first["stages"]["split"] < BLOCK + 16_384
+    assert first["peak"] >= first["stages"]["split"]
+    assert second["stages"]["split"] < 16_384
+    assert tracker.over_budget(BLOCK // 2) == [first]
+    assert tracker.over_budget(BLOCK * 2) == []
+
+
+def test_summary_describes_attempts_and_stages():
+    assert AllocationTracker().summary() == {}
+    with AllocationTracker() as tracker:
+        for index in range(1, 5):
+            _attempt(tracker, index, BLOCK if index == 4 else 0)
+
+    summary = tracker.summary()
+    assert summary["attempts"] == 4
+    assert set(summary) == {"attempts", "attempt", "split", "fairness"}
+    assert summary["split"]["max"] >= BLOCK
+    assert summary["split"]["mean"] == pytest.approx(sum(r["stages"]["split"] for r in tracker.attempts) / 4)
+    assert "4 attempts tracked" in format_summary(summary)
+
+
+def test_tracker_leaves_an_outer_trace_running():
+    tracemalloc.start()
+    try:
+        with AllocationTracker():
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    with AllocationTracker():
+        assert tracemalloc.is_tracing()
+    assert not tracemalloc.is_tracing()
+
+
+def test_balancing_stays_within_the_attempt_budget():
+    attendances = quality_benchmark.synthetic_attendances(20, seed=3)
+    checks = quality_benchmark.allocation_check(attendances, ["rounds"], max_workers=1)
+    summary, over_budget = checks["rounds"]
+    assert summary["attempts"] >= len(attendances)
+    assert over_budget == [], f"attempts over {ATTEMPT_ALLOCATION_BUDGET} bytes: {over_budget}"
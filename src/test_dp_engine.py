@@ -0,0 +1,62 @@
+import itertools
+import random
+import sys
+
+import pytest
+
+import dp_engine
+import team_select_optimized_lib as lib
+
+# Limits no split can break, so the DP's only constraints are even line and team sizes.
+UNCONSTRAINED = lib.DEFAULT_CONFIG.replace(
+    median_delta={"DF": 10.0, "MF": 10.0, "ST": 10.0}, iqr_delta={"DF": 10.0, "MF": 10.0, "ST": 10.0}
+)
+
+
+def _smallest_gap_by_brute_force(players):
+    tiers = [round(player[lib.TIER_KEY] * dp_engine.TIER_SCALE) for player in players]
+    lines = [player[lib.POSITION_KEY] for player in players]
+    best = None
+    for team_one in itertools.product((0, 1), repeat=len(players)):
+        line_gaps = [
+            abs(sum(1 if side else -1 for side, own in zip(team_one, lines) if own == line))
+            for line in lib.POSITION_ORDER
+        ]
+        if max(line_gaps) > 1 or abs(2 * sum(team_one) - len(players)) > 1:
+            continue
+        gap = abs(sum(tier if side else -tier for side, tier in zip(team_one, tiers)))
+        best = gap if best is None else min(best, gap)
+    return best
+
+
+def test_dp_split_matches_brute_force(make_attendance):
+    for seed in range(15):
+        players = make_attendance(random.Random(seed).randint(8, 13), seed)
+        teams = dp_engine.dp_balance_teams(
+            [dict(player) for player in players], config=UNCONSTRAINED.replace(seed=seed)
+        )
+        gap = abs(sum(round(p[lib.TIER_KEY] * dp_engine.TIER_SCALE) for p in teams[0])
+                  - sum(round(p[lib.TIER_KEY] * dp_engine.TIER_SCALE) for p in teams[1]))
+        assert gap == _smallest_gap_by_brute_force(players)
+
+
+@pytest.mark.parametrize("odd_tier", [3.25, float("nan"), float("inf")])
+def test_finer_or_missing_tiers_fall_back_to_balance_teams(make_attendance, odd_tier):
+    players = make_attendance(12)
+    players[3][lib.TIER_KEY] = odd_tier
+    config = lib.DEFAULT_CONFIG.replace(seed=4)
+    dp_teams = dp_engine.dp_balance_teams([dict(player) for player in players], config=config)
+    round_teams = lib.balance_teams([dict(player) for player in players], config=config)
+    assert [[p[lib.NAME_KEY] for p in team] for team in dp_teams] == [
+        [p[lib.NAME_KEY] for p in team] for team in round_teams
+    ]
+
+
+def test_dp_engine_is_imported_when_first_requested(make_attendance, monkeypatch):
+    monkeypatch.delitem(lib.ENGINES, dp_engine.ENGINE_NAME)
+    monkeypatch.delitem(sys.modules, "dp_engine")
+    selection = lib.generate_balanced_teams(make_attendance(), max_retries=1, engine="dp")
+    assert [len(team) for team in selection["teams"]] == [7, 7]
+    assert lib.ENGINES["dp"] is sys.modules["dp_engine"].dp_balance_teams
+    with pytest.raises(ValueError, match="Unknown balancing engine 'ilp'"):
+        lib.resolve_engine("ilp")
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+import team_select_optimized_lib as lib
+from match_history import MAX_TEAMS, NO_RESULT, MatchHistory
+
+
+def _team(*names, tier=3.0):
+    return [{lib.NAME_KEY: name, lib.TIER_KEY: tier} for name in names]
+
+
+def test_appended_matches_read_back_after_reopening(tmp_path):
+    path = tmp_path / "history.bin"
+    history = MatchHistory(path)
+    first = history.append([_team("An", "Bình"), _team("Cường", tier=3.5)], goals=[2, 1], timestamp=100)
+    second = history.append([_team("Cường", "An"), _team("Dũng")], timestamp=200)
+    assert (first, second) == (0, 1)
+
+    reopened = MatchHistory(path)
+    assert len(reopened) == 2
+    assert reopened.names == ["An", "Bình", "Cường", "Dũng"]
+    records = reopened.records()
+    assert records["timestamp"].tolist() == [100, 200]
+    assert records["players"][0, :4].tolist() == [0, 1, 2, -1]
+    assert records["tiers"][0, 2] == np.float32(3.5)
+    assert records["goals"][1, :2].tolist() == [NO_RESULT, NO_RESULT]
+    assert reopened.team_labels()[:, :4].tolist() == [[0, 0, 1, -1], [0, 0, 1, -1]]
+    assert reopened.appearances().tolist() == [2, 1, 2, 1]
+
+
+def test_set_result_updates_a_recorded_match(tmp_path):
+    history = MatchHistory(tmp_path / "history.bin")
+    history.append([_team("An"), _team("Bình")])
+    history.records()
+    history.set_result(0, [3, 3])
+    assert history.records()["goals"][0, :3].tolist() == [3, 3, NO_RESULT]
+
+
+def test_rejects_oversized_matches_and_foreign_files(tmp_path):
+    history = MatchHistory(tmp_path / "history.bin")
+    with pytest.raises(ValueError):
+        history.append([_team(f"p{idx}") for idx in range(MAX_TEAMS + 1)])
+    foreign = tmp_path / "other.bin"
+    foreign.write_bytes(b"not a history")
+    with pytest.raises(ValueError):
+        MatchHistory(foreign)
@@ -0,0 +1,35 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import multi_pitch
+import team_select_optimized_lib as lib
+
+
+def test_partition_gives_every_team_a_gk(make_attendance):
+    matches = multi_pitch.partition_matches(make_attendance(44, gk_count=8), 3, rng=random.Random(1))
+    assert sum(len(match) for match in matches) == 44
+    assert max(map(len, matches)) - min(map(len, matches)) <= 1
+    for match in matches:
+        assert sum(player[lib.POSITION_KEY] == lib.GK_LABEL for player in match) >= 2
+
+
+def test_seeded_matches_do_not_depend_on_the_executor(make_attendance):
+    config = lib.DEFAULT_CONFIG.replace(seed=5)
+    local = multi_pitch.balance_matches(make_attendance(44, gk_count=8), 2, config=config, max_workers=1)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pooled = multi_pitch.balance_matches(make_attendance(44, gk_count=8), 2, config=config, executor=executor)
+
+    def names(result):
+        return [[[player[lib.NAME_KEY] for player in team] for team in match["teams"]] for match in result]
+
+    assert names(local) == names(pooled)
+
+
+def test_shared_pool_can_be_shut_down_and_restarted(make_attendance):
+    config = lib.DEFAULT_CONFIG.replace(seed=5)
+    first = multi_pitch.balance_matches(make_attendance(44, gk_count=8), 2, config=config, max_workers=2)
+    multi_pitch.shutdown_shared_pool()
+    multi_pitch.shutdown_shared_pool()
+    again = multi_pitch.balance_matches(make_attendance(44, gk_count=8), 2, config=config, max_workers=2)
+    multi_pitch.shutdown_shared_pool()
+    assert [match["teams"] for match in again] == [match["teams"] for match in first]
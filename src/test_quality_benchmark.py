@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+import quality_benchmark
+import team_select_optimized_lib as lib
+
+
+@pytest.fixture(scope="module")
+def attendances():
+    return quality_benchmark.synthetic_attendances(30, seed=1)
+
+
+def test_synthetic_attendances_have_a_keeper_per_team(attendances):
+    low, high = quality_benchmark.PLAYERS_PER_TEAM
+    for attendance in attendances:
+        assert low * 2 <= len(attendance) <= high * 2
+        assert sum(player[lib.POSITION_KEY] == lib.GK_LABEL for player in attendance) >= 2
+    assert quality_benchmark.synthetic_attendances(30, seed=1) == attendances
+
+
+def test_benchmark_metrics_match_the_selections(attendances):
+    stats = quality_benchmark.benchmark(attendances, ["rounds"], [1, 3], max_workers=1, seed=5)
+    assert set(stats) == {("rounds", 1), ("rounds", 3)}
+
+    diffs, fallbacks = [], []
+    for idx, attendance in enumerate(attendances):
+        selection = lib.generate_balanced_teams(
+            [dict(player) for player in attendance], team_count=2, max_retries=3,
+            config=lib.DEFAULT_CONFIG.replace(seed=5 + idx),
+        )
+        scores = [lib.evaluate_team(team) for team in selection["teams"]]
+        diffs.append(max(scores) - min(scores))
+        fallbacks.append(selection["selection"] != "accepted")
+
+    row = stats[("rounds", 3)]
+    assert row["runs"] == len(attendances)
+    assert row["fallback_rate"] == pytest.approx(np.mean(fallbacks))
+    assert row["balance_mean"] == pytest.approx(np.mean(diffs))
+    assert row["balance_p90"] == pytest.approx(np.percentile(diffs, 90))
+    assert row["violation_p50"] <= row["violation_p90"] <= row["violation_p99"]
+    # Every attempt is seeded per attendance, so a larger budget only adds attempts.
+    assert row["fallback_rate"] <= stats[("rounds", 1)]["fallback_rate"]
+
+
+def test_single_worker_allocation_check_runs_in_process(attendances, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("a process pool was started")
+
+    monkeypatch.setattr(quality_benchmark, "ProcessPoolExecutor", no_pool)
+    checks = quality_benchmark.allocation_check(attendances[:3], ["rounds"], retries=1, max_workers=1)
+    summary, _ = checks["rounds"]
+    assert summary["attempts"] == 3
+    assert set(summary) >= {"attempt", "split", "fairness", "attributes"}
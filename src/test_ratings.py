@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+import ratings
+import team_select_optimized_lib as lib
+from match_history import MatchHistory
+
+
+def _team(*names, tier=3.0):
+    return [{lib.NAME_KEY: name, lib.TIER_KEY: tier} for name in names]
+
+
+def _elo_by_hand(matches, start):
+    """Rate matches one period at a time: each period is scored against the ratings at its start."""
+    current = dict(start)
+    for period in matches:
+        deltas = {}
+        for team_a, team_b, goals in period:
+            mean_a = np.mean([current[name] for name in team_a])
+            mean_b = np.mean([current[name] for name in team_b])
+            expected = 1.0 / (1.0 + 10.0 ** ((mean_b - mean_a) / 400.0))
+            actual = 1.0 if goals[0] > goals[1] else 0.5 if goals[0] == goals[1] else 0.0
+            delta = ratings.K_FACTOR * (actual - expected)
+            for name in team_a:
+                deltas[name] = deltas.get(name, 0.0) + delta
+            for name in team_b:
+                deltas[name] = deltas.get(name, 0.0) - delta
+        for name, delta in deltas.items():
+            current[name] += delta
+    return current
+
+
+def test_ratings_follow_per_period_elo(tmp_path):
+    history = MatchHistory(tmp_path / "history.bin")
+    periods = [
+        [(["An", "Bình"], ["Cường", "Dũng"], (3, 1)), (["An", "Cường"], ["Bình", "Dũng"], (0, 0))],
+        [(["Bình", "Dũng"], ["An", "Cường"], (2, 1))],
+    ]
+    for day, period in enumerate(periods):
+        for team_a, team_b, goals in period:
+            history.append([_team(*team_a), _team(*team_b)], goals=goals, timestamp=day * ratings.PERIOD_SECONDS)
+    # A match without a result is not rated.
+    history.append([_team("An"), _team("Bình")], timestamp=3 * ratings.PERIOD_SECONDS)
+
+    computed = dict(zip(history.names, ratings.compute_ratings(history).tolist()))
+    expected = _elo_by_hand(periods, {name: ratings.BASE_RATING for name in computed})
+    assert computed.keys() == expected.keys()
+    assert np.allclose([computed[name] for name in expected], list(expected.values()))
+
+
+def test_apply_ratings_to_csv_keeps_players_without_history(tmp_path):
+    history = MatchHistory(tmp_path / "history.bin")
+    history.append([_team("An"), _team("Bình")], goals=[5, 0], timestamp=0)
+    roster = tmp_path / "players.csv"
+    pd.DataFrame({
+        lib.NAME_KEY: ["An", "Bình", "Giang"],
+        lib.TIER_KEY: [3.0, 3.0, 4.4],
+        lib.POSITION_KEY: ["DF", "MF", "ST"],
+    }).to_csv(roster, index=False, encoding=lib.DEFAULT_ENCODING)
+
+    assert ratings.apply_ratings_to_csv(history, roster) == 2
+    saved = {player[lib.NAME_KEY]: player for player in lib.read_players_from_csv(roster)}
+    assert saved["An"][lib.TIER_KEY] > 3.0 > saved["Bình"][lib.TIER_KEY]
+    assert saved["Giang"][lib.TIER_KEY] == 4.4
+    assert saved["Giang"][lib.STRENGTH_KEY] == "strong"
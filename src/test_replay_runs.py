@@ -0,0 +1,68 @@
+import pandas as pd
+
+import replay_runs
+import team_select_optimized_lib as lib
+
+WEIGHTS = {"tier": 1.0, "stamina": 0.0, "skill": 2.0}
+
+
+def _write_roster(path, count=14):
+    pd.DataFrame({
+        lib.NAME_KEY: [f"p{idx}" for idx in range(count)],
+        lib.TIER_KEY: [2.0 + (idx * 7 % 25) / 10 for idx in range(count)],
+        lib.POSITION_KEY: ["GK", "GK"] + [["DF", "MF", "ST"][idx % 3] for idx in range(count - 2)],
+        lib.STAMINA_KEY: [[40, 60, 80][idx % 3] for idx in range(count)],
+        lib.SKILL_KEY: [["3 sao", "5 sao", "7 sao"][idx % 3] for idx in range(count)],
+    }).to_csv(path, index=False, encoding=lib.DEFAULT_ENCODING)
+
+
+def test_logged_run_replays_with_its_weights_and_seed(tmp_path):
+    roster, log = tmp_path / "players.csv", tmp_path / "runs.jsonl"
+    _write_roster(roster)
+    details = lib.run_team_assignment(
+        roster, selected_players=[{lib.NAME_KEY: f"p{idx}"} for idx in range(14)], return_details=True,
+        attribute_weights=WEIGHTS, run_log=log,
+    )
+
+    record, = replay_runs.load_log(log)
+    assert record["attribute_weights"] == WEIGHTS
+    assert lib.config_from_log(record).seed == record["seed"]
+    metrics = replay_runs.replay_one(record, "rounds")
+    assert metrics["attribute_imbalance"] == details["attribute_imbalance"]
+
+
+def test_older_logs_get_the_default_weights():
+    assert lib.attribute_weights_from_log({}) == lib.ATTRIBUTE_WEIGHTS
+
+
+def test_log_records_the_absolute_roster_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write_roster(tmp_path / "players.csv")
+    lib.run_team_assignment("players.csv", run_log="runs.jsonl")
+    record, = replay_runs.load_log(tmp_path / "runs.jsonl")
+    assert record["roster"] == str((tmp_path / "players.csv").resolve())
+
+
+def test_roster_is_hashed_again_only_after_it_changes(tmp_path, monkeypatch):
+    roster, log = tmp_path / "players.csv", tmp_path / "runs.jsonl"
+    _write_roster(roster)
+    for seed in (1, 2):
+        lib.run_team_assignment(roster, config=lib.DEFAULT_CONFIG.replace(seed=seed), run_log=log)
+    records = replay_runs.load_log(log)
+
+    hashed = []
+    roster_hash = lib.roster_hash
+
+    def counting_hash(filename):
+        hashed.append(filename)
+        return roster_hash(filename)
+
+    monkeypatch.setattr(lib, "roster_hash", counting_hash)
+    replay_runs.replay(records, ["rounds"], max_workers=1)
+    replay_runs.replay(records, ["rounds"], max_workers=1)
+    assert len(hashed) == 1
+
+    _write_roster(roster, count=16)
+    per_engine = replay_runs.replay(records, ["rounds"], max_workers=1)
+    assert len(hashed) == 2
+    assert all(run["skipped"] == "roster changed" for run in per_engine["rounds"])
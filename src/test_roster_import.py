@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+import team_select_optimized_lib as lib
+from roster_import import MERGE, REJECT, SKIP, import_players, validate_player
+from roster_model import RosterModel
+
+
+@pytest.fixture
+def roster(tmp_path):
+    path = tmp_path / "players.csv"
+    pd.DataFrame({
+        lib.NAME_KEY: ["Minh Anh", "Bảo"],
+        lib.TIER_KEY: [3.0, 3.5],
+        lib.POSITION_KEY: ["DF", "ST"],
+        lib.STAMINA_KEY: [60.0, 80.0],
+        lib.SKILL_KEY: ["5 sao", "7 sao"],
+    }).to_csv(path, index=False, encoding=lib.DEFAULT_ENCODING)
+    model = RosterModel(path, flush_delay=0)
+    yield model
+    model.close()
+
+
+def _record(name, tier=3.2, position="MF", **extra):
+    return {lib.NAME_KEY: name, lib.TIER_KEY: tier, lib.POSITION_KEY: position, **extra}
+
+
+@pytest.mark.parametrize("field, value, message", [
+    (lib.TIER_KEY, 9.0, "tier must be between"),
+    (lib.POSITION_KEY, "LW", "position must be"),
+    (lib.STAMINA_KEY, 120, "stamina must be between 0 and 100"),
+    (lib.STAMINA_KEY, "nhiều", "stamina must be a number"),
+    (lib.SKILL_KEY, "12 sao", "skill must be one of"),
+])
+def test_validate_player_rejects_out_of_scale_values(field, value, message):
+    record = _record("Cường")
+    record[field] = value
+    with pytest.raises(ValueError, match=message):
+        validate_player(record)
+
+
+def test_validate_player_normalizes_names_and_positions():
+    player = validate_player(_record("  Cường   Lê ", position="['mf', 'DF']", **{lib.SKILL_KEY: " 5 sao "}))
+    assert player[lib.NAME_KEY] == "Cường Lê"
+    assert player[lib.POSITION_KEY] == "['MF', 'DF']"
+    assert player[lib.SKILL_KEY] == "5 sao"
+
+
+def test_duplicates_are_matched_on_normalized_names(roster):
+    report = import_players([_record("minh  ANH"), _record("Cường"), _record("cường")], roster, SKIP)
+    assert report["added"] == ["Cường"]
+    assert report["skipped"] == ["minh ANH", "cường"]
+    assert roster.get("Minh Anh")[lib.TIER_KEY] == 3.0
+
+
+def test_reject_reports_duplicates_as_errors(roster):
+    report = import_players([_record("Bảo"), _record("Cường")], roster, REJECT)
+    assert report["added"] == ["Cường"]
+    assert report["errors"] == [(0, "Bảo already exists.")]
+
+
+def test_merge_updates_existing_and_batch_players(roster):
+    records = [
+        _record("bảo", tier=4.0),
+        _record("Minh Anh", tier=3.0, position="DF", **{lib.STAMINA_KEY: 60, lib.SKILL_KEY: "5 sao"}),
+        _record("Cường", tier=2.5),
+        _record("CƯỜNG", tier=2.8, **{lib.SKILL_KEY: "3 sao"}),
+    ]
+    report = import_players(records, roster, MERGE)
+    # Minh Anh's row is unchanged, so it is not reported as merged.
+    assert report["added"] == ["Cường"]
+    assert report["merged"] == ["Bảo", "Cường"]
+    assert roster.get("Bảo")[lib.TIER_KEY] == 4.0
+    assert roster.get("Cường")[lib.TIER_KEY] == 2.8
+    assert roster.get("Cường")[lib.SKILL_KEY] == "3 sao"
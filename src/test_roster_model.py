@@ -0,0 +1,136 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import team_select_optimized_lib as lib
+from roster_model import ROW_ADDED, ROW_REMOVED, ROW_UPDATED, RosterModel, RosterWatcher
+
+
+@pytest.fixture
+def roster(tmp_path):
+    path = tmp_path / "players.csv"
+    pd.DataFrame({
+        lib.NAME_KEY: ["An", "Bình"],
+        lib.TIER_KEY: [3.0, 3.5],
+        lib.POSITION_KEY: ["DF", "ST"],
+    }).to_csv(path, index=False, encoding=lib.DEFAULT_ENCODING)
+    model = RosterModel(path, flush_delay=0.05)
+    yield model
+    model.close()
+
+
+def _write_outside(path, names, tiers):
+    pd.DataFrame({
+        lib.NAME_KEY: names,
+        lib.TIER_KEY: tiers,
+        lib.POSITION_KEY: ["DF"] * len(names),
+        lib.STAMINA_KEY: [60.0] * len(names),
+    }).to_csv(path, index=False, encoding=lib.DEFAULT_ENCODING)
+
+
+def _player(name, tier=3.2):
+    return {lib.NAME_KEY: name, lib.TIER_KEY: tier, lib.POSITION_KEY: "MF"}
+
+
+def _count_writes(roster):
+    writes = []
+    write_snapshot = roster._write_snapshot
+
+    def counting(snapshot):
+        writes.append(len(snapshot[lib.NAME_KEY]))
+        return write_snapshot(snapshot)
+
+    roster._write_snapshot = counting
+    return writes
+
+
+def test_add_many_saves_the_batch_in_one_write(roster):
+    writes = _count_writes(roster)
+    events = []
+    roster.subscribe(lambda event, row: events.append((event, row)))
+
+    roster.add_many([_player(f"p{idx}") for idx in range(50)], {"An": {lib.TIER_KEY: 4.2}})
+    assert roster.flush(timeout=5)
+
+    assert writes == [52]
+    assert events == [(ROW_UPDATED, 0)] + [(ROW_ADDED, row) for row in range(2, 52)]
+    saved = lib.read_players_from_csv(roster.path)
+    assert len(saved) == 52
+    assert saved[0][lib.STRENGTH_KEY] == "strong"
+
+
+@pytest.mark.parametrize("players, updates", [
+    ([_player("An")], None),
+    ([_player("Cường"), _player("Cường")], None),
+    ([_player("Cường")], {"Không có": {lib.TIER_KEY: 3.0}}),
+])
+def test_add_many_rejects_conflicting_batches_without_changes(roster, players, updates):
+    with pytest.raises(ValueError):
+        roster.add_many(players, updates)
+    assert roster.names() == ["An", "Bình"]
+    assert not roster.is_dirty()
+
+
+def test_concurrent_edits_are_all_saved(roster):
+    writes = _count_writes(roster)
+
+    def edit(worker):
+        for idx in range(25):
+            roster.add(_player(f"w{worker}-{idx}"))
+            roster.update("An", **{lib.STAMINA_KEY: float(worker * 100 + idx)})
+
+    threads = [threading.Thread(target=edit, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert roster.flush(timeout=5)
+
+    assert 1 <= len(writes) < 200
+    saved = RosterModel(roster.path)
+    try:
+        assert sorted(saved.names()) == sorted(roster.names())
+        assert len(saved) == 102
+        assert saved.get("An")[lib.STAMINA_KEY] == roster.get("An")[lib.STAMINA_KEY]
+    finally:
+        saved.close()
+
+
+def test_sync_from_disk_applies_outside_edits(roster):
+    events = []
+    roster.subscribe(lambda event, row: events.append(event))
+    _write_outside(roster.path, ["An", "Cường"], [4.0, 2.5])
+
+    added, removed, changed = roster.sync_from_disk()
+    assert (added, removed, changed) == (["Cường"], ["Bình"], ["An"])
+    assert events == [ROW_REMOVED, ROW_UPDATED, ROW_ADDED]
+    assert roster.get("An")[lib.STRENGTH_KEY] == "strong"
+    assert roster.sync_from_disk() is None
+
+
+def test_sync_from_disk_keeps_unsaved_local_edits(tmp_path):
+    path = tmp_path / "players.csv"
+    _write_outside(path, ["An", "Bình"], [3.0, 3.5])
+    roster = RosterModel(path, flush_delay=60)
+    try:
+        roster.update("Bình", **{lib.TIER_KEY: 2.0})
+        _write_outside(path, ["An", "Cường"], [3.1, 2.5])
+        added, removed, changed = roster.sync_from_disk()
+        assert removed == []
+        assert roster.get("Bình")[lib.TIER_KEY] == 2.0
+        assert roster.get("An")[lib.TIER_KEY] == 3.1
+    finally:
+        roster.close()
+
+
+def test_watcher_reports_outside_changes(roster):
+    changed = threading.Event()
+    watcher = RosterWatcher(roster.path, changed.set, interval=0.02)
+    try:
+        time.sleep(0.05)  # Let the watcher take its first reading
+        _write_outside(roster.path, ["An", "Bình", "Cường"], [3.0, 3.5, 2.5])
+        assert changed.wait(5)
+    finally:
+        watcher.stop()
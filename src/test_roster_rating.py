@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+import team_select_optimized_lib as lib
+from roster_rating import rerate_roster
+
+
+def _write_roster(path):
+    pd.DataFrame({
+        lib.NAME_KEY: ["An", "Bình", "Cường", "Dũng", "Em"],
+        lib.TIER_KEY: [2.0, 4.0, 2.6, 3.3, 3.0],
+        lib.POSITION_KEY: ["GK", "DF", "MF", "ST", "DF"],
+        "stamina": [100, 0, "60.0", 80, 40],
+        "skill": ["siêu sao", "1 sao", "5 sao", "?", "7 sao"],
+        lib.STRENGTH_KEY: ["weak", "strong", "balanced", "balanced", "balanced"],
+    }).to_csv(path, index=False, encoding=lib.DEFAULT_ENCODING)
+
+
+@pytest.mark.parametrize("skill_weight, tiers, changed", [
+    (0.5, [5.0, 1.0, 3.0, 3.3, 3.0], 3),
+    (1.0, [5.0, 1.0, 2.6, 3.3, 3.4], 3),
+])
+def test_rerate_writes_tiers_and_reclassifies_strength(tmp_path, skill_weight, tiers, changed):
+    path = tmp_path / "players.csv"
+    _write_roster(path)
+
+    assert rerate_roster(path, skill_weight=skill_weight) == changed
+
+    df = pd.read_csv(path, encoding=lib.DEFAULT_ENCODING)
+    assert df[lib.TIER_KEY].tolist() == pytest.approx(tiers)
+    assert df[lib.STRENGTH_KEY].tolist() == [lib.classify_strength_from_tier(tier) for tier in tiers]
+    assert df[lib.NAME_KEY].tolist() == ["An", "Bình", "Cường", "Dũng", "Em"]
+    assert df[lib.POSITION_KEY].tolist() == ["GK", "DF", "MF", "ST", "DF"]
+
+
+def test_rerating_twice_changes_nothing(tmp_path):
+    path = tmp_path / "players.csv"
+    _write_roster(path)
+    rerate_roster(path)
+    assert rerate_roster(path) == 0
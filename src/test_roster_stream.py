@@ -0,0 +1,73 @@
+import math
+
+import pandas as pd
+import pytest
+
+import team_select_optimized_lib as lib
+from roster_stream import stream_roster
+
+KEYS = [lib.NAME_KEY, lib.TIER_KEY, lib.POSITION_KEY, lib.POSITIONS_KEY, lib.STAMINA_KEY, lib.SKILL_KEY,
+        lib.STRENGTH_KEY]
+
+
+def _write_roster(path):
+    pd.DataFrame({
+        lib.NAME_KEY: ["An", "Bình", "Cường", "Dũng", "Giang"],
+        lib.TIER_KEY: [2.5, 3.4, 4.1, None, 3.0],
+        lib.POSITION_KEY: ["GK", "['ST','DF']", "['MF', 'DF', 'MF']", "mf", "DF"],
+        lib.STAMINA_KEY: [60, 80, None, 40, 100],
+        lib.SKILL_KEY: ["5 sao", "7 sao", None, "3 sao", "10 sao"],
+    }).to_csv(path, index=False, encoding=lib.DEFAULT_ENCODING)
+
+
+def _comparable(player):
+    return {
+        key: None if isinstance(player.get(key), float) and math.isnan(player[key]) else player.get(key)
+        for key in KEYS
+    }
+
+
+def test_streamed_players_match_the_csv_reader(tmp_path):
+    path = tmp_path / "players.csv"
+    _write_roster(path)
+    expected = [_comparable(player) for player in lib.read_players_from_csv(path)]
+    # A chunk size below the row count exercises growing the arrays.
+    streamed = stream_roster(path, chunksize=2)
+    assert [_comparable(player) for player in streamed.players()] == expected
+
+
+def test_rows_of_looks_up_names(tmp_path):
+    path = tmp_path / "players.csv"
+    _write_roster(path)
+    roster = stream_roster(path)
+    rows = roster.rows_of(["Cường", "Không có", "An"])
+    assert rows == [2, None, 0]
+    players = roster.players([2, 0])
+    assert [player[lib.POSITIONS_KEY] for player in players] == [["MF", "DF"], ["GK"]]
+    assert players[1][lib.SKILL_KEY] == "5 sao"
+
+
+def test_unknown_positions_are_reported_by_their_original_label(tmp_path):
+    path = tmp_path / "players.csv"
+    pd.DataFrame({
+        lib.NAME_KEY: ["An", "Bình"],
+        lib.TIER_KEY: [3.0, 3.2],
+        lib.POSITION_KEY: ["DF", "['LW','ST']"],
+    }).to_csv(path, index=False, encoding=lib.DEFAULT_ENCODING)
+
+    for players in (lib.read_players_from_csv(path), stream_roster(path).players()):
+        assert players[1][lib.POSITION_KEY] == "LW"
+        with pytest.raises(ValueError, match="Unsupported position 'LW' for Bình"):
+            lib.balance_teams(players)
+
+
+def test_rosters_saved_with_a_bom_read_the_same(tmp_path):
+    path = tmp_path / "players.csv"
+    _write_roster(path)
+    excel_path = tmp_path / "excel.csv"
+    excel_path.write_bytes(b"\xef\xbb\xbf" + path.read_bytes())
+
+    for read in (lib.read_players_from_csv, lambda filename: stream_roster(filename).players()):
+        assert [_comparable(player) for player in read(excel_path)] == [
+            _comparable(player) for player in read(path)
+        ]
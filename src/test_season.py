@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+import team_select_optimized_lib as lib
+from season import SeasonScheduler
+
+
+def test_plan_matchday_records_teammates(make_attendance):
+    scheduler = SeasonScheduler(candidates=4)
+    chosen = scheduler.plan_matchday(make_attendance())
+    team = chosen["teams"][0]
+    assert scheduler.times_together(team[0][lib.NAME_KEY], team[1][lib.NAME_KEY]) == 1
+    other = chosen["teams"][1][0][lib.NAME_KEY]
+    assert scheduler.times_together(team[0][lib.NAME_KEY], other) == 0
+
+
+def test_save_and_load_round_trip_without_pickle(make_attendance, tmp_path):
+    scheduler = SeasonScheduler(candidates=4)
+    scheduler.plan_season([make_attendance(seed=1, prefix="Cầu thủ "), make_attendance(seed=2, prefix="Cầu thủ ")])
+    path = tmp_path / "season.npz"
+    scheduler.save(path)
+
+    loaded = SeasonScheduler.load(path)
+    assert loaded.index == scheduler.index
+    assert np.array_equal(loaded.together, scheduler.together)
+    with np.load(path, allow_pickle=False) as data:
+        assert data["names"].dtype.kind == "U"
+
+
+def test_load_rejects_pickled_names(tmp_path):
+    path = tmp_path / "season.npz"
+    np.savez(path, names=np.array(["a", "b"], dtype=object), together=np.zeros((2, 2), dtype=np.int16))
+    with pytest.raises(ValueError):
+        SeasonScheduler.load(path)
+
+
+def test_plan_matchday_uses_the_config(make_attendance):
+    config = lib.DEFAULT_CONFIG.replace(tier_threshold_low=2.5, tier_threshold_high=4.0, team_count=3, seed=9)
+
+    def plan():
+        return SeasonScheduler(candidates=4, config=config).plan_matchday(make_attendance(count=21, gk_count=3))
+
+    chosen = plan()
+    assert len(chosen["teams"]) == 3
+    for player in (player for team in chosen["teams"] for player in team):
+        assert player[lib.STRENGTH_KEY] == lib.classify_strength_from_tier(player[lib.TIER_KEY], config)
+    assert [[p[lib.NAME_KEY] for p in team] for team in plan()["teams"]] == [
+        [p[lib.NAME_KEY] for p in team] for team in chosen["teams"]
+    ]
@@ -0,0 +1,106 @@
+import threading
+import time
+import types
+
+import pandas as pd
+import pytest
+
+import team_select_optimized_lib as lib
+from roster_model import RosterModel
+from session_profiler import IDLE_CATEGORY, OTHER_CATEGORY, SamplingProfiler
+
+tkinter = pytest.importorskip("tkinter")
+
+
+def _categories(profiler, thread_name):
+    return {category for category, thread, _ in profiler.samples if thread == thread_name}
+
+
+def test_blocked_tk_event_loop_counts_as_idle(tmp_path):
+    # ``Misc.mainloop`` hands over to ``self.tk.mainloop``; a C-level sleep
+    # blocks the same way Tk does while it waits for events.
+    fake_root = types.SimpleNamespace(tk=types.SimpleNamespace(mainloop=time.sleep))
+    stop = threading.Event()
+
+    def busy():
+        while not stop.is_set():
+            sum(range(1000))
+
+    loop = threading.Thread(target=tkinter.Misc.mainloop, args=(fake_root, 0.5), name="tk-loop")
+    worker = threading.Thread(target=busy, name="busy")
+    loop.start()
+    worker.start()
+    try:
+        time.sleep(0.05)
+        profiler = SamplingProfiler(tmp_path / "profile.folded")
+        for _ in range(5):
+            profiler._sample(threading.get_ident())
+            time.sleep(0.01)
+    finally:
+        stop.set()
+        worker.join()
+        loop.join()
+
+    assert _categories(profiler, "tk-loop") == {IDLE_CATEGORY}
+    assert _categories(profiler, "busy") == {OTHER_CATEGORY}
+
+
+def _profile_while(tmp_path, blocked, target, name):
+    """Profile while ``target`` runs on thread ``name`` until it has set ``blocked``."""
+    thread = threading.Thread(target=target, name=name)
+    thread.start()
+    assert blocked.wait(10)
+    profiler = SamplingProfiler(tmp_path / "profile.folded", interval=0.005).start()
+    time.sleep(0.1)
+    profiler.stop()
+    return profiler, thread
+
+
+def test_ui_thread_waiting_for_a_flush_counts_as_roster_io(tmp_path, make_attendance):
+    path = tmp_path / "players.csv"
+    pd.DataFrame(make_attendance(4)).to_csv(path, index=False, encoding=lib.DEFAULT_ENCODING)
+    roster = RosterModel(path, flush_delay=0.01)
+    writing, release = threading.Event(), threading.Event()
+    write_snapshot = roster._write_snapshot
+
+    def slow_write(snapshot):
+        writing.set()
+        release.wait(10)
+        return write_snapshot(snapshot)
+
+    roster._write_snapshot = slow_write
+    roster.update("p0", **{lib.TIER_KEY: 4.0})
+    try:
+        profiler, ui = _profile_while(tmp_path, writing, roster.flush, "ui")
+    finally:
+        release.set()
+    ui.join()
+    roster.close()
+
+    assert _categories(profiler, "ui") == {"roster_io"}
+    stack = next(stack for _, thread, stack in profiler.samples if thread == "ui")
+    assert "roster_model.RosterModel.flush" in stack
+    assert stack[-1] == "threading.Condition.wait"
+
+
+def test_waiting_inside_an_assignment_counts_as_the_assignment(tmp_path, make_attendance):
+    paused, release = threading.Event(), threading.Event()
+
+    def progress(attempt_index, max_retries, best_violation):
+        paused.set()
+        release.wait(10)
+        return False
+
+    never = lib.DEFAULT_CONFIG.replace(median_delta={"DF": -1.0, "MF": -1.0, "ST": -1.0}, seed=1)
+    try:
+        profiler, search = _profile_while(
+            tmp_path, paused,
+            lambda: lib.generate_balanced_teams(make_attendance(), config=never, progress=progress), "search",
+        )
+    finally:
+        release.set()
+    search.join()
+
+    assert _categories(profiler, "search") == {"team_assignment"}
+    lines = (tmp_path / "profile.folded").read_text(encoding="utf-8").splitlines()
+    assert any(line.startswith("team_assignment;search;") for line in lines)
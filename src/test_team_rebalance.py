@@ -0,0 +1,82 @@
+import itertools
+import random
+
+import team_rebalance
+import team_select_optimized_lib as lib
+
+LOOSE_CONFIG = lib.DEFAULT_CONFIG.replace(
+    median_delta={"DF": 1.0, "MF": 1.0, "ST": 1.5}, iqr_delta={"DF": 2.0, "MF": 2.0, "ST": 2.5}
+)
+
+
+def _is_fair(teams, config):
+    """The acceptance rules of ``rebalance_teams``, from its public constants and lib."""
+    sizes = [len(team) for team in teams]
+    tiers = [lib.evaluate_team(team) for team in teams]
+    if max(sizes) - min(sizes) > 1:
+        return False
+    if lib.REQUIRE_GK_PER_TEAM and not all(
+        any(player[lib.POSITION_KEY] == lib.GK_LABEL for player in team) for team in teams
+    ):
+        return False
+    if max(tiers) - min(tiers) > team_rebalance.REBALANCE_TIER_TOLERANCE + 1e-9:
+        return False
+    return lib.evaluate_fairness(teams, config)["accepted"]
+
+
+def _fewest_moves_by_brute_force(teams, removed, added, config):
+    remaining = [(player, team_idx) for team_idx, team in enumerate(teams) for player in team
+                 if player[lib.NAME_KEY] not in removed]
+    players = [player for player, _ in remaining] + list(added)
+    home = [team_idx for _, team_idx in remaining]
+    best = None
+    for assignment in itertools.product(range(2), repeat=len(players)):
+        moves = sum(team_idx != own for team_idx, own in zip(assignment, home))
+        if best is not None and moves >= best:
+            continue
+        split = [[player for player, team_idx in zip(players, assignment) if team_idx == side] for side in range(2)]
+        if _is_fair(split, config):
+            best = moves
+    return best
+
+
+def test_minimal_rebalance_matches_brute_force(make_attendance):
+    rng = random.Random(3)
+    compared = 0
+    for trial in range(20):
+        players = make_attendance(rng.randint(10, 12), rng=rng)
+        teams = lib.generate_balanced_teams(
+            [dict(player) for player in players], config=LOOSE_CONFIG.replace(seed=trial)
+        )["teams"]
+        removed = [teams[0][-1][lib.NAME_KEY]] if trial % 2 else []
+        added = make_attendance(1, gk_count=0, prefix="late", rng=rng) if trial % 3 else []
+        for player in added:
+            player[lib.POSITION_KEY] = "MF"
+
+        result = team_rebalance.rebalance_teams(
+            [[dict(player) for player in team] for team in teams], added, removed, config=LOOSE_CONFIG
+        )
+        if result["minimal"]:
+            assert _is_fair(result["teams"], LOOSE_CONFIG)
+            assert len(result["moves"]) == _fewest_moves_by_brute_force(teams, removed, added, LOOSE_CONFIG)
+            compared += 1
+    assert compared
+
+
+def test_rebalance_keeps_everyone_and_places_arrivals(make_attendance):
+    rng = random.Random(7)
+    teams = lib.generate_balanced_teams(
+        make_attendance(12, rng=rng), config=LOOSE_CONFIG.replace(seed=1)
+    )["teams"]
+    removed = teams[1][-1][lib.NAME_KEY]
+    added = make_attendance(2, prefix="late", rng=rng)
+    result = team_rebalance.rebalance_teams(teams, added, [removed], config=LOOSE_CONFIG)
+
+    names = sorted(player[lib.NAME_KEY] for team in result["teams"] for player in team)
+    expected = sorted(
+        [player[lib.NAME_KEY] for team in teams for player in team if player[lib.NAME_KEY] != removed]
+        + [player[lib.NAME_KEY] for player in added]
+    )
+    assert names == expected
+    assert all(move["name"] not in {player[lib.NAME_KEY] for player in added} for move in result["moves"])
+    assert result["selection"] in ("accepted", "best_effort")
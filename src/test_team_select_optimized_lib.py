@@ -0,0 +1,124 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+import team_select_optimized_lib as lib
+
+NEVER_ACCEPT = lib.DEFAULT_CONFIG.replace(
+    median_delta={"DF": -1.0, "MF": -1.0, "ST": -1.0}, iqr_delta={"DF": -1.0, "MF": -1.0, "ST": -1.0}, seed=1
+)
+
+
+def test_exhausted_retries_are_a_fallback(make_attendance):
+    selection = lib.generate_balanced_teams(make_attendance(), max_retries=3, config=NEVER_ACCEPT)
+    assert selection["selection"] == "fallback"
+    assert selection["retries_used"] == 3
+
+
+@pytest.mark.parametrize("stop_at", [1, 2, 3])
+def test_cancelling_is_labelled_cancelled_even_on_the_last_attempt(make_attendance, stop_at):
+    def progress(attempt_index, max_retries, best_violation):
+        return attempt_index < stop_at
+
+    selection = lib.generate_balanced_teams(make_attendance(), max_retries=3, config=NEVER_ACCEPT, progress=progress)
+    assert selection["selection"] == "cancelled"
+    assert selection["retries_used"] == stop_at
+
+
+def test_seeded_runs_are_reproducible(make_attendance):
+    config = lib.DEFAULT_CONFIG.replace(seed=42)
+    first = lib.generate_balanced_teams(make_attendance(), config=config)
+    second = lib.generate_balanced_teams(make_attendance(), config=config)
+    assert [[p[lib.NAME_KEY] for p in team] for team in first["teams"]] == [
+        [p[lib.NAME_KEY] for p in team] for team in second["teams"]
+    ]
+
+
+def test_min_cost_assignment_matches_brute_force():
+    rng = random.Random(5)
+    for _ in range(200):
+        rows = rng.randint(1, 5)
+        cols = rng.randint(rows, 6)
+        cost = [[rng.choice([rng.randint(0, 6) * 0.5, 1e9]) for _ in range(cols)] for _ in range(rows)]
+        assignment = lib._min_cost_assignment(cost)
+        assert len(set(assignment)) == rows
+        best = min(
+            sum(cost[row][col] for row, col in enumerate(columns))
+            for columns in itertools.permutations(range(cols), rows)
+        )
+        assert sum(cost[row][col] for row, col in enumerate(assignment)) == pytest.approx(best)
+
+
+def test_single_position_players_keep_their_line(make_attendance):
+    players = make_attendance(12, seed=4)
+    fixed = {player[lib.NAME_KEY]: player[lib.POSITION_KEY] for player in players}
+    flexible = make_attendance(6, seed=5, gk_count=0, prefix="flex")
+    for player in flexible:
+        player[lib.POSITION_KEY] = "['ST', 'DF', 'MF']"
+
+    lib.assign_player_lines(players + flexible, team_count=2)
+
+    assert {player[lib.NAME_KEY]: player[lib.POSITION_KEY] for player in players} == fixed
+    assert all(player[lib.POSITION_KEY] in ("ST", "DF", "MF") for player in flexible)
+    assert all(player[lib.POSITIONS_KEY] == ["ST", "DF", "MF"] for player in flexible)
+
+
+@pytest.mark.parametrize("fixed_gk, team_count, expected_gk", [(0, 2, 2), (1, 2, 2), (2, 2, 2), (1, 3, 3), (3, 2, 3)])
+def test_flexible_keepers_fill_the_missing_goals(make_attendance, fixed_gk, team_count, expected_gk):
+    players = make_attendance(12, seed=6, gk_count=fixed_gk)
+    flexible = make_attendance(4, seed=7, gk_count=0, prefix="flex")
+    for player in flexible:
+        player[lib.POSITION_KEY] = "['DF', 'GK']"
+
+    lib.assign_player_lines(players + flexible, team_count=team_count)
+
+    keepers = [player for player in players + flexible if player[lib.POSITION_KEY] == lib.GK_LABEL]
+    assert len(keepers) == expected_gk
+    assert all(player[lib.POSITION_KEY] in ("DF", lib.GK_LABEL) for player in flexible)
+
+
+def _win_gap(fairness):
+    win = fairness["win_probability"]["win"]
+    return max(win) - min(win)
+
+
+def test_mirrored_teams_are_a_coin_flip(make_attendance):
+    team = make_attendance(7, seed=8, gk_count=1)
+    mirror = [dict(player, **{lib.NAME_KEY: player[lib.NAME_KEY] + "'"}) for player in team]
+    probabilities = lib.estimate_win_probabilities([team, mirror], rng=np.random.default_rng(0))
+    win_a, win_b = probabilities["win"]
+    assert win_a == pytest.approx(0.5 * (1 - probabilities["draw"]), abs=0.02)
+    assert win_a == pytest.approx(win_b, abs=0.03)
+    assert win_a + win_b + probabilities["draw"] == pytest.approx(1.0)
+
+
+def test_stronger_team_is_favoured(make_attendance):
+    team = make_attendance(7, seed=9, gk_count=1)
+    stronger = [dict(player, **{lib.TIER_KEY: player[lib.TIER_KEY] + 1.0}) for player in team]
+    win_weak, win_strong = lib.estimate_win_probabilities([team, stronger], rng=np.random.default_rng(0))["win"]
+    assert win_strong > win_weak + 0.2
+    assert lib.estimate_win_probabilities([team, stronger], rng=np.random.default_rng(0))["win"] == [
+        win_weak, win_strong
+    ]
+
+
+def test_win_probability_criterion_prefers_the_closer_split(make_attendance):
+    players = make_attendance(14, seed=10)
+    by_tier = sorted(players[2:], key=lambda player: player[lib.TIER_KEY])
+    lopsided = [[players[0]] + by_tier[:6], [players[1]] + by_tier[6:]]
+    alternating = [[players[0]] + by_tier[0::2], [players[1]] + by_tier[1::2]]
+    evaluate = lib.FAIRNESS_CRITERIA["win_probability"]
+    config = lib.DEFAULT_CONFIG.replace(seed=3)
+    close, far = evaluate(alternating, config), evaluate(lopsided, config)
+    assert _win_gap(close) < _win_gap(far)
+    assert close["violation_score"] <= far["violation_score"]
+    assert not far["accepted"]
+
+    selection = lib.generate_balanced_teams(players, max_retries=5, criterion="win_probability", config=config)
+    gaps = [_win_gap(attempt["fairness"]) for attempt in selection["attempts_evaluated"]]
+    if selection["selection"] == "accepted":
+        assert _win_gap(selection["fairness"]) <= lib.WIN_PROBABILITY_TOLERANCE
+    else:
+        assert _win_gap(selection["fairness"]) == min(gaps)
@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+
+from PyQt5.QtCore import QThreadPool, Qt  # noqa: E402
+
+import team_select_optimized_lib as lib  # noqa: E402
+import team_select_pyqt  # noqa: E402
+from roster_model import RosterModel  # noqa: E402
+from team_select_pyqt import PlayerTableModel, TeamSelectionWindow  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def roster(tmp_path, make_attendance):
+    path = tmp_path / "players.csv"
+    pd.DataFrame(make_attendance(16)).to_csv(path, index=False, encoding=lib.DEFAULT_ENCODING)
+    model = RosterModel(path, flush_delay=0.05)
+    yield model
+    model.close()
+
+
+@pytest.fixture
+def window(app, roster, monkeypatch):
+    shown = {"results": [], "warnings": []}
+    monkeypatch.setattr(TeamSelectionWindow, "show_result_dialog", lambda self, text: shown["results"].append(text))
+    monkeypatch.setattr(
+        team_select_pyqt.QMessageBox, "warning", lambda parent, title, text: shown["warnings"].append(text)
+    )
+    dialog = TeamSelectionWindow(roster=roster)
+    dialog.shown = shown
+    yield dialog
+    if dialog.isVisible() or dialog._worker is not None:
+        dialog.done(0)
+    QThreadPool.globalInstance().waitForDone()
+
+
+def _tick(model, rows):
+    for row in rows:
+        model.setData(model.index(row, PlayerTableModel.SELECT_COL), Qt.Checked, Qt.CheckStateRole)
+
+
+def _wait_until(app, condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the worker"
+        app.processEvents()
+        time.sleep(0.01)
+
+
+def _assert_aggregates(model, roster, rows):
+    ticked = [roster.players()[row] for row in rows]
+    assert [player[lib.NAME_KEY] for player in model.selected_players()] == [p[lib.NAME_KEY] for p in ticked]
+    for line in lib.POSITION_ORDER:
+        tiers = [player[lib.TIER_KEY] for player in ticked if player[lib.POSITION_KEY] == line]
+        assert model.line_counts[line] == len(tiers)
+        assert model.line_tier_sums[line] == pytest.approx(sum(tiers))
+
+
+def test_ticking_rows_keeps_the_line_aggregates(app, roster):
+    model = PlayerTableModel(roster, 2.5, 4.0)
+    _tick(model, [0, 2, 3])
+    _tick(model, [2])
+    model.setData(model.index(3, PlayerTableModel.SELECT_COL), Qt.Unchecked, Qt.CheckStateRole)
+
+    assert model.selected_count == 2
+    _assert_aggregates(model, roster, [0, 2])
+
+    # An edit to a ticked row moves its contribution with it.
+    roster.update(roster.value(2, lib.NAME_KEY), **{lib.TIER_KEY: 4.5, lib.POSITION_KEY: "ST"})
+    _assert_aggregates(model, roster, [0, 2])
+    model.bridge.detach()
+
+
+def test_strength_column_follows_the_thresholds(app, roster):
+    model = PlayerTableModel(roster, 2.5, 4.0)
+    roster.update(roster.value(0, lib.NAME_KEY), **{lib.TIER_KEY: 3.0})
+    index = model.index(0, PlayerTableModel.STRENGTH_COL)
+    assert model.data(index) == "balanced"
+    model.set_thresholds(3.0, 4.0)
+    assert model.data(index) == "weak"
+    model.set_thresholds(4.0, 3.0)  # Inverted pairs are ignored.
+    assert model.data(index) == "weak"
+    model.bridge.detach()
+
+
+def test_shuffle_runs_on_the_pool_and_flushes_off_the_ui_thread(app, window, roster, monkeypatch):
+    flushed_on = []
+    flush = roster.flush
+
+    def recording_flush(timeout=None):
+        flushed_on.append(threading.current_thread())
+        return flush(timeout)
+
+    monkeypatch.setattr(roster, "flush", recording_flush)
+    _tick(window.player_model, range(len(roster)))
+    window.handle_shuffle()
+    assert not window.shuffle_button.isEnabled()
+
+    _wait_until(app, lambda: window.shown["results"])
+    assert window.shuffle_button.isEnabled()
+    assert window._worker is None
+    assert flushed_on and flushed_on[0] is not threading.main_thread()
+    assert all(name in window.shown["results"][0] for name in roster.names())
+
+
+def test_unexpected_errors_end_the_run(app, window, roster, monkeypatch):
+    def broken(**kwargs):
+        raise RuntimeError("disk on fire")
+
+    monkeypatch.setattr(team_select_pyqt.lib, "run_team_assignment", broken)
+    _tick(window.player_model, range(len(roster)))
+    window.handle_shuffle()
+
+    _wait_until(app, lambda: window.shown["warnings"])
+    assert window.shown["warnings"] == ["disk on fire"]
+    assert window.shuffle_button.isEnabled()
+
+
+def test_closing_drops_results_still_in_flight(app, window, roster, monkeypatch):
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow(**kwargs):
+        started.set()
+        release.wait(10)
+        return "late result"
+
+    monkeypatch.setattr(team_select_pyqt.lib, "run_team_assignment", slow)
+    _tick(window.player_model, range(len(roster)))
+    window.handle_shuffle()
+    assert started.wait(10)
+
+    window.done(0)
+    release.set()
+    QThreadPool.globalInstance().waitForDone()
+    app.processEvents()
+    assert window.shown == {"results": [], "warnings": []}
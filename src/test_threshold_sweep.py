@@ -0,0 +1,31 @@
+import numpy as np
+
+import team_select_optimized_lib as lib
+import threshold_sweep
+
+
+def test_config_grid_varies_only_the_given_lines():
+    configs = threshold_sweep.config_grid(median={"ST": [0.4, 0.9]}, iqr={"MF": [0.3]})
+    assert [(config.median_limit("ST"), config.iqr_limit("MF")) for config in configs] == [(0.4, 0.3), (0.9, 0.3)]
+    assert all(config.median_limit("DF") == lib.DEFAULT_CONFIG.median_limit("DF") for config in configs)
+
+
+def test_sweep_replays_generate_balanced_teams(make_attendance):
+    corpus = [make_attendance(seed=seed) for seed in range(12)]
+    configs = threshold_sweep.config_grid(median={"DF": [0.0, 0.2, 1.0]})
+    retries = 4
+    result = threshold_sweep.sweep(corpus, configs, candidates=retries, max_retries=retries, seed=100)
+
+    for idx, config in enumerate(configs):
+        outcomes = []
+        for offset, attendance in enumerate(corpus):
+            selection = lib.generate_balanced_teams(
+                [dict(player) for player in attendance],
+                team_count=2,
+                max_retries=retries,
+                config=config.replace(seed=100 + offset),
+            )
+            scores = [lib.evaluate_team(team) for team in selection["teams"]]
+            outcomes.append((selection["selection"] == "accepted", max(scores) - min(scores)))
+        assert result["success_rate"][idx] == np.mean([accepted for accepted, _ in outcomes])
+        assert np.isclose(result["mean_balance_diff"][idx], np.mean([diff for _, diff in outcomes]))
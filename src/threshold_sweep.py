@@ -0,0 +1,214 @@
+"""What-if sweep of the per-line fairness limits over recorded attendances.
+
+The limits in ``fairness_config`` only decide whether a split is accepted;
+they do not change how ``balance_teams`` builds splits. So for every
+attendance one pool of candidate splits is generated once, its per-line
+median and IQR gaps are stored in arrays, and every config of the grid is
+judged against the whole pool in one broadcast NumPy pass. The pool is cut
+into runs of ``max_retries`` candidates to replay what
+``generate_balanced_teams`` would have picked under each config.
+
+Usage: python threshold_sweep.py --median ST=0.4,0.65,0.9 --iqr MF=0.3,0.4,0.5
+"""
+import argparse
+import itertools
+from pathlib import Path
+
+import numpy as np
+
+import team_select_optimized_lib as lib
+from fairness_config import MAX_RETRIES
+from match_history import MatchHistory
+from roster_model import RosterModel
+
+LINES = ["DF", "MF", "ST"]
+SWEEP_CANDIDATES = 120      # Candidate splits generated per attendance
+CONFIG_BLOCK = 32           # Configs judged per broadcast, bounds peak memory
+EPSILON = 1e-9
+
+
+def config_grid(base=None, median=None, iqr=None):
+    """Return every combination of per-line limits as ``BalanceConfig`` objects.
+
+    ``median`` and ``iqr`` map a line to the values to try, e.g.
+    ``{"ST": [0.4, 0.65, 0.9]}``; lines left out keep ``base``'s limits.
+    """
+    base = base or lib.DEFAULT_CONFIG
+    axes = [("median_delta", line, values) for line, values in (median or {}).items()]
+    axes += [("iqr_delta", line, values) for line, values in (iqr or {}).items()]
+    configs = []
+    for combination in itertools.product(*(values for _, _, values in axes)):
+        limits = {"median_delta": dict(base.median_delta), "iqr_delta": dict(base.iqr_delta)}
+        for (field, line, _), value in zip(axes, combination):
+            limits[field][line] = value
+        configs.append(base.replace(**limits))
+    return configs
+
+
+def attendance_corpus(history, roster):
+    """Return the attendance of every recorded match as player dicts from ``roster``.
+
+    Matches naming players that are no longer on the roster are skipped.
+    """
+    names = history.names
+    corpus = []
+    for ids in history.records()["players"]:
+        attendance = [names[player_id] for player_id in ids if player_id >= 0]
+        players = [roster.get(name) for name in attendance]
+        if players and all(player is not None for player in players):
+            corpus.append(players)
+    return corpus
+
+
+def candidate_pool(attendance, candidates=SWEEP_CANDIDATES, seed=None):
+    """Generate ``candidates`` two-team splits and return their line gaps.
+
+    Splits are built with ``ATTRIBUTE_WEIGHTS``, as ``generate_balanced_teams``
+    builds them. Returns ``(median_gaps, iqr_gaps, balance_diffs, imbalances)``
+    with shapes ``(candidates, 3)``, ``(candidates, 3)``, ``(candidates,)``
+    and ``(candidates,)``.
+    """
+    players = [dict(player) for player in attendance]
+    config = lib.DEFAULT_CONFIG.replace(team_count=2, seed=seed)
+    rng = config.rng()
+    lib.assign_player_lines(players, team_count=2)
+    median_gaps = np.empty((candidates, len(LINES)))
+    iqr_gaps = np.empty((candidates, len(LINES)))
+    balance_diffs = np.empty(candidates)
+    imbalances = np.empty(candidates)
+    for idx in range(candidates):
+        teams = lib.balance_teams(players, attribute_weights=lib.ATTRIBUTE_WEIGHTS, config=config, rng=rng)
+        fairness = lib.evaluate_fairness(teams, config)
+        median_gaps[idx] = [fairness["median_delta"][line] for line in LINES]
+        iqr_gaps[idx] = [fairness["iqr_delta"][line] for line in LINES]
+        scores = [lib.evaluate_team(team) for team in teams]
+        balance_diffs[idx] = max(scores) - min(scores)
+        imbalances[idx] = lib.attribute_summary(teams, lib.ATTRIBUTE_WEIGHTS)["imbalance"]
+    return median_gaps, iqr_gaps, balance_diffs, imbalances
+
+
+def _judge(median_gaps, iqr_gaps, median_limits, iqr_limits):
+    """Broadcast (configs, lines) limits against (attendances, candidates, lines) gaps."""
+    median_over = median_gaps[None] - median_limits[:, None, None, :]
+    iqr_over = iqr_gaps[None] - iqr_limits[:, None, None, :]
+    accepted = ((median_over <= EPSILON) & (iqr_over <= EPSILON)).all(axis=-1)
+    violation = (np.maximum(median_over - EPSILON, 0.0) + np.maximum(iqr_over - EPSILON, 0.0)).sum(axis=-1)
+    return accepted, violation
+
+
+def sweep(corpus, configs, candidates=SWEEP_CANDIDATES, max_retries=MAX_RETRIES, seed=None):
+    """Evaluate ``configs`` against a shared candidate pool for every attendance.
+
+    Returns a dict of per-config arrays: ``acceptance_rate`` (share of single
+    splits accepted), ``success_rate`` (share of runs of ``max_retries``
+    attempts ending accepted, i.e. 1 - fallback rate), ``mean_violation`` of
+    the fallbacks and the mean and 90th percentile ``balance_diff`` of the
+    split each run would have returned. Attendances that cannot be split
+    (e.g. fewer than two GKs) are counted in ``skipped``.
+    """
+    runs = max(1, candidates // max_retries)
+    candidates = runs * max_retries
+    pools, skipped = [], 0
+    for idx, attendance in enumerate(corpus):
+        try:
+            pools.append(candidate_pool(attendance, candidates, None if seed is None else seed + idx))
+        except ValueError:
+            skipped += 1
+    if not pools:
+        raise ValueError("No attendance in the corpus could be split into two teams.")
+
+    median_gaps = np.stack([pool[0] for pool in pools])
+    iqr_gaps = np.stack([pool[1] for pool in pools])
+    balance_diffs = np.stack([pool[2] for pool in pools]).reshape(len(pools), runs, max_retries)
+    imbalances = np.stack([pool[3] for pool in pools]).reshape(len(pools), runs, max_retries)
+    median_limits = np.array([[config.median_limit(line) for line in LINES] for config in configs])
+    iqr_limits = np.array([[config.iqr_limit(line) for line in LINES] for config in configs])
+
+    result = {name: np.empty(len(configs)) for name in (
+        "acceptance_rate", "success_rate", "mean_violation", "mean_balance_diff", "p90_balance_diff",
+    )}
+    for start in range(0, len(configs), CONFIG_BLOCK):
+        block = slice(start, start + CONFIG_BLOCK)
+        accepted, violation = _judge(median_gaps, iqr_gaps, median_limits[block], iqr_limits[block])
+        result["acceptance_rate"][block] = accepted.mean(axis=(1, 2))
+
+        # Replay generate_balanced_teams on runs of max_retries candidates:
+        # the first accepted split wins, otherwise the lowest violation with
+        # ties going to the lowest attribute imbalance.
+        accepted = accepted.reshape(-1, len(pools), runs, max_retries)
+        violation = violation.reshape(accepted.shape)
+        success = accepted.any(axis=-1)
+        tied = violation == violation.min(axis=-1, keepdims=True)
+        fallback = np.where(tied, imbalances[None], np.inf).argmin(axis=-1)
+        chosen = np.where(success, accepted.argmax(axis=-1), fallback)
+        chosen_diff = np.take_along_axis(balance_diffs[None], chosen[..., None], axis=-1)[..., 0]
+        fallback_violation = np.take_along_axis(violation, chosen[..., None], axis=-1)[..., 0]
+
+        result["success_rate"][block] = success.mean(axis=(1, 2))
+        fallbacks = np.maximum((~success).sum(axis=(1, 2)), 1)
+        result["mean_violation"][block] = np.where(~success, fallback_violation, 0.0).sum(axis=(1, 2)) / fallbacks
+        flat_diff = chosen_diff.reshape(chosen_diff.shape[0], -1)
+        result["mean_balance_diff"][block] = flat_diff.mean(axis=1)
+        result["p90_balance_diff"][block] = np.percentile(flat_diff, 90, axis=1)
+
+    result["configs"] = configs
+    result["attendances"] = len(pools)
+    result["skipped"] = skipped
+    return result
+
+
+def format_sweep(result):
+    """Render a sweep result as a text table, one row per config."""
+    lines = [
+        f"{len(result['configs'])} configs x {result['attendances']} attendances "
+        f"({result['skipped']} skipped)",
+        "median DF/MF/ST | IQR DF/MF/ST | accept | success | fallback viol | diff mean/p90",
+    ]
+    for idx, config in enumerate(result["configs"]):
+        medians = "/".join(f"{config.median_limit(line):.2f}" for line in LINES)
+        iqrs = "/".join(f"{config.iqr_limit(line):.2f}" for line in LINES)
+        lines.append(
+            f"{medians} | {iqrs} | {result['acceptance_rate'][idx]:6.1%} | {result['success_rate'][idx]:7.1%} | "
+            f"{result['mean_violation'][idx]:13.3f} | "
+            f"{result['mean_balance_diff'][idx]:.2f}/{result['p90_balance_diff'][idx]:.2f}"
+        )
+    return "\n".join(lines)
+
+
+def _parse_axis(values):
+    """Parse ["ST=0.4,0.65", "MF=0.3"] into {"ST": [0.4, 0.65], "MF": [0.3]}."""
+    axis = {}
+    for item in values or []:
+        line, _, numbers = item.partition("=")
+        line = line.strip().upper()
+        if line not in LINES:
+            raise ValueError(f"Unknown line '{line}'; use one of {', '.join(LINES)}.")
+        axis[line] = [float(number) for number in numbers.split(",") if number.strip()]
+    return axis
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--history", default="match_history.bin", help="MatchHistory log to take attendances from")
+    parser.add_argument("--roster", default=lib.CSV_FILE, help="roster CSV used to look up players")
+    parser.add_argument("--median", action="append", help="median limits to try for a line, e.g. ST=0.4,0.65,0.9")
+    parser.add_argument("--iqr", action="append", help="IQR limits to try for a line, e.g. MF=0.3,0.4,0.5")
+    parser.add_argument("--candidates", type=int, default=SWEEP_CANDIDATES)
+    parser.add_argument("--retries", type=int, default=MAX_RETRIES)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    if not Path(args.history).exists():
+        parser.error(f"{args.history} does not exist.")
+
+    roster = RosterModel(args.roster)
+    try:
+        corpus = attendance_corpus(MatchHistory(args.history), roster)
+    finally:
+        roster.close()
+    configs = config_grid(median=_parse_axis(args.median), iqr=_parse_axis(args.iqr))
+    result = sweep(corpus, configs, candidates=args.candidates, max_retries=args.retries, seed=args.seed)
+    print(format_sweep(result))
+
+
+if __name__ == "__main__":
+    main()